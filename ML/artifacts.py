@@ -0,0 +1,160 @@
+# artifacts.py
+# 추천 모델 아티팩트 번들 생성 / 로드
+#
+# 번들 디렉토리 구성
+#   model.cbm                  : CatBoost 모델
+#   candidates_index.npy       : df_learning 기준 원래 행 인덱스
+#   candidates_name.npy        : 여행지명 (고정 길이 유니코드, mmap 가능)
+#   candidates_type_cd.npy     : VISIT_AREA_TYPE_CD
+#   candidates_name_code.npy   : 레이블 인코딩된 VISIT_AREA_NM
+#   meta.json                  : 버전(해시) 및 생성 정보 (마지막에 기록)
+#
+# 후보 테이블은 np.load(mmap_mode='r') 로 열기 때문에 gunicorn 워커들이 같은 페이지 캐시를 공유하고,
+# 런타임에는 df_learning.csv 파싱과 label_encoder.pkl 언피클이 필요 없다.
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from catboost import CatBoostClassifier
+
+logger = logging.getLogger(__name__)
+
+# 현재 파일(artifacts.py)의 디렉토리 기준으로 경로 설정
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+model_path = os.path.join(BASE_DIR, 'catboost_model.cbm')
+label_path = os.path.join(BASE_DIR, 'label_encoder.pkl')
+csv_path = os.path.join(BASE_DIR, 'df_learning.csv')
+
+ARTIFACT_DIR = os.getenv('RECOMMEND_ARTIFACT_DIR', os.path.join(BASE_DIR, 'artifacts'))
+
+MODEL_FILE = 'model.cbm'
+META_FILE = 'meta.json'
+CANDIDATE_FILES = {
+    'index': 'candidates_index.npy',
+    'VISIT_AREA_NM': 'candidates_name.npy',
+    'VISIT_AREA_TYPE_CD': 'candidates_type_cd.npy',
+    'VISIT_AREA_NM_CODE': 'candidates_name_code.npy',
+}
+
+
+# 로드된 번들 (모델 + 후보 테이블 + 버전)
+# 요청 처리 중에는 번들 하나를 잡고 끝까지 사용하므로 필드는 로드 이후 바뀌지 않는다.
+class ArtifactBundle:
+    def __init__(self, model, candidates, version, path=None, meta=None):
+        self.model = model
+        self.candidates = candidates
+        self.version = version
+        self.path = path
+        self.meta = meta or {}
+        self.derived = {}  # 번들에서 파생된 값 캐시 (점수 백엔드용 전처리 등)
+
+    def __len__(self):
+        return len(self.candidates['index'])
+
+
+def _file_hash(*paths):
+    digest = hashlib.sha1()
+    for path in paths:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+# df_learning 에서 후보 여행지 테이블 생성 (중복 제거 + 레이블 인코딩)
+def build_candidate_table(df, encoder):
+    destinations = df[['VISIT_AREA_NM', 'VISIT_AREA_TYPE_CD']].drop_duplicates()
+    return {
+        'index': destinations.index.to_numpy(dtype=np.int64),
+        'VISIT_AREA_NM': destinations['VISIT_AREA_NM'].to_numpy(dtype=str),
+        'VISIT_AREA_TYPE_CD': destinations['VISIT_AREA_TYPE_CD'].to_numpy(dtype=np.int64),
+        'VISIT_AREA_NM_CODE': encoder.transform(destinations['VISIT_AREA_NM']).astype(np.int64),
+    }
+
+
+def _load_sources(src_model_path, src_label_path, src_csv_path):
+    if not os.path.exists(src_model_path):
+        raise FileNotFoundError(f"모델 파일이 존재하지 않습니다: {src_model_path}")
+
+    with open(src_label_path, 'rb') as f:
+        le = pickle.load(f)
+    df_learning = pd.read_csv(src_csv_path)
+    return build_candidate_table(df_learning, le)
+
+
+# 원본(모델, 레이블 인코더, df_learning.csv)으로부터 번들 디렉토리 생성
+def build_bundle(out_dir=ARTIFACT_DIR, src_model_path=model_path, src_label_path=label_path,
+                 src_csv_path=csv_path):
+    candidates = _load_sources(src_model_path, src_label_path, src_csv_path)
+    version = _file_hash(src_model_path, src_label_path, src_csv_path)
+
+    os.makedirs(out_dir, exist_ok=True)
+    # meta.json 이 마지막에 쓰이므로, 중간에 읽는 쪽은 이전 meta 를 보거나 번들이 없다고 판단한다.
+    meta_path = os.path.join(out_dir, META_FILE)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    for key, filename in CANDIDATE_FILES.items():
+        tmp_path = os.path.join(out_dir, filename + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.save(f, candidates[key])
+        os.replace(tmp_path, os.path.join(out_dir, filename))
+
+    tmp_model = os.path.join(out_dir, MODEL_FILE + '.tmp')
+    shutil.copyfile(src_model_path, tmp_model)
+    os.replace(tmp_model, os.path.join(out_dir, MODEL_FILE))
+
+    meta = {
+        'version': version,
+        'n_candidates': len(candidates['index']),
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+    }
+    with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(meta_path + '.tmp', meta_path)
+
+    logger.info(f"추천 번들 생성 완료: {out_dir} (version={version}, 후보 {meta['n_candidates']}개)")
+    return meta
+
+
+def _load_model(path):
+    model = CatBoostClassifier()
+    model.load_model(path)
+    return model
+
+
+# 번들 디렉토리 로드 (후보 테이블은 읽기 전용 mmap)
+def load_bundle(bundle_dir=ARTIFACT_DIR):
+    with open(os.path.join(bundle_dir, META_FILE), encoding='utf-8') as f:
+        meta = json.load(f)
+
+    candidates = {
+        key: np.load(os.path.join(bundle_dir, filename), mmap_mode='r')
+        for key, filename in CANDIDATE_FILES.items()
+    }
+    model = _load_model(os.path.join(bundle_dir, MODEL_FILE))
+    return ArtifactBundle(model, candidates, meta['version'], path=bundle_dir, meta=meta)
+
+
+# 번들이 준비되지 않은 환경(로컬 개발 등)용: 원본 파일에서 바로 메모리에 로드
+def load_from_sources():
+    logger.warning("추천 번들이 없어 원본 파일에서 로드합니다. (python -m ML.artifacts 로 번들을 생성하세요)")
+    candidates = _load_sources(model_path, label_path, csv_path)
+    version = _file_hash(model_path, label_path, csv_path)
+    return ArtifactBundle(_load_model(model_path), candidates, version)
+
+
+def bundle_exists(bundle_dir=ARTIFACT_DIR):
+    return os.path.exists(os.path.join(bundle_dir, META_FILE))
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    build_bundle(sys.argv[1] if len(sys.argv) > 1 else ARTIFACT_DIR)
@@ -0,0 +1,151 @@
+# inference.py
+# 추천 점수화 전용 실행기 (프로세스 내 공유)
+#
+# CatBoost 점수화는 max_workers 개의 전용 스레드에서만 실행하고, 요청 스레드는 결과를 기다리기만 한다.
+#   - 대기열 깊이 제한: 실행 중 + 대기 중 요청이 max_workers + max_queue 를 넘으면 바로 QueueFull (→ 429)
+#   - 요청별 기한: 기한 안에 결과가 없으면 DeadlineExceeded (→ 503)
+#     대기열에서 기한이 지난 작업은 실행하지 않고 버린다. (이미 응답을 포기한 요청에 CPU 를 쓰지 않도록)
+#     실행 중인 작업은 check_deadline() 을 중간중간 호출해서 기한이 지나면 스스로 멈춘다. (배치 추천의 청크 사이)
+# gunicorn gthread 워커의 다른 스레드는 점수화가 밀려 있어도 가벼운 API 를 계속 처리할 수 있다.
+# /recommend 와 /recommend/batch 는 서로 다른 실행기를 써서, 긴 배치가 단건 추천 대기열을 막지 않는다.
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from utils.metrics import recommend_stage_seconds
+from utils.profiler import attach_current_thread
+
+
+class QueueFull(Exception):
+    pass
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+# 실행기 스레드에서 실행 중인 작업의 기한 (time.monotonic 기준, 실행기 밖에서는 None)
+_deadline = contextvars.ContextVar('inference_deadline', default=None)
+
+
+# 실행 중인 작업의 기한이 지났으면 DeadlineExceeded (요청 쪽은 이미 503 을 받았으므로 남은 계산을 버림)
+def check_deadline():
+    deadline = _deadline.get()
+    if deadline is not None and time.monotonic() >= deadline:
+        raise DeadlineExceeded('실행 중 기한이 지나 작업을 중단했습니다.')
+
+
+class InferenceExecutor:
+    def __init__(self, max_workers=1, max_queue=8, timeout=10.0):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='inference')
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self.pending = 0  # 대기 + 실행 중
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.expired = 0  # 대기열에서 기한이 지나 실행하지 않은 작업
+        self.aborted = 0  # 실행 중 check_deadline 으로 중단한 작업
+
+    def _add(self, name, amount=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def _release(self, _future):
+        self._add('pending', -1)
+        self._slots.release()
+
+    def _call(self, submitted, deadline, fn, args, kwargs):
+        now = time.monotonic()
+        recommend_stage_seconds.observe(now - submitted, stage='queue_wait')
+        if now >= deadline:
+            self._add('expired')
+            raise DeadlineExceeded('대기열에서 기한이 지났습니다.')
+        self._add('running')
+        token = _deadline.set(deadline)
+        try:
+            with attach_current_thread():
+                return fn(*args, **kwargs)
+        except DeadlineExceeded:
+            self._add('aborted')
+            raise
+        finally:
+            _deadline.reset(token)
+            self._add('running', -1)
+
+    # fn(*args, **kwargs) 를 실행기에서 실행하고 결과를 기다린다. (timeout 초, None 이면 기본값)
+    def run(self, fn, *args, timeout=None, **kwargs):
+        timeout = self.timeout if timeout is None else timeout
+        if not self._slots.acquire(blocking=False):
+            self._add('rejected')
+            raise QueueFull('추천 요청이 많아 대기열이 가득 찼습니다. 잠시 후 다시 시도하세요.')
+
+        self._add('pending')
+        submitted = time.monotonic()
+        deadline = submitted + timeout
+        try:
+            # 요청 컨텍스트(프로파일러 등)를 실행기 스레드로 넘긴다.
+            context = contextvars.copy_context()
+            future = self._executor.submit(context.run, self._call, submitted, deadline, fn, args, kwargs)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            result = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeout:
+            future.cancel()  # 아직 시작 전이면 대기열에서 제거
+            self._add('timed_out')
+            raise DeadlineExceeded(f'추천 처리 시간이 {timeout}초를 넘었습니다.')
+        except DeadlineExceeded:
+            self._add('timed_out')
+            raise
+        except Exception:
+            self._add('failed')
+            raise
+        self._add('completed')
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'timeout': self.timeout,
+                'pending': self.pending,
+                'running': self.running,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'timed_out': self.timed_out,
+                'expired': self.expired,
+                'aborted': self.aborted,
+            }
+
+
+# 256MB / 0.3 CPU 컨테이너 기준: 점수화 스레드 1개 (CatBoost 자체 스레드는 RECOMMEND_THREAD_COUNT)
+inference_executor = InferenceExecutor(
+    max_workers=int(os.getenv('RECOMMEND_WORKERS', 1)),
+    max_queue=int(os.getenv('RECOMMEND_QUEUE_DEPTH', 8)),
+    timeout=float(os.getenv('RECOMMEND_DEADLINE', 10)),
+)
+
+# 배치 추천 기한 (초)
+BATCH_TIMEOUT = float(os.getenv('RECOMMEND_BATCH_DEADLINE', 60))
+
+# 배치 추천 전용 실행기: 한 번에 하나만 실행하고 대기열 없이 바로 429
+# (배치가 돌고 있어도 단건 추천은 inference_executor 에서 계속 처리된다)
+batch_executor = InferenceExecutor(
+    max_workers=1,
+    max_queue=int(os.getenv('RECOMMEND_BATCH_QUEUE_DEPTH', 0)),
+    timeout=BATCH_TIMEOUT,
+)
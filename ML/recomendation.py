@@ -1,50 +1,166 @@
 # recomendation.py
 import os
-from catboost import CatBoostClassifier
+import numpy as np
 import pandas as pd
-import pickle
+import logging
 
-# 현재 파일(recomendation.py)의 디렉토리 기준으로 경로 설정
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-model_path = os.path.join(BASE_DIR, 'catboost_model.cbm')
-label_path = os.path.join(BASE_DIR, 'label_encoder.pkl')
-csv_path = os.path.join(BASE_DIR, 'df_learning.csv')
+from ML.artifacts import ARTIFACT_DIR
+from ML.inference import check_deadline
+from ML.registry import ModelRegistry
+from ML.scoring import USER_FEATURES, cat_features_extended, build_feature_matrix, score_users
+from utils.cache import TTLCache
+from utils.metrics import recommend_stage_seconds
 
-# 파일 존재 여부 확인 (디버깅용)
-if not os.path.exists(model_path):
-    raise FileNotFoundError(f"모델 파일이 존재하지 않습니다: {model_path}")
+logger = logging.getLogger(__name__)
 
-model = CatBoostClassifier()
-model.load_model(model_path)
-with open(label_path, 'rb') as f:
-    le = pickle.load(f)
-df_learning = pd.read_csv(csv_path)
+# 프로필별 전체 후보 확률 벡터 캐시 (float32, 정규화된 프로필 기준)
+# 항목 하나가 약 45KB(후보 1.1만 개 × 4바이트)이므로 기본 256개 ≒ 12MB
+recommend_cache = TTLCache(maxsize=int(os.getenv('RECOMMEND_CACHE_SIZE', 256)),
+                           ttl=float(os.getenv('RECOMMEND_CACHE_TTL', 3600)))
+
+
+# 사용자 피처를 후보 여행지 전체에 한 번에 브로드캐스트하여 모델 입력 생성
+def build_prediction_frame(user_input, table):
+    user_row = np.array([[int(user_input[col]) for col in USER_FEATURES]], dtype=np.int64)
+    return pd.DataFrame(build_feature_matrix(user_row, table), columns=cat_features_extended)
+
+
+# 확률 벡터에서 상위 k 개 위치를 부분 정렬(argpartition)로 선택
+# 동점은 후보 테이블 순서를 따르므로 pandas nlargest(keep='first') 와 같은 순서가 된다.
+def _top_k(scores, k):
+    if k <= 0 or len(scores) == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(scores):
+        kth = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        above = np.flatnonzero(scores > kth)
+        ties = np.flatnonzero(scores == kth)[:k - len(above)]
+        positions = np.sort(np.concatenate([above, ties]))
+    else:
+        positions = np.arange(len(scores))
+    return positions[np.argsort(-scores[positions], kind='stable')]
+
+
+# 프로필 하나의 전체 확률 벡터(5.0 확률, float32)에 필터 / 정렬 / 페이지네이션 적용
+# 모델 호출 없이 top_n, threshold, 여행지 유형, offset 을 바꿔 가며 재사용할 수 있다.
+def select_recommendations(candidates, prob_5, top_n=10, threshold=0.7, type_codes=None, offset=0):
+    mask = prob_5 >= threshold
+    if type_codes:
+        mask &= np.isin(candidates['VISIT_AREA_TYPE_CD'], list(type_codes))
+    positions = np.flatnonzero(mask)
+
+    selected = positions[_top_k(prob_5[positions], offset + top_n)][offset:]
+    return pd.DataFrame({
+        'VISIT_AREA_NM': candidates['VISIT_AREA_NM'][selected],
+        'Probability': prob_5[selected].astype(np.float64)
+    }, index=candidates['index'][selected])
+
+
+# 모델 교체 전 검증용 카나리 프로필
+CANARY_PROFILE = {
+    'GENDER': 1, 'AGE_GRP': 30,
+    'TRAVEL_STYL_1': 4, 'TRAVEL_STYL_2': 4, 'TRAVEL_STYL_3': 4, 'TRAVEL_STYL_4': 4,
+    'TRAVEL_STYL_5': 4, 'TRAVEL_STYL_6': 4, 'TRAVEL_STYL_7': 4, 'TRAVEL_STYL_8': 4,
+    'TRAVEL_MOTIVE_1': 1, 'TRAVEL_COMPANIONS_NUM': 1, 'TRAVEL_MISSION_INT': 1
+}
+
+
+# 새 번들 워밍업: 카나리 프로필을 실제로 점수화해서 출력 형태를 검증
+# (첫 요청이 모델 초기화 비용을 떠안지 않도록 하는 역할도 겸한다)
+def warmup_bundle(bundle):
+    proba = bundle.model.predict_proba(build_prediction_frame(CANARY_PROFILE, bundle.candidates))
+    if proba.shape != (len(bundle), 5):
+        raise ValueError(f"카나리 예측 결과 형태가 올바르지 않습니다: {proba.shape}")
+    if not np.isfinite(proba).all() or not np.allclose(proba.sum(axis=1), 1.0, atol=1e-3):
+        raise ValueError("카나리 예측 확률이 올바르지 않습니다.")
+
+
+def _on_model_swap(old_bundle, new_bundle):
+    recommend_cache.clear()
+
+
+# 모델 / 후보 테이블은 import 시점이 아니라 첫 추천 요청에서 로드한다.
+# (gunicorn 워커가 바로 뜨고, 후보 테이블은 mmap 으로 워커 간 페이지를 공유)
+# RECOMMEND_WATCH_INTERVAL(초) 이 0보다 크면 번들 디렉토리를 감시해서 새 버전을 자동으로 교체한다.
+registry = ModelRegistry(ARTIFACT_DIR, warmup=warmup_bundle, on_swap=_on_model_swap)
+registry.start_watcher(float(os.getenv('RECOMMEND_WATCH_INTERVAL', 0)))
+
+
+def get_bundle():
+    return registry.get()
+
+
+# 모델 재로드 (background=False 이면 교체가 끝날 때까지 대기)
+def reload_model(background=True):
+    return registry.reload(background=background)
+
+
+# 캐시 키: 번들 버전 + 피처 순서로 정렬된 정수 프로필
+def _cache_key(bundle, user_input):
+    profile = tuple(int(user_input[col]) for col in USER_FEATURES)
+    return bundle.version, profile
+
+
+# 프로필의 전체 후보 확률 벡터 (캐시 우선, 없으면 모델 점수화)
+def score_profile(bundle, user_input):
+    key = _cache_key(bundle, user_input)
+    prob_5 = recommend_cache.get(key)
+    if prob_5 is None:
+        prob_5 = score_users(bundle, [key[1]])[0]  # 5.0 확률
+        prob_5.flags.writeable = False
+        recommend_cache.set(key, prob_5)
+    return prob_5
+
+
+# 확률 벡터가 캐시에 있으면 모델 호출 없이 바로 추천 (번들이 없거나 캐시에 없으면 None)
+# /recommend 는 이 경우 추론 대기열을 거치지 않고 요청 스레드에서 바로 처리한다.
+# 캐시는 잠금 안에서 get 한 번으로 조회하고 그 값을 그대로 쓰므로, 조회 직후 만료 / 모델 교체가 일어나도 안전하다.
+# miss 는 이어서 추론 실행기의 score_profile 이 한 번만 기록한다.
+def recommend_cached(user_input, top_n=10, threshold=0.7, type_codes=None, offset=0):
+    bundle = registry.peek()
+    if bundle is None:
+        return None
+    prob_5 = recommend_cache.get(_cache_key(bundle, user_input), record_miss=False)
+    if prob_5 is None:
+        return None
+    with recommend_stage_seconds.time(stage='topk'):
+        return select_recommendations(bundle.candidates, prob_5, top_n, threshold, type_codes, offset)
 
 
 # 추천 함수
-def recommend_top_destinations(user_input, top_n=10, threshold=0.7):
-    destinations = df_learning[['VISIT_AREA_NM', 'VISIT_AREA_TYPE_CD']].drop_duplicates()
-    destinations['VISIT_AREA_NM_CODE'] = le.transform(destinations['VISIT_AREA_NM'])
-
-    prediction_data = []
-    for _, row in destinations.iterrows():
-        combined_input = user_input.copy()
-        combined_input['VISIT_AREA_TYPE_CD'] = row['VISIT_AREA_TYPE_CD']
-        combined_input['VISIT_AREA_NM_CODE'] = row['VISIT_AREA_NM_CODE']
-        prediction_data.append(combined_input)
-
-    cat_features_extended = ['GENDER', 'AGE_GRP', 'TRAVEL_STYL_1', 'TRAVEL_STYL_2',
-                             'TRAVEL_STYL_3', 'TRAVEL_STYL_4', 'TRAVEL_STYL_5',
-                             'TRAVEL_STYL_6', 'TRAVEL_STYL_7', 'TRAVEL_STYL_8',
-                             'TRAVEL_MOTIVE_1', 'TRAVEL_COMPANIONS_NUM',
-                             'TRAVEL_MISSION_INT', 'VISIT_AREA_TYPE_CD', 'VISIT_AREA_NM_CODE']
-
-    prediction_df = pd.DataFrame(prediction_data, columns=cat_features_extended)
-    proba = model.predict_proba(prediction_df)
-    prob_5 = proba[:, 4]  # 5.0 확률
-
-    recommendations = pd.DataFrame({
-        'VISIT_AREA_NM': destinations['VISIT_AREA_NM'],
-        'Probability': prob_5
-    })
-    return recommendations[recommendations['Probability'] >= threshold].nlargest(top_n, 'Probability')
+def recommend_top_destinations(user_input, top_n=10, threshold=0.7, type_codes=None, offset=0):
+    bundle = get_bundle()
+    prob_5 = score_profile(bundle, user_input)
+    with recommend_stage_seconds.time(stage='topk'):
+        return select_recommendations(bundle.candidates, prob_5, top_n, threshold, type_codes, offset)
+
+
+# 배치 추천 시 한 번의 predict_proba 에 넣을 최대 행 수
+# (256MB 컨테이너 기준, 10만 행 ≒ 입력 12MB + CatBoost 내부 버퍼)
+BATCH_CHUNK_ROWS = int(os.getenv('RECOMMEND_BATCH_CHUNK_ROWS', 100_000))
+
+
+# 여러 사용자 프로필 × 후보 여행지를 하나의 피처 행렬로 쌓아 청크 단위로 예측
+# 청크는 프로필 경계에 맞춰 자르므로, 청크가 끝날 때마다 해당 프로필들의 top_n 을 바로 계산하고
+# 전체 확률 행렬은 메모리에 유지하지 않는다.
+# 청크마다 실행기 기한을 확인해서 기한이 지나면 남은 청크를 계산하지 않는다.
+# 결과는 recommend_cache 에 넣지 않는다. (배치 한 번이 단건 추천의 자주 쓰는 항목을 밀어내지 않도록)
+def recommend_top_destinations_batch(user_inputs, top_n=10, threshold=0.7, chunk_rows=None, type_codes=None):
+    chunk_rows = BATCH_CHUNK_ROWS if chunk_rows is None else chunk_rows
+    bundle = get_bundle()
+    candidates = bundle.candidates
+    n_dest = len(bundle)
+    profiles_per_chunk = max(1, chunk_rows // n_dest)
+
+    user_matrix = np.array([[int(user_input[col]) for col in USER_FEATURES] for user_input in user_inputs],
+                           dtype=np.int64).reshape(-1, len(USER_FEATURES))
+
+    results = []
+    for start in range(0, len(user_matrix), profiles_per_chunk):
+        check_deadline()
+        users = user_matrix[start:start + profiles_per_chunk]
+        prob_5 = score_users(bundle, users)  # (n_users × n_dest) 5.0 확률
+
+        for row in prob_5:
+            results.append(select_recommendations(candidates, row, top_n, threshold, type_codes))
+
+    return results
@@ -0,0 +1,134 @@
+# registry.py
+# 추천 모델 레지스트리: 번들 로드 → 워밍업/카나리 검증 → 원자적 교체
+#
+# 요청은 registry.get() 으로 번들 하나를 잡고 끝까지 사용하고,
+# 새 번들은 백그라운드 스레드에서 완전히 로드/검증된 뒤에만 참조가 교체되므로
+# 처리 중인 /recommend 요청이 절반만 로드된 상태를 볼 일은 없다.
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from ML.artifacts import META_FILE, bundle_exists, load_bundle, load_from_sources
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    def __init__(self, bundle_dir, warmup=None, on_swap=None):
+        self.bundle_dir = bundle_dir
+        self._warmup = warmup  # (bundle) -> None, 실패 시 예외
+        self._on_swap = on_swap  # (old_bundle, new_bundle) -> None
+        self._active = None
+        self._init_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self._watch_stop = threading.Event()
+        self.loaded_at = None
+        self.state = 'idle'
+        self.last_error = None
+        self._failed_version = None  # 검증에 실패한 디스크 버전 (감시 스레드가 반복 재시도하지 않도록)
+        self.history = []  # 최근 교체 이력
+
+    # 현재 활성 번들 (최초 호출 시 동기 로드)
+    def get(self):
+        if self._active is None:
+            with self._init_lock:
+                if self._active is None:
+                    self._swap(self._load(self.bundle_dir))
+        return self._active
+
+    # 현재 활성 번들 (아직 로드 전이면 None, 로드하지 않음)
+    def peek(self):
+        return self._active
+
+    def _load(self, bundle_dir):
+        if bundle_exists(bundle_dir):
+            bundle = load_bundle(bundle_dir)
+        elif bundle_dir == self.bundle_dir and self._active is None:
+            bundle = load_from_sources()
+        else:
+            raise FileNotFoundError(f"추천 번들이 존재하지 않습니다: {bundle_dir}")
+
+        started = time.perf_counter()
+        if self._warmup is not None:
+            self._warmup(bundle)
+        logger.info(f"추천 번들 워밍업 완료 (version={bundle.version}, {time.perf_counter() - started:.3f}s)")
+        return bundle
+
+    def _swap(self, bundle):
+        old = self._active
+        self._active = bundle
+        self.loaded_at = datetime.now().isoformat(timespec='seconds')
+        self.history = (self.history + [{'version': bundle.version, 'path': bundle.path,
+                                         'loaded_at': self.loaded_at}])[-10:]
+        if self._on_swap is not None:
+            self._on_swap(old, bundle)
+        logger.info(f"추천 모델 교체: {old.version if old else None} -> {bundle.version}")
+
+    def _reload(self):
+        try:
+            self.state = 'loading'
+            bundle = self._load(self.bundle_dir)
+            self._swap(bundle)
+            self.state = 'idle'
+            self.last_error = None
+        except Exception as e:
+            self.state = 'failed'
+            self.last_error = str(e)
+            self._failed_version = self._disk_version()
+            logger.error(f"추천 모델 재로드 실패 ({self.bundle_dir}): {e}")
+        finally:
+            self._reload_lock.release()
+
+    # bundle_dir 의 번들을 다시 로드. 이미 로드 중이면 False 반환
+    def reload(self, background=True):
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+
+        if background:
+            threading.Thread(target=self._reload, name='model-reload', daemon=True).start()
+        else:
+            self._reload()
+        return True
+
+    def _disk_version(self):
+        try:
+            with open(os.path.join(self.bundle_dir, META_FILE), encoding='utf-8') as f:
+                return json.load(f)['version']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _watch(self, interval):
+        while not self._watch_stop.wait(interval):
+            version = self._disk_version()
+            active = self._active
+            if (version and active is not None and version != active.version
+                    and version != self._failed_version and self.state != 'loading'):
+                logger.info(f"새 추천 번들 감지: {version}")
+                self.reload()
+
+    # bundle_dir/meta.json 의 버전을 주기적으로 확인해서 바뀌면 자동 재로드
+    def start_watcher(self, interval):
+        if self._watcher is not None or interval <= 0:
+            return
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), name='model-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._watch_stop.set()
+
+    def status(self):
+        active = self._active
+        return {
+            'active_version': active.version if active else None,
+            'active_path': active.path if active else None,
+            'n_candidates': len(active) if active else None,
+            'loaded_at': self.loaded_at,
+            'state': self.state,
+            'last_error': self.last_error,
+            'disk_version': self._disk_version(),
+            'history': list(self.history),
+        }
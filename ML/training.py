@@ -0,0 +1,353 @@
+# training.py
+# 학습 데이터(df_learning.csv) / 레이블 인코더(label_encoder.pkl) / CatBoost 모델(catboost_model.cbm) 재생성
+#
+#   python -m ML.training                  # 입력이 바뀐 단계만 다시 계산
+#   python -m ML.training --force          # 캐시를 무시하고 전부 다시 계산
+#   python -m ML.training --skip-model     # df_learning / label_encoder 까지만
+#   python -m ML.training --bundle         # 끝나면 추천 번들(python -m ML.artifacts)도 다시 생성
+#
+# ML/learning/*.ipynb 에서 손으로 하던 전처리를 그대로 옮긴 것이다.
+#   travel / traveller / visit_area : csv 읽기 (필요한 열만, 타입 지정)
+#   learning                        : 방문지 ← 여행 ← 여행객 병합, 결측 / 방문지 유형 필터, 방문지명 레이블 인코딩
+#   model                           : SMOTE 오버샘플링 → 학습 / 검증 / 테스트 분리 → CatBoost 학습
+# 단계 결과는 TRAIN_CACHE_DIR 에 저장하고, 키(입력 파일 내용 + 이전 단계 키 + 설정)가 같으면 다시 계산하지 않는다.
+#
+# 원본 csv 는 csv/ 의 *_all.csv 를 우선 사용하고, 없으면 지역별 파일(capital / east / west / jeju)을 합친다.
+# 방문지 정보(tn_visit_area_info_방문지정보_*.csv)는 용량 때문에 저장소에 없으므로 재학습 전에 받아 둔다.
+#   AI Hub(https://www.aihub.or.kr) '국내 여행로그 데이터'(수도권 / 동부권 / 서부권 / 제주도 및 도서 지역)에서
+#   여행 / 여행객 파일과 함께 제공되는 tn_visit_area_info_방문지정보_{A,B,C,D}.csv 를
+#   csv/{capital,east,west,jeju}/ 에 둔다. (여행 / 여행객 파일과 같은 위치)
+#
+# 저장소에 들어 있는 작은 표본(tests/fixtures/training)으로 전체 과정을 확인할 수 있다. (ML/ 산출물은 건드리지 않음)
+#   python -m ML.training --csv-dir tests/fixtures/training --output-dir /tmp/train --cache-dir /tmp/train/cache \
+#       --no-smote --iterations 20
+import argparse
+import glob
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from ML.artifacts import BASE_DIR, csv_path, label_path, model_path
+from ML.scoring import USER_FEATURES
+
+logger = logging.getLogger(__name__)
+
+CSV_DIR = os.getenv('TRAIN_CSV_DIR', os.path.join(os.path.dirname(BASE_DIR), 'csv'))
+CACHE_DIR = os.getenv('TRAIN_CACHE_DIR', os.path.join(BASE_DIR, '.train_cache'))
+STATE_FILE = 'stages.json'
+
+# 전처리 / 학습 방식이 바뀌면 올려서 기존 캐시를 무효화
+STAGE_VERSION = 1
+
+# 지역별 파일을 합치는 순서 (노트북과 같은 A → B → C → D, 후보 테이블 순서가 여기에 따라 정해짐)
+REGIONS = ['capital', 'east', 'west', 'jeju']
+
+SOURCES = {
+    'travel': {
+        'all': 'tn_visit_travel_all.csv',
+        'regional': 'tn_travel_여행_*.csv',
+        'dtype': {'TRAVEL_ID': 'str', 'TRAVELER_ID': 'str', 'TRAVEL_MISSION_CHECK': 'str'},
+    },
+    'traveller': {
+        'all': 'tn_visit_traveller_all.csv',
+        'regional': 'tn_traveller_master_여행객_Master_*.csv',
+        'dtype': dict({'TRAVELER_ID': 'str', 'GENDER': 'category'},
+                      **{column: 'float32' for column in USER_FEATURES[1:-1]}),
+    },
+    'visit_area': {
+        'all': 'tn_visit_area_all.csv',
+        'regional': 'tn_visit_area_info_방문지정보_*.csv',
+        'dtype': {'TRAVEL_ID': 'str', 'VISIT_AREA_NM': 'str', 'VISIT_AREA_TYPE_CD': 'float32', 'DGSTFN': 'float32'},
+    },
+}
+
+LEARNING_COLUMNS = USER_FEATURES + ['VISIT_AREA_NM', 'VISIT_AREA_TYPE_CD', 'DGSTFN']
+# 모델 피처 순서 (기존 catboost_model.cbm 과 같은 순서로 학습해야 교체해도 그대로 동작)
+MODEL_FEATURES = ['GENDER', 'AGE_GRP', 'TRAVEL_STYL_1', 'TRAVEL_STYL_2', 'TRAVEL_STYL_3',
+                  'TRAVEL_STYL_4', 'TRAVEL_STYL_5', 'TRAVEL_STYL_6', 'TRAVEL_STYL_7',
+                  'TRAVEL_STYL_8', 'TRAVEL_MOTIVE_1', 'VISIT_AREA_TYPE_CD',
+                  'TRAVEL_COMPANIONS_NUM', 'TRAVEL_MISSION_INT', 'VISIT_AREA_NM_CODE']
+VISIT_AREA_TYPES = range(1, 9)
+GENDER_CODES = {'남': 1, '여': 0}
+
+# cat_boost_final.ipynb 의 GridSearchCV 최적값
+MODEL_PARAMS = {
+    'iterations': 400,
+    'learning_rate': 0.1,
+    'depth': 8,
+    'l2_leaf_reg': 5,
+    'loss_function': 'MultiClass',
+    'eval_metric': 'Accuracy',
+    'random_seed': 42,
+    'early_stopping_rounds': 50,
+    'class_weights': {1.0: 1, 2.0: 1, 3.0: 2, 4.0: 1, 5.0: 1.5},
+}
+# 적은 만족도 클래스를 늘려 클래스 간 경계를 명확하게
+SMOTE_STRATEGY = {1.0: 2000, 2.0: 2000, 3.0: 6000}
+TEST_SIZE = 0.2
+RANDOM_STATE = 42
+
+
+def _file_digest(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _stage_key(name, *parts):
+    payload = json.dumps([name, STAGE_VERSION, *parts], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
+
+
+def _load_state(cache_dir=CACHE_DIR):
+    try:
+        with open(os.path.join(cache_dir, STATE_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_state(state, cache_dir=CACHE_DIR):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, STATE_FILE)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def _replace_atomic(path, write):
+    tmp_path = path + '.tmp'
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+# 원본 파일 목록: *_all.csv 가 있으면 그것만, 없으면 지역별 파일을 REGIONS 순서로
+def source_files(name, csv_dir=CSV_DIR):
+    spec = SOURCES[name]
+    all_path = os.path.join(csv_dir, spec['all'])
+    if os.path.exists(all_path):
+        return [all_path]
+    files = [path for region in REGIONS for path in sorted(glob.glob(os.path.join(csv_dir, region, spec['regional'])))]
+    if not files:
+        raise FileNotFoundError(f"{name} 원본 csv 가 없습니다: {all_path} 또는 {csv_dir}/<지역>/{spec['regional']}")
+    return files
+
+
+def read_source(name, files):
+    dtype = SOURCES[name]['dtype']
+    frames = [pd.read_csv(path, usecols=list(dtype), dtype=dtype, engine='c') for path in files]
+    df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+    if 'GENDER' in df:
+        # 지역별 파일마다 범주가 달라질 수 있으므로 합친 뒤 다시 범주형으로
+        df['GENDER'] = df['GENDER'].astype('category')
+    return df
+
+
+def _prepare_travel(df):
+    # 여행 목적(TRAVEL_MISSION_CHECK)은 최대 3개 중 맨 처음 1개만 사용
+    mission = df['TRAVEL_MISSION_CHECK'].str.split(';', n=1).str[0]
+    return pd.DataFrame({
+        'TRAVEL_ID': df['TRAVEL_ID'],
+        'TRAVELER_ID': df['TRAVELER_ID'],
+        'TRAVEL_MISSION_INT': pd.to_numeric(mission, errors='coerce').astype('float32'),
+    })
+
+
+# 병합 → 결측 / 방문지 유형 필터 → 방문지명 레이블 인코딩
+def build_learning(travel, traveller, visit_area):
+    from sklearn.preprocessing import LabelEncoder
+
+    df = visit_area.merge(travel, how='left', on='TRAVEL_ID', validate='many_to_one')
+    df = df.merge(traveller, how='left', on='TRAVELER_ID', validate='many_to_one')
+    df = df[LEARNING_COLUMNS].dropna()
+    df = df[df['VISIT_AREA_TYPE_CD'].isin(VISIT_AREA_TYPES) & df['GENDER'].isin(list(GENDER_CODES))]
+
+    df_learning = pd.DataFrame({
+        'GENDER': df['GENDER'].map(GENDER_CODES).astype('int32'),
+        **{column: df[column].astype('int32') for column in USER_FEATURES[1:]},
+        'VISIT_AREA_NM': df['VISIT_AREA_NM'],
+        'VISIT_AREA_TYPE_CD': df['VISIT_AREA_TYPE_CD'].astype('int32'),
+        'DGSTFN': df['DGSTFN'].astype('float64'),
+    }).reset_index(drop=True)
+
+    # LabelEncoder 의 classes_ 는 정렬된 고유값이므로 같은 순서의 범주형 코드와 동일
+    encoder = LabelEncoder().fit(df_learning['VISIT_AREA_NM'].to_numpy(dtype=object))
+    df_learning['VISIT_AREA_NM_CODE'] = pd.Categorical(
+        df_learning['VISIT_AREA_NM'], categories=encoder.classes_).codes.astype('int32')
+    return df_learning, encoder
+
+
+def _resample(X, y, smote):
+    if not smote:
+        return X, y
+    try:
+        from imblearn.over_sampling import SMOTE
+    except ImportError:
+        raise RuntimeError("SMOTE 에 imbalanced-learn 이 필요합니다. (pip install imbalanced-learn 또는 --no-smote)")
+
+    strategy = {label: max(count, int((y == label).sum())) for label, count in SMOTE_STRATEGY.items()}
+    X_resampled, y_resampled = SMOTE(sampling_strategy=strategy, random_state=RANDOM_STATE).fit_resample(X, y)
+    return np.round(X_resampled).astype('int32'), y_resampled
+
+
+# SMOTE → 학습 / 테스트 분리 → 학습에서 검증 셋 분리 (early stopping) → 학습, 테스트 정확도 반환
+def train_model(df_learning, params, smote=True, thread_count=-1):
+    from catboost import CatBoostClassifier
+    from sklearn.model_selection import train_test_split
+
+    X = df_learning[MODEL_FEATURES].astype('int32')
+    y = df_learning['DGSTFN']
+    X, y = _resample(X, y, smote)
+
+    X_train_full, X_test, y_train_full, y_test = train_test_split(X, y, test_size=TEST_SIZE,
+                                                                  random_state=RANDOM_STATE)
+    X_train, X_val, y_train, y_val = train_test_split(X_train_full, y_train_full, test_size=TEST_SIZE,
+                                                      random_state=RANDOM_STATE)
+
+    model = CatBoostClassifier(cat_features=MODEL_FEATURES, thread_count=thread_count, verbose=100,
+                               allow_writing_files=False, **params)
+    model.fit(X_train, y_train, eval_set=(X_val, y_val))
+
+    accuracy = float((model.predict(X_test).ravel() == y_test.to_numpy()).mean())
+    return model, {'test_accuracy': round(accuracy, 4), 'train_rows': len(X_train),
+                   'best_iteration': model.get_best_iteration()}
+
+
+# output_dir 를 주면 산출물 세 파일을 ML/ 대신 그 디렉토리에 기록 (표본 데이터로 확인할 때)
+class Pipeline:
+    def __init__(self, force=False, csv_dir=CSV_DIR, cache_dir=CACHE_DIR, output_dir=None):
+        self.force = force
+        self.csv_dir = csv_dir
+        self.cache_dir = cache_dir
+        self.csv_path, self.label_path, self.model_path = (
+            (csv_path, label_path, model_path) if output_dir is None else
+            tuple(os.path.join(output_dir, os.path.basename(path)) for path in (csv_path, label_path, model_path)))
+        if output_dir is not None:
+            os.makedirs(output_dir, exist_ok=True)
+        self.state = _load_state(cache_dir)
+        self.report = []
+
+    def _cached(self, name, key, outputs):
+        entry = self.state.get(name, {})
+        return not self.force and entry.get('key') == key and all(os.path.exists(path) for path in outputs)
+
+    def _record(self, name, key, started, **info):
+        elapsed = round(time.perf_counter() - started, 3)
+        self.state[name] = dict(info, key=key, seconds=elapsed,
+                                created_at=datetime.now().isoformat(timespec='seconds'))
+        _save_state(self.state, self.cache_dir)
+        self.report.append((name, key, 'built', elapsed))
+        logger.info(f'{name}: 생성 ({elapsed}초, key={key})')
+
+    def _skip(self, name, key):
+        self.report.append((name, key, 'cached', 0.0))
+        logger.info(f'{name}: 캐시 사용 (key={key})')
+
+    # 캐시 파일(pickle)로 저장되는 단계
+    def frame_stage(self, name, key, compute):
+        path = os.path.join(self.cache_dir, f'{name}.pkl')
+        if self._cached(name, key, [path]):
+            self._skip(name, key)
+            return pd.read_pickle(path)
+
+        started = time.perf_counter()
+        value = compute()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        _replace_atomic(path, lambda tmp: pd.to_pickle(value, tmp))
+        rows = len(value[0] if isinstance(value, tuple) else value)
+        self._record(name, key, started, rows=rows)
+        return value
+
+    def source(self, name):
+        files = source_files(name, self.csv_dir)
+        key = _stage_key(name, [(os.path.basename(path), _file_digest(path)) for path in files])
+        if name == 'travel':
+            return self.frame_stage(name, key, lambda: _prepare_travel(read_source(name, files))), key
+        return self.frame_stage(name, key, lambda: read_source(name, files)), key
+
+    # df_learning.csv / label_encoder.pkl 까지
+    def learning(self):
+        (travel, travel_key), (traveller, traveller_key), (visit_area, visit_area_key) = (
+            self.source('travel'), self.source('traveller'), self.source('visit_area'))
+        key = _stage_key('learning', travel_key, traveller_key, visit_area_key)
+        df_learning, encoder = self.frame_stage(
+            'learning', key, lambda: build_learning(travel, traveller, visit_area))
+
+        # 산출물은 단계 키가 바뀌었거나 파일이 없을 때만 다시 기록 (번들 버전 해시가 불필요하게 바뀌지 않도록)
+        if self._cached('learning_outputs', key, [self.csv_path, self.label_path]):
+            self._skip('learning_outputs', key)
+        else:
+            started = time.perf_counter()
+            _replace_atomic(self.csv_path, lambda tmp: df_learning.to_csv(tmp, index=False))
+            _replace_atomic(self.label_path, lambda tmp: _dump_pickle(encoder, tmp))
+            self._record('learning_outputs', key, started, rows=len(df_learning),
+                         destinations=len(encoder.classes_))
+        return df_learning, key
+
+    def model(self, df_learning, learning_key, params=MODEL_PARAMS, smote=True, thread_count=-1):
+        key = _stage_key('model', learning_key, MODEL_FEATURES, params, smote, TEST_SIZE, RANDOM_STATE)
+        if self._cached('model', key, [self.model_path]):
+            self._skip('model', key)
+            return self.state['model']
+
+        started = time.perf_counter()
+        model, scores = train_model(df_learning, params, smote=smote, thread_count=thread_count)
+        _replace_atomic(self.model_path, lambda tmp: model.save_model(tmp))
+        self._record('model', key, started, **scores)
+        return self.state['model']
+
+
+def _dump_pickle(value, path):
+    with open(path, 'wb') as f:
+        pickle.dump(value, f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='학습 데이터 / 레이블 인코더 / CatBoost 모델 재생성')
+    parser.add_argument('--force', action='store_true', help='단계 캐시를 무시하고 전부 다시 계산')
+    parser.add_argument('--skip-model', action='store_true', help='df_learning / label_encoder 까지만 생성')
+    parser.add_argument('--no-smote', action='store_true', help='SMOTE 오버샘플링 없이 학습')
+    parser.add_argument('--iterations', type=int, default=MODEL_PARAMS['iterations'])
+    parser.add_argument('--thread-count', type=int, default=-1)
+    parser.add_argument('--bundle', action='store_true', help='끝나면 추천 번들(ML/artifacts)도 다시 생성')
+    parser.add_argument('--csv-dir', default=CSV_DIR)
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--output-dir', help='산출물 디렉토리 (기본: ML/, 표본 데이터 확인용)')
+    args = parser.parse_args(argv)
+    if args.bundle and args.output_dir:
+        parser.error('--bundle 은 ML/ 산출물로만 만들 수 있습니다. (--output-dir 와 함께 사용 불가)')
+
+    pipeline = Pipeline(force=args.force, csv_dir=args.csv_dir, cache_dir=args.cache_dir, output_dir=args.output_dir)
+    try:
+        df_learning, learning_key = pipeline.learning()
+        if not args.skip_model:
+            params = dict(MODEL_PARAMS, iterations=args.iterations)
+            result = pipeline.model(df_learning, learning_key, params, smote=not args.no_smote,
+                                    thread_count=args.thread_count)
+            logger.info(f"테스트 정확도: {result.get('test_accuracy')}")
+    except Exception:
+        logger.exception('학습 파이프라인 실패')
+        return 1
+
+    for name, key, status, elapsed in pipeline.report:
+        print(f'{name:<18} {status:<7} {elapsed:>9.3f}s  {key}')
+
+    if args.bundle:
+        from ML.artifacts import build_bundle
+        build_bundle()
+    return 0
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
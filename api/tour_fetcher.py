@@ -0,0 +1,177 @@
+# tour_fetcher.py
+# 한국관광공사 TourAPI 페이지 병렬 수집기
+#
+# get_tour(api/tour_spot.py) 와 update_tour_data(elastic/update_spot.py) 가 공통으로 사용한다.
+#   - 커넥션 풀을 쓰는 requests.Session 하나로 여러 페이지를 스레드 풀에서 동시에 요청
+#   - 토큰 버킷으로 초당 요청 수 제한 (고정 sleep 대신)
+#   - 실패한 페이지는 버리지 않고 지수 백오프로 재시도, 끝내 실패한 페이지는 metrics 에 기록
+#   - 진행 상황 / 처리량 로그 및 metrics 제공
+# base_url 은 TOUR_API_BASE_URL 로 바꿀 수 있어 로컬 스텁 서버를 상대로도 실행할 수 있다.
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.metrics import tour_api_request_seconds
+
+logger = logging.getLogger(__name__)
+
+TOUR_API_BASE_URL = os.getenv('TOUR_API_BASE_URL', 'http://apis.data.go.kr/B551011/KorService1')
+
+# 재시도할 HTTP 상태 코드
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TourFetchError(Exception):
+    pass
+
+
+# 초당 rate 개의 토큰이 채워지고 최대 capacity 개까지 쌓이는 토큰 버킷
+class TokenBucket:
+    def __init__(self, rate, capacity=None, timer=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, rate))
+        self._timer = timer
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = timer()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = self._timer()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+
+
+class TourApiFetcher:
+    def __init__(self, operation, params, num_of_rows=200, max_workers=4, rate=5.0, max_retries=5,
+                 backoff=1.0, timeout=10, base_url=None, session=None, sleep=time.sleep):
+        self.url = f"{(base_url or TOUR_API_BASE_URL).rstrip('/')}/{operation}"
+        self.params = dict(params)
+        self.num_of_rows = num_of_rows
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.bucket = TokenBucket(rate, sleep=sleep)
+        self._sleep = sleep
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        self.session = session
+
+        self._metrics_lock = threading.Lock()
+        self.metrics = {}
+
+    def _record(self, key, amount=1):
+        with self._metrics_lock:
+            self.metrics[key] = self.metrics.get(key, 0) + amount
+
+    # 요청 1회 (소요 시간을 상태 코드별로 기록)
+    def _get(self, params):
+        started = time.perf_counter()
+        status = 'error'
+        try:
+            response = self.session.get(self.url, params=params, timeout=self.timeout)
+            status = str(response.status_code)
+            return response
+        except requests.exceptions.RequestException as e:
+            status = type(e).__name__
+            raise
+        finally:
+            tour_api_request_seconds.observe(time.perf_counter() - started, status=status)
+
+    # 페이지 하나 요청 (재시도 포함). 응답 body 를 반환
+    def fetch_page(self, page):
+        params = dict(self.params, numOfRows=self.num_of_rows, pageNo=page)
+
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            try:
+                response = self._get(params)
+                if response.status_code in RETRY_STATUS:
+                    raise requests.exceptions.HTTPError(f"HTTP {response.status_code}", response=response)
+                response.raise_for_status()
+                # 인증키 오류 등은 200 + XML 로 내려오므로 JSON 파싱 실패도 재시도 대상
+                return response.json()['response']['body']
+            except (requests.exceptions.RequestException, ValueError, KeyError, TypeError) as e:
+                if attempt == self.max_retries:
+                    raise TourFetchError(f"페이지 {page} 요청 실패 ({attempt + 1}회 시도): {e}") from e
+                self._record('retries')
+                delay = self.backoff * (2 ** attempt)
+                logger.warning(f"페이지 {page} 요청 실패, {delay:.1f}초 후 재시도 ({attempt + 1}/{self.max_retries}): {e}")
+                self._sleep(delay)
+
+    @staticmethod
+    def extract_items(body):
+        items = body.get('items')
+        # 결과가 없으면 items 가 빈 문자열, 한 건이면 item 이 dict 로 내려온다.
+        if not isinstance(items, dict):
+            return []
+        item = items.get('item', [])
+        return [item] if isinstance(item, dict) else list(item)
+
+    # 페이지 하나 요청 → 항목 추출 → transform (워커 스레드에서 실행)
+    def _fetch_items(self, page, transform, body=None):
+        items = self.extract_items(self.fetch_page(page) if body is None else body)
+        return transform(items) if transform is not None else items
+
+    # 전체 페이지 수집. transform(items) 이 주어지면 페이지 단위로 적용한다.
+    # 2페이지부터는 요청과 transform 을 모두 워커 스레드에서 실행하고, 호출 스레드는 결과만 모은다.
+    # (1페이지는 전체 페이지 수를 알아야 하므로 호출 스레드에서 처리)
+    # 반환값은 페이지 순서대로 이어 붙인 항목 목록
+    def fetch_all(self, transform=None):
+        started = time.perf_counter()
+        self.metrics = {'pages_total': 0, 'pages_done': 0, 'items': 0, 'retries': 0, 'failed_pages': []}
+
+        first = self.fetch_page(1)
+        total_count = int(first.get('totalCount', 0))
+        total_pages = max(1, math.ceil(total_count / self.num_of_rows))
+        self.metrics['total_count'] = total_count
+        self.metrics['pages_total'] = total_pages
+        logger.info(f"총 데이터 수: {total_count} (페이지 {total_pages})")
+
+        results = {}
+
+        def handle(page, items):
+            results[page] = items
+            self._record('pages_done')
+            self._record('items', len(items))
+            logger.info(f"페이지 {page} 처리 완료 ({self.metrics['pages_done']} / {total_pages})")
+
+        handle(1, self._fetch_items(1, transform, first))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='tour-fetch') as executor:
+            futures = {executor.submit(self._fetch_items, page, transform): page
+                       for page in range(2, total_pages + 1)}
+            for future in as_completed(futures):
+                page = futures[future]
+                try:
+                    handle(page, future.result())
+                except TourFetchError as e:
+                    logger.error(str(e))
+                    self.metrics['failed_pages'].append(page)
+
+        elapsed = time.perf_counter() - started
+        self.metrics['elapsed'] = round(elapsed, 3)
+        self.metrics['pages_per_sec'] = round(self.metrics['pages_done'] / elapsed, 2) if elapsed else None
+        self.metrics['items_per_sec'] = round(self.metrics['items'] / elapsed, 2) if elapsed else None
+        self.metrics['failed_pages'].sort()
+        logger.info(f"수집 완료: {self.metrics}")
+
+        return [item for page in sorted(results) for item in results[page]]
@@ -2,13 +2,27 @@ from elastic.delete_elastic_index import delete_elasticsearch_index
 from elastic.diary_elastic import create_diary_index
 from elastic.tour_to_elastic import send_to_elastic
 # app.py
-from flask import Flask, request, jsonify, render_template
+import hmac
+import os
+import time
+from functools import wraps
+
+from flask import Flask, Response, g, request, jsonify, render_template
 from flask_cors import CORS
 from apscheduler.schedulers.background import BackgroundScheduler
-from ML.recomendation import recommend_top_destinations
+from jobs import sync_runner
+from ML.inference import DeadlineExceeded, QueueFull, batch_executor, inference_executor
+from ML.recomendation import (get_bundle, recommend_cache, recommend_cached, recommend_top_destinations,
+                              recommend_top_destinations_batch, registry)
 import logging
 
-from elastic.update_spot import update_tour_data
+from elastic.diary_search import CursorExpired, search_diaries
+from elastic.spot_geo import nearby_spots, tile_cache, tile_spots
+from elastic.spot_mapping import enrich_recommendations, mapping_status
+from elastic.spot_search import search_cache, search_spots
+from utils import metrics
+from utils.metrics import http_request_seconds, recommend_stage_seconds
+from utils.profiler import SamplingProfiler, load_profile, profiling_requested
 
 # 로깅 설정
 logging.basicConfig(
@@ -21,11 +35,104 @@ app = Flask(__name__)
 CORS(app)
 
 # 스케줄러 설정
-scheduler = BackgroundScheduler()
+# 야간 동기화는 기본적으로 별도 실행기(python -m jobs.sync_runner, docker-compose 의 runner 서비스)가 담당한다.
+# 실행기 없이 돌릴 때만 ENABLE_APP_SCHEDULER=true 로 앱 안에서 예약하며, 이때도 동기화는 파일 잠금을 잡은
+# 자식 프로세스에서 실행되므로 워커가 여러 개여도 한 번만 돈다.
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+FALSE_VALUES = ('0', 'false', 'no', 'off')
+
+
+# 요청 / 환경 변수의 불리언 값 ("false" 같은 문자열도 처리, 알 수 없는 값이면 ValueError)
+def parse_bool(value, default=False):
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError(f"불리언 값이 아닙니다: {value}")
+
+
+ENABLE_APP_SCHEDULER = parse_bool(os.getenv('ENABLE_APP_SCHEDULER'), False)
+scheduler = None
+if ENABLE_APP_SCHEDULER:
+    scheduler = BackgroundScheduler()
+    sync_runner.add_schedule(scheduler)  # 매일 새벽 3시 실행
+    scheduler.start()
+
+# 동기화는 다른 프로세스에서 실행되므로 새로 기록된 실행을 이 프로세스에 반영한다.
+# (바뀐 여행지가 들어 있는 타일 캐시 삭제, 작업 지표 반영 - jobs/sync_runner.py 의 apply_run)
+# 검색 캐시는 TTL 이 짧아서 따로 비우지 않는다.
+SYNC_CHECK_INTERVAL = 30.0
+
+
+def _last_finished(entries):
+    return max((entry['finished_at'] for entry in entries if entry.get('finished_at')), default=None)
+
+
+_sync_check = {'checked_at': 0.0, 'mtime': sync_runner.history_mtime(),
+               'finished_at': _last_finished(sync_runner.read_history())}
+
 
-# 스케줄링 작업 추가 (매일 새벽 3시 실행)
-scheduler.add_job(update_tour_data, 'cron', hour=3, minute=0)  # 매일 새벽 3시 실행
-scheduler.start()
+def apply_sync_runs():
+    now = time.monotonic()
+    if now - _sync_check['checked_at'] < SYNC_CHECK_INTERVAL:
+        return
+    _sync_check['checked_at'] = now
+    mtime = sync_runner.history_mtime()
+    if mtime == _sync_check['mtime']:
+        return
+    _sync_check['mtime'] = mtime
+
+    previous = _sync_check['finished_at']
+    runs = [entry for entry in sync_runner.read_history(limit=None)
+            if entry.get('finished_at') and (previous is None or entry['finished_at'] > previous)]
+    if not runs:
+        return
+    _sync_check['finished_at'] = _last_finished(runs)
+    for run in runs:
+        removed = sync_runner.apply_run(run)
+        logger.info(f"동기화 반영 ({run.get('status')}, {run.get('finished_at')}): "
+                    f"{'타일 캐시 전체 삭제' if removed is None else f'타일 캐시 {removed}개 삭제'}")
+
+
+# 요청 처리 시간 기록 + X-Profile 헤더가 있으면 샘플링 프로파일러 시작 (PROFILE_ENABLED 일 때만)
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    apply_sync_runs()
+    g.profiler = SamplingProfiler().start() if profiling_requested(request.headers) else None
+
+
+@app.after_request
+def record_request_metrics(response):
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.stop()
+        try:
+            profiler.save()
+            response.headers['X-Profile-Id'] = profiler.id
+            response.headers['X-Profile-Samples'] = str(profiler.samples)
+        except OSError as e:
+            logger.error(f'프로파일 저장 실패: {e}')
+
+    started = g.pop('request_started', None)
+    if started is not None:
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        http_request_seconds.observe(time.perf_counter() - started, endpoint=endpoint, method=request.method,
+                                     status=str(response.status_code))
+    return response
+
+
+# 처리되지 않은 예외로 after_request 가 건너뛰어진 경우에도 프로파일러 스레드는 정리
+@app.teardown_request
+def stop_profiler(_exc):
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.stop()
 
 
 # 홈 페이지
@@ -34,43 +141,277 @@ def index():
     return render_template('index.html')
 
 
+# 추천 모델 입력 피처
+USER_INPUT_FIELDS = [
+    'GENDER', 'AGE_GRP',
+    'TRAVEL_STYL_1', 'TRAVEL_STYL_2', 'TRAVEL_STYL_3', 'TRAVEL_STYL_4',
+    'TRAVEL_STYL_5', 'TRAVEL_STYL_6', 'TRAVEL_STYL_7', 'TRAVEL_STYL_8',
+    'TRAVEL_MOTIVE_1', 'TRAVEL_COMPANIONS_NUM', 'TRAVEL_MISSION_INT'
+]
+
+# 배치 추천 한 번에 받을 수 있는 최대 프로필 수
+# 프로필당 점수화 ≒ 0.068초(1 CPU) → 배포 환경(0.3 CPU)에서 ≒ 0.23초이므로
+# 200개 ≒ 46초로 배치 기한(RECOMMEND_BATCH_DEADLINE=60초) 안에 끝난다.
+MAX_BATCH_PROFILES = int(os.getenv('RECOMMEND_BATCH_MAX_PROFILES', 200))
+# /recommend 한 번에 받을 수 있는 최대 추천 수 (limit / top_n)
+MAX_RECOMMEND_LIMIT = 100
+
+
+# 클라이언트 JSON → 모델 입력 (정수 변환)
+def parse_user_input(data):
+    return {field: int(data[field]) for field in USER_INPUT_FIELDS}
+
+
+# 추론 대기열이 가득 찼을 때 (429 + Retry-After)
+def queue_full_response(e, executor=None):
+    executor = inference_executor if executor is None else executor
+    response = jsonify({'status': 'error', 'message': str(e)})
+    response.headers['Retry-After'] = str(max(1, int(executor.timeout)))
+    return response, 429
+
+
+# 추론 기한 초과 (503)
+def deadline_response(e):
+    return jsonify({'status': 'error', 'message': str(e)}), 503
+
+
 # 추천 API
 @app.route('/recommend', methods=['POST'])
 def get_recommendations():
     try:
-        # 클라이언트에서 보낸 JSON 데이터 받기
-        data = request.get_json()
-        logging.info(data)
-
-        # 입력 데이터 파싱
-        user_input = {
-            'GENDER': int(data['GENDER']),
-            'AGE_GRP': int(data['AGE_GRP']),
-            'TRAVEL_STYL_1': int(data['TRAVEL_STYL_1']),
-            'TRAVEL_STYL_2': int(data['TRAVEL_STYL_2']),
-            'TRAVEL_STYL_3': int(data['TRAVEL_STYL_3']),
-            'TRAVEL_STYL_4': int(data['TRAVEL_STYL_4']),
-            'TRAVEL_STYL_5': int(data['TRAVEL_STYL_5']),
-            'TRAVEL_STYL_6': int(data['TRAVEL_STYL_6']),
-            'TRAVEL_STYL_7': int(data['TRAVEL_STYL_7']),
-            'TRAVEL_STYL_8': int(data['TRAVEL_STYL_8']),
-            'TRAVEL_MOTIVE_1': int(data['TRAVEL_MOTIVE_1']),
-            'TRAVEL_COMPANIONS_NUM': int(data['TRAVEL_COMPANIONS_NUM']),
-            'TRAVEL_MISSION_INT': int(data['TRAVEL_MISSION_INT'])
-        }
+        with recommend_stage_seconds.time(stage='parse'):
+            # 클라이언트에서 보낸 JSON 데이터 받기
+            data = request.get_json()
+            logging.info(data)
+
+            # 입력 데이터 파싱
+            user_input = parse_user_input(data)
+
+            # 필터 / 페이지네이션 (전체 확률 벡터가 캐시되어 있으면 모델 호출 없이 처리)
+            limit = int(data.get('limit', data.get('top_n', 10)))
+            offset = int(data.get('offset', 0))
+            if offset < 0 or not 1 <= limit <= MAX_RECOMMEND_LIMIT:
+                return jsonify({'status': 'error',
+                                'message': f'offset 은 0 이상, limit 는 1 ~ {MAX_RECOMMEND_LIMIT} 사이여야 합니다.'}), 400
+            threshold = float(data.get('threshold', 0.7))
+            type_codes = [int(code) for code in data.get('type_codes', [])]
+            # 추천 여행지에 tour_spots 문서(이미지, 주소, 좌표 등)를 spot 필드로 추가
+            enrich = parse_bool(data.get('enrich'), True)
 
         logging.info('추천 진입')
-        # 추천 결과 생성
-        recs = recommend_top_destinations(user_input, top_n=10, threshold=0.7)
+        # 추천 결과 생성 (캐시에 없으면 추론 실행기에서 점수화, 대기열이 가득 차면 429 / 기한 초과면 503)
+        kwargs = dict(top_n=limit, threshold=threshold, type_codes=type_codes, offset=offset)
+        recs = recommend_cached(user_input, **kwargs)
+        if recs is None:
+            recs = inference_executor.run(recommend_top_destinations, user_input, **kwargs)
 
-        # 결과를 JSON으로 변환
+        # 결과를 JSON으로 변환 (serialize = to_dict + jsonify, enrich 는 따로 기록)
+        started = time.perf_counter()
         result = recs.to_dict(orient='records')
-        return jsonify({'status': 'success', 'recommendations': result})
+        serialize_seconds = time.perf_counter() - started
+        if enrich:
+            with recommend_stage_seconds.time(stage='enrich'):
+                enrich_recommendations(result, get_bundle())
+        started = time.perf_counter()
+        response = jsonify({'status': 'success', 'recommendations': result, 'offset': offset, 'limit': limit})
+        recommend_stage_seconds.observe(serialize_seconds + time.perf_counter() - started, stage='serialize')
+        return response
+
+    except QueueFull as e:
+        return queue_full_response(e)
+    except DeadlineExceeded as e:
+        return deadline_response(e)
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)})
+
+
+# 배치 추천 API (여러 프로필을 한 번에 점수화)
+@app.route('/recommend/batch', methods=['POST'])
+def get_batch_recommendations():
+    try:
+        data = request.get_json()
+        profiles = data['profiles']
+        if len(profiles) > MAX_BATCH_PROFILES:
+            return jsonify({'status': 'error',
+                            'message': f'profiles 는 최대 {MAX_BATCH_PROFILES}개까지 요청할 수 있습니다.'}), 400
+
+        top_n = int(data.get('top_n', 10))
+        threshold = float(data.get('threshold', 0.7))
+        type_codes = [int(code) for code in data.get('type_codes', [])]
+        enrich = parse_bool(data.get('enrich'), False)
+        user_inputs = [parse_user_input(profile) for profile in profiles]
+        logging.info(f'배치 추천 진입 (프로필 {len(user_inputs)}개)')
+
+        # 배치 전용 실행기 (단건 추천 대기열과 분리, 기한이 지나면 청크 사이에서 중단)
+        recs_list = batch_executor.run(recommend_top_destinations_batch, user_inputs, top_n=top_n,
+                                       threshold=threshold, type_codes=type_codes)
+
+        results = [{'recommendations': recs.to_dict(orient='records')} for recs in recs_list]
+        if enrich:
+            # 모든 프로필의 추천을 모아 mget 한 번으로 보강
+            enrich_recommendations([rec for result in results for rec in result['recommendations']], get_bundle())
+        return jsonify({'status': 'success', 'results': results})
 
+    except QueueFull as e:
+        return queue_full_response(e, batch_executor)
+    except DeadlineExceeded as e:
+        return deadline_response(e)
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)})
 
 
+# 추천 캐시 상태 (hit / miss / eviction)
+@app.route('/recommend/cache', methods=['GET'])
+def get_recommend_cache_stats():
+    return jsonify({'status': 'success', 'cache': recommend_cache.stats()})
+
+
+# 추론 실행기 상태 (대기 / 실행 중 / 거절 / 기한 초과)
+@app.route('/recommend/queue', methods=['GET'])
+def get_recommend_queue_stats():
+    return jsonify({'status': 'success', 'queue': inference_executor.stats(), 'batch': batch_executor.stats()})
+
+
+# 추천 여행지 → tour_spots 매핑 테이블 상태
+@app.route('/recommend/mapping', methods=['GET'])
+def get_recommend_mapping_status():
+    return jsonify({'status': 'success', 'mapping': mapping_status()})
+
+
+# 추천 모델 상태 (활성 버전, 로드 상태, 교체 이력)
+@app.route('/model/status', methods=['GET'])
+def get_model_status():
+    return jsonify({'status': 'success', 'model': registry.status()})
+
+
+# 운영용 API 접근 제한
+# ADMIN_TOKEN 이 설정되어 있으면 X-Admin-Token 헤더가 일치해야 하고, 없으면 같은 호스트(localhost)에서만 허용한다.
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+LOCAL_ADDRS = ('127.0.0.1', '::1')
+
+
+def admin_only(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if ADMIN_TOKEN:
+            allowed = hmac.compare_digest(request.headers.get('X-Admin-Token', ''), ADMIN_TOKEN)
+        else:
+            allowed = request.remote_addr in LOCAL_ADDRS
+        if not allowed:
+            return jsonify({'status': 'error', 'message': '권한이 없습니다.'}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+
+# 추천 모델 재로드 (백그라운드 로드 + 워밍업 후 원자적 교체)
+# 항상 설정된 번들 경로(ARTIFACT_DIR)를 다시 읽는다. (요청으로 임의 경로를 받지 않음)
+@app.route('/model/reload', methods=['POST'])
+@admin_only
+def reload_model():
+    started = registry.reload()
+    if not started:
+        return jsonify({'status': 'error', 'message': '이미 모델을 로드하는 중입니다.'}), 409
+    return jsonify({'status': 'success', 'model': registry.status()}), 202
+
+
+# 여행지 검색 API (검색어 + 필터, sort_title 순 search_after 페이지네이션)
+@app.route('/spots/search', methods=['GET'])
+def search_tour_spots():
+    try:
+        result = search_spots(request.args)
+        return jsonify({'status': 'success', **result})
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
+        logger.error(f'여행지 검색 실패: {e}')
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+# 여행지 검색 캐시 상태
+@app.route('/spots/search/cache', methods=['GET'])
+def get_search_cache_stats():
+    return jsonify({'status': 'success', 'cache': search_cache.stats()})
+
+
+# 내 주변 여행지 API (반경 검색, 거리순)
+@app.route('/spots/nearby', methods=['GET'])
+def get_nearby_spots():
+    try:
+        spots = nearby_spots(request.args)
+        return jsonify({'status': 'success', 'spots': spots})
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
+        logger.error(f'주변 여행지 조회 실패: {e}')
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+# 지도 타일 API (낮은 줌은 격자 군집, 높은 줌은 여행지 목록)
+@app.route('/spots/tiles/<int:z>/<int:x>/<int:y>', methods=['GET'])
+def get_spot_tile(z, x, y):
+    try:
+        tile = tile_spots(z, x, y, request.args)
+        return jsonify({'status': 'success', **tile})
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
+        logger.error(f'지도 타일 조회 실패: {e}')
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+# 지도 타일 캐시 상태
+@app.route('/spots/tiles/cache', methods=['GET'])
+def get_tile_cache_stats():
+    return jsonify({'status': 'success', 'cache': tile_cache.stats()})
+
+
+# 공개 여행 일지 검색 API (PIT + search_after 페이지네이션)
+@app.route('/diaries/search', methods=['GET'])
+def search_diary():
+    try:
+        result = search_diaries(request.args)
+        return jsonify({'status': 'success', **result})
+    except CursorExpired as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 410
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except Exception as e:
+        logger.error(f'일지 검색 실패: {e}')
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+# Prometheus 지표 (추천 단계별 / ES 요청 / TourAPI 요청 / 배치 작업)
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+# 저장된 프로파일 (folded stack, flamegraph.pl / speedscope 로 열기)
+@app.route('/metrics/profiles/<profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    try:
+        return Response(load_profile(profile_id), content_type='text/plain; charset=utf-8')
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    except OSError:
+        return jsonify({'status': 'error', 'message': '프로파일이 없습니다.'}), 404
+
+
+# 야간 동기화 실행 기록 (소요 시간, 수집 / 색인 / 변경 없음 / 실패 건수)
+@app.route('/jobs/history', methods=['GET'])
+def get_job_history():
+    try:
+        limit = int(request.args.get('limit', 20))
+        if not 1 <= limit <= sync_runner.JOB_HISTORY_KEEP:
+            raise ValueError(f'limit 는 1 ~ {sync_runner.JOB_HISTORY_KEEP} 사이여야 합니다.')
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    # 바뀐 좌표 목록은 캐시 반영용이므로 응답에는 개수만
+    history = [dict({key: value for key, value in entry.items() if key != 'touched'},
+                    touched=len(entry.get('touched', [])))
+               for entry in reversed(sync_runner.read_history(limit))]
+    return jsonify({'status': 'success', 'job': sync_runner.JOB_NAME, 'running': sync_runner.is_running(),
+                    'history': history})
 
 
 @app.route('/test', methods=['GET'])
@@ -82,7 +423,8 @@ def test():
 
 # 서버 종료 시 스케줄러 정리
 def shutdown_scheduler():
-    scheduler.shutdown()
+    if scheduler is not None:
+        scheduler.shutdown()
 
 
 if __name__ == '__main__':
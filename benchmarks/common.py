@@ -0,0 +1,182 @@
+# common.py
+# 벤치마크 공용: 지연 시간 통계, 메모리(RSS), 실행 환경, JSON 기준값 저장 / 비교
+#
+# 각 벤치마크는 {"name", "environment", "params", "metrics"} 형식의 결과를 만든다.
+#   --save            : benchmarks/baselines/<name>.json 에 기준값으로 저장
+#   --compare [파일]  : 기준값과 비교, tolerance 를 넘게 나빠진 지표가 있으면 종료 코드 1
+#   --output 파일     : 결과를 지정한 파일에 저장 (compare.py 로 두 결과를 비교할 때)
+# 지표 이름의 접미사로 좋아지는 방향을 정한다.
+#   _ms / _s / _mb   : 작을수록 좋음
+#   _per_sec / _ratio: 클수록 좋음
+#   그 외            : 비교만 출력 (회귀 판정에서 제외)
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_DIR = os.path.join(ROOT_DIR, 'benchmarks', 'baselines')
+
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+
+# 지연 시간 목록(초) → 밀리초 단위 요약
+def latency_summary(samples, prefix=''):
+    values = np.asarray(samples, dtype=np.float64) * 1000
+    if not len(values):
+        return {}
+    return {
+        f'{prefix}mean_ms': round(float(values.mean()), 3),
+        f'{prefix}p50_ms': round(float(np.percentile(values, 50)), 3),
+        f'{prefix}p95_ms': round(float(np.percentile(values, 95)), 3),
+        f'{prefix}p99_ms': round(float(np.percentile(values, 99)), 3),
+        f'{prefix}max_ms': round(float(values.max()), 3),
+    }
+
+
+# fn() 을 repeat 번 실행해 각 실행 시간(초) 목록 반환 (warmup 회는 버림)
+def measure(fn, repeat, warmup=1):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+# 현재 RSS (MB). pid 를 주면 해당 프로세스 (리눅스 /proc 기준, 없으면 None)
+def rss_mb(pid=None):
+    try:
+        with open(f'/proc/{pid or "self"}/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+# 이 프로세스의 최대 RSS (MB)
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # 리눅스는 KB, macOS 는 byte
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'commit': _git_commit(),
+        'recorded_at': datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+def make_result(name, params, metrics):
+    return {'name': name, 'environment': environment(), 'params': params, 'metrics': metrics}
+
+
+def baseline_path(name):
+    return os.path.join(BASELINE_DIR, f'{name}.json')
+
+
+def save_result(result, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def load_result(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _direction(metric):
+    if metric.endswith(('_ms', '_s', '_mb')):
+        return -1
+    if metric.endswith(('_per_sec', '_ratio')):
+        return 1
+    return 0
+
+
+# 기준값 대비 변화: [(지표, 기준값, 현재값, 변화율, 회귀 여부)]
+def compare_metrics(baseline, current, tolerance=0.1):
+    rows = []
+    for metric in sorted(set(baseline) | set(current)):
+        old, new = baseline.get(metric), current.get(metric)
+        if not isinstance(old, (int, float)) or not isinstance(new, (int, float)):
+            rows.append((metric, old, new, None, False))
+            continue
+        change = (new - old) / old if old else None
+        direction = _direction(metric)
+        regressed = change is not None and direction != 0 and -direction * change > tolerance
+        rows.append((metric, old, new, change, regressed))
+    return rows
+
+
+def print_comparison(baseline, current, tolerance=0.1):
+    if baseline.get('params') != current.get('params'):
+        print(f"주의: 실행 조건이 다릅니다. 기준 {baseline.get('params')} / 현재 {current.get('params')}")
+    old_env, new_env = baseline.get('environment', {}), current.get('environment', {})
+    if (old_env.get('cpu_count'), old_env.get('python')) != (new_env.get('cpu_count'), new_env.get('python')):
+        print(f"주의: 실행 환경이 다릅니다. 기준 {old_env} / 현재 {new_env}")
+
+    rows = compare_metrics(baseline['metrics'], current['metrics'], tolerance)
+    width = max([len(row[0]) for row in rows] + [6])
+    print(f"{'metric':<{width}}  {'baseline':>12}  {'current':>12}  {'change':>8}")
+    for metric, old, new, change, regressed in rows:
+        change_text = f'{change * 100:+.1f}%' if change is not None else '-'
+        print(f"{metric:<{width}}  {str(old):>12}  {str(new):>12}  {change_text:>8}{'  << 회귀' if regressed else ''}")
+    regressions = [row[0] for row in rows if row[4]]
+    if regressions:
+        print(f'허용 범위({tolerance * 100:.0f}%)를 넘은 회귀: {", ".join(regressions)}')
+    return regressions
+
+
+def add_baseline_args(parser):
+    parser.add_argument('--save', action='store_true', help='결과를 benchmarks/baselines/ 에 기준값으로 저장')
+    parser.add_argument('--compare', nargs='?', const='', default=None,
+                        help='기준값과 비교 (파일 미지정 시 benchmarks/baselines/<name>.json)')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='회귀로 판정할 변화율 (기본 0.1 = 10%%)')
+    parser.add_argument('--output', help='결과 JSON 저장 경로')
+
+
+# 결과 출력 / 비교 / 저장. 종료 코드 반환 (회귀가 있으면 1)
+def finish(result, args):
+    print(json.dumps(result['metrics'], ensure_ascii=False, indent=2, sort_keys=True))
+    if args.output:
+        save_result(result, args.output)
+
+    code = 0
+    if args.compare is not None:
+        path = args.compare or baseline_path(result['name'])
+        if not os.path.exists(path):
+            print(f'기준값이 없습니다: {path}')
+            code = 1
+        elif print_comparison(load_result(path), result, args.tolerance):
+            code = 1
+
+    # 비교가 끝난 뒤 저장 (같은 실행에서 --compare --save 를 함께 써도 이전 기준값과 비교)
+    if args.save:
+        save_result(result, baseline_path(result['name']))
+        print(f"기준값 저장: {baseline_path(result['name'])}")
+    return code
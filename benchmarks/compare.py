@@ -0,0 +1,32 @@
+# compare.py
+# 벤치마크 결과 JSON 두 개 비교 (기준 → 현재)
+#
+#   python benchmarks/compare.py benchmarks/baselines/micro.json /tmp/micro.json --tolerance 0.15
+#
+# 좋아지는 방향은 지표 이름 접미사로 판단한다. (benchmarks/common.py 참고)
+# tolerance 를 넘게 나빠진 지표가 있으면 종료 코드 1
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import load_result, print_comparison  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='벤치마크 결과 비교')
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--tolerance', type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    baseline, current = load_result(args.baseline), load_result(args.current)
+    if baseline.get('name') != current.get('name'):
+        print(f"서로 다른 벤치마크입니다: {baseline.get('name')} / {current.get('name')}")
+        return 2
+    return 1 if print_comparison(baseline, current, args.tolerance) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
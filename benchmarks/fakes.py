@@ -0,0 +1,209 @@
+# fakes.py
+# 적재 벤치마크용 로컬 가짜 서버 (Elasticsearch, TourAPI)
+#
+# 실제 서비스 없이 send_to_elastic / update_tour_data 의 클라이언트 쪽 비용(정규화, 직렬화, 벌크 요청, 동기화 비교)을
+# 측정하기 위한 최소 구현이다. 검색 / 집계는 지원하지 않는다.
+#   FakeElasticsearch : 인덱스 생성/삭제/존재 확인, _bulk(index/create/update/delete), _mget, _count, _refresh
+#   FakeTourApi       : areaBasedSyncList1 형식의 페이지 응답 (합성 항목), 페이지별 오류 응답 / 요청 시각 기록
+# latency 를 주면 요청마다 그만큼 지연시켜 네트워크 왕복을 흉내 낸다.
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class _Server:
+    def __init__(self, handler, latency=0.0):
+        self.latency = latency
+        self.requests = 0
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self._server.daemon_threads = True
+        self._server.owner = self
+        self._thread = None
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self._server.server_port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name=type(self).__name__, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    @property
+    def owner(self):
+        return self.server.owner
+
+    def send_json(self, status, body, headers=()):
+        raw = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(raw)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(raw)
+
+    def read_body(self):
+        raw = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self.headers.get('Content-Encoding') == 'gzip':
+            raw = gzip.decompress(raw)
+        return raw
+
+    def handle_request(self):
+        raise NotImplementedError
+
+    def dispatch(self):
+        with self.owner.lock:
+            self.owner.requests += 1
+        if self.owner.latency:
+            time.sleep(self.owner.latency)
+        self.handle_request()
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = dispatch
+
+
+class _ElasticHandler(_Handler):
+    def send_json(self, status, body, headers=()):
+        super().send_json(status, body, list(headers) + [('X-Elastic-Product', 'Elasticsearch')])
+
+    def _bulk(self, default_index, raw):
+        owner = self.owner
+        lines = [json.loads(line) for line in raw.decode('utf-8').splitlines() if line.strip()]
+        items, errors, i = [], False, 0
+        while i < len(lines):
+            (op, meta), = lines[i].items()
+            index = meta.get('_index') or default_index
+            doc_id = meta.get('_id') or f'auto-{owner.auto_id()}'
+            source = lines[i + 1] if op != 'delete' else None
+            i += 1 if op == 'delete' else 2
+
+            with owner.lock:
+                docs = owner.indices.setdefault(index, {})
+                status, result = 200, 'updated'
+                if op == 'delete':
+                    result = 'deleted' if docs.pop(doc_id, None) is not None else 'not_found'
+                elif op == 'update':
+                    if doc_id in docs:
+                        docs[doc_id].update(source['doc'])
+                    elif source.get('doc_as_upsert'):
+                        docs[doc_id], status, result = dict(source['doc']), 201, 'created'
+                    else:
+                        status, result = 404, None
+                else:
+                    if doc_id not in docs:
+                        status, result = 201, 'created'
+                    docs[doc_id] = source
+
+            item = {'_index': index, '_id': doc_id, 'status': status}
+            if result is None:
+                item['error'] = {'type': 'document_missing_exception'}
+                errors = True
+            else:
+                item['result'] = result
+            items.append({op: item})
+        self.send_json(200, {'took': 1, 'errors': errors, 'items': items})
+
+    def handle_request(self):
+        owner = self.owner
+        parts = [part for part in urlparse(self.path).path.split('/') if part]
+        raw = self.read_body() if self.command in ('POST', 'PUT', 'DELETE') else b''
+
+        if not parts:
+            return self.send_json(200, {'version': {'number': '8.19.0'}, 'tagline': 'You Know, for Search'})
+        if parts[-1] == '_bulk':
+            return self._bulk(parts[0] if len(parts) > 1 else None, raw)
+        if parts[-1] == '_mget':
+            body = json.loads(raw)
+            ids = body.get('ids') or [doc['_id'] for doc in body.get('docs', [])]
+            with owner.lock:
+                docs = owner.indices.get(parts[0], {})
+                found = [{'_index': parts[0], '_id': doc_id, 'found': doc_id in docs,
+                          **({'_source': docs[doc_id]} if doc_id in docs else {})} for doc_id in ids]
+            return self.send_json(200, {'docs': found})
+        if parts[-1] == '_count':
+            with owner.lock:
+                return self.send_json(200, {'count': len(owner.indices.get(parts[0], {}))})
+        if parts[-1] in ('_refresh', '_settings'):
+            return self.send_json(200, {'acknowledged': True})
+        if len(parts) == 1:
+            name = parts[0]
+            with owner.lock:
+                exists = name in owner.indices
+                if self.command == 'PUT':
+                    if exists:
+                        return self.send_json(400, {'error': {'type': 'resource_already_exists_exception'},
+                                                    'status': 400})
+                    owner.indices[name] = {}
+                    return self.send_json(200, {'acknowledged': True, 'index': name})
+                if self.command == 'DELETE':
+                    owner.indices.pop(name, None)
+                    return self.send_json(200, {'acknowledged': True})
+            return self.send_json(200 if exists else 404, {name: {}} if exists else {'status': 404})
+        return self.send_json(400, {'error': f'지원하지 않는 요청: {self.command} {self.path}', 'status': 400})
+
+
+class FakeElasticsearch(_Server):
+    def __init__(self, latency=0.0):
+        self.lock = threading.Lock()
+        self.indices = {}
+        self._next_id = 0
+        super().__init__(_ElasticHandler, latency)
+
+    def auto_id(self):
+        with self.lock:
+            self._next_id += 1
+            return self._next_id
+
+    def count(self, index):
+        with self.lock:
+            return len(self.indices.get(index, {}))
+
+
+class _TourHandler(_Handler):
+    def handle_request(self):
+        owner = self.owner
+        query = parse_qs(urlparse(self.path).query)
+        page = int(query.get('pageNo', ['1'])[0])
+        rows = int(query.get('numOfRows', ['10'])[0])
+        with owner.lock:
+            owner.calls.append((page, time.monotonic()))
+            statuses = owner.errors.get(page)
+            status = statuses.pop(0) if statuses else None
+        if status is not None:
+            return self.send_json(status, {'error': f'HTTP {status}'})
+        items = owner.items[(page - 1) * rows:page * rows]
+        body = {'response': {'header': {'resultCode': '0000'},
+                             'body': {'totalCount': len(owner.items), 'pageNo': page, 'numOfRows': rows,
+                                      'items': {'item': items} if items else ''}}}
+        self.send_json(200, body)
+
+
+class FakeTourApi(_Server):
+    # errors: {페이지: [상태 코드, ...]} 해당 페이지 요청에 순서대로 오류 응답을 보낸 뒤 정상 응답
+    def __init__(self, items, latency=0.0, errors=None):
+        self.lock = threading.Lock()
+        self.items = list(items)
+        self.errors = {page: list(statuses) for page, statuses in (errors or {}).items()}
+        self.calls = []  # (페이지, 요청 시각)
+        super().__init__(_TourHandler, latency)
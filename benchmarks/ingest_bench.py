@@ -0,0 +1,115 @@
+# ingest_bench.py
+# 적재 / 동기화 벤치마크 (로컬 가짜 Elasticsearch / TourAPI, benchmarks/fakes.py)
+#
+#   python benchmarks/ingest_bench.py --items 20000
+#   python benchmarks/ingest_bench.py --es-latency-ms 5 --compare
+#
+#   bulk_load     : get_tour 가 저장하는 형식의 JSON 파일 → send_to_elastic (streaming_bulk / parallel_bulk)
+#   sync_new      : update_tour_data 하루치, 전부 신규 문서 (수집 → 정규화 → mget → 벌크 upsert)
+#   sync_unchanged: 같은 데이터로 한 번 더 실행, content_hash 가 같아 벌크 요청 없이 끝나는 경로
+# 가짜 서버는 검색 / 집계를 하지 않으므로 클라이언트 쪽 비용과 요청 수만 비교하는 용도다.
+import argparse
+import functools
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import add_baseline_args, finish, make_result, peak_rss_mb  # noqa: E402
+from benchmarks.fakes import FakeElasticsearch, FakeTourApi  # noqa: E402
+from benchmarks.normalize_bench import synthetic_items  # noqa: E402
+
+SYNC_DATE = '20240101'
+
+
+def bench_bulk_load(es_server, items, args, work_dir):
+    from elastic.normalize import normalize_batch
+    from elastic.tour_to_elastic import send_to_elastic
+
+    # get_tour 와 같은 형식 (정규화된 문서 배열)
+    file_path = os.path.join(work_dir, 'tour_spot_info.json')
+    docs = normalize_batch(items)
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(docs, f, ensure_ascii=False)
+
+    metrics = {'bulk_load_docs': len(docs)}
+    for mode, parallel in (('serial', False), ('parallel', True)):
+        index_name = f'tour_spots_bench_{mode}'
+        requests_before = es_server.requests
+        started = time.perf_counter()
+        result = send_to_elastic(file_path, batch_size=args.batch_size, parallel=parallel,
+                                 thread_count=args.threads, resume=False, index_name=index_name)
+        elapsed = time.perf_counter() - started
+        if result is None or result['failed'] or es_server.count(index_name) != len(docs):
+            raise RuntimeError(f'{mode} 적재 결과가 올바르지 않습니다: {result}')
+        metrics[f'bulk_load_{mode}_s'] = round(elapsed, 3)
+        metrics[f'bulk_load_{mode}_docs_per_sec'] = round(len(docs) / elapsed, 1)
+        metrics[f'bulk_load_{mode}_requests'] = es_server.requests - requests_before
+    return metrics
+
+
+def bench_sync(es_server, tour_server, args):
+    import elastic.update_spot as update_spot
+    from api.tour_fetcher import TourApiFetcher
+
+    # 실제 TourAPI 속도 제한(초당 5회) 대신 벤치마크용 속도 제한
+    update_spot.TourApiFetcher = functools.partial(TourApiFetcher, rate=args.tour_rate)
+
+    metrics = {}
+    for label in ('new', 'unchanged'):
+        requests_before = es_server.requests
+        started = time.perf_counter()
+        result = update_spot.update_tour_data(SYNC_DATE, SYNC_DATE)
+        elapsed = time.perf_counter() - started
+        if result is None or result['failures'] or result['failed_pages']:
+            raise RuntimeError(f'동기화 결과가 올바르지 않습니다: {result}')
+        metrics[f'sync_{label}_s'] = round(elapsed, 3)
+        metrics[f'sync_{label}_items_per_sec'] = round(result['fetched'] / elapsed, 1)
+        metrics[f'sync_{label}_indexed'] = result['indexed']
+        metrics[f'sync_{label}_es_requests'] = es_server.requests - requests_before
+    metrics['sync_fetched'] = result['fetched']
+    return metrics
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='적재 / 동기화 벤치마크 (가짜 ES / TourAPI)')
+    parser.add_argument('--items', type=int, default=20000)
+    parser.add_argument('--batch-size', type=int, default=2000, help='send_to_elastic 벌크 청크 크기')
+    parser.add_argument('--threads', type=int, default=2, help='parallel_bulk 스레드 수')
+    parser.add_argument('--tour-rate', type=float, default=1000.0, help='TourAPI 초당 요청 수 제한')
+    parser.add_argument('--es-latency-ms', type=float, default=0.0, help='가짜 ES 요청당 지연')
+    parser.add_argument('--tour-latency-ms', type=float, default=0.0, help='가짜 TourAPI 요청당 지연')
+    add_baseline_args(parser)
+    args = parser.parse_args(argv)
+    # 색인 진행 로그 대신 결과만 출력 (update_spot 의 DEBUG 로그 설정도 적용되지 않음)
+    logging.basicConfig(level=logging.WARNING)
+
+    items = synthetic_items(args.items)
+    with tempfile.TemporaryDirectory() as work_dir, \
+            FakeElasticsearch(args.es_latency_ms / 1000) as es_server, \
+            FakeTourApi(items, args.tour_latency_ms / 1000) as tour_server:
+        # elastic/ 모듈은 import 시점에 접속 정보를 읽으므로 먼저 환경 변수를 설정한다.
+        os.environ['ELASTIC_HOST'] = es_server.url
+        os.environ.setdefault('ELASTIC_PASSWORD', 'benchmark')
+        os.environ['TOUR_API_BASE_URL'] = tour_server.url
+        os.environ['TOUR_SYNC_STATE_PATH'] = os.path.join(work_dir, 'tour_sync_state.json')
+
+        from elastic.client import reset_es
+        reset_es()
+        metrics = bench_bulk_load(es_server, items, args, work_dir)
+        metrics.update(bench_sync(es_server, tour_server, args))
+        reset_es()
+
+    metrics['peak_rss_mb'] = peak_rss_mb()
+    params = {'items': args.items, 'batch_size': args.batch_size, 'threads': args.threads,
+              'tour_rate': args.tour_rate, 'es_latency_ms': args.es_latency_ms,
+              'tour_latency_ms': args.tour_latency_ms}
+    return finish(make_result('ingest', params, metrics), args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,186 @@
+# load_test.py
+# /recommend 부하 테스트 (고정 동시성, p50 / p95 / p99 지연, 처리량, 서버 RSS)
+#
+#   python benchmarks/load_test.py --concurrency 4 --requests 400
+#   python benchmarks/load_test.py --url http://localhost:5000 --pid <gunicorn 워커 pid>
+#
+# --url 을 주지 않으면 app.py 를 별도 프로세스(werkzeug threaded 서버)로 띄워서 측정하고 끝나면 종료한다.
+# 프로필은 학습 데이터 표본 --distinct 개를 돌려 쓰므로, 요청 수 대비 distinct 가 작을수록 캐시 hit 비율이 높다.
+# 추천 보강(enrich)은 ES 가 필요하므로 끈다.
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+
+import requests
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.common import add_baseline_args, finish, latency_summary, make_result, rss_mb  # noqa: E402
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+# --serve: 측정 대상 서버 (별도 프로세스)
+def serve(port):
+    from werkzeug.serving import make_server
+
+    from app import app
+
+    make_server('127.0.0.1', port, app, threaded=True).serve_forever()
+
+
+def start_server(startup_timeout):
+    port = _free_port()
+    process = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve', '--port', str(port)],
+                               cwd=ROOT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + startup_timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'서버가 종료되었습니다 (exit {process.returncode})')
+        try:
+            if requests.get(f'{url}/test', timeout=1).ok:
+                return process, url
+        except requests.RequestException:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError('서버가 시작되지 않았습니다.')
+
+
+def make_payloads(distinct, seed=42):
+    from ML.scoring import USER_FEATURES, sample_profiles
+
+    return [dict({field: int(value) for field, value in zip(USER_FEATURES, profile)}, enrich=False)
+            for profile in sample_profiles(distinct, seed=seed)]
+
+
+# RSS 최대값 샘플링 (interval 초마다)
+class RssSampler:
+    def __init__(self, pid, interval=0.1):
+        self.pid = pid
+        self.interval = interval
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='rss-sampler', daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            value = rss_mb(self.pid)
+            if value is not None:
+                self.peak = max(self.peak or 0, value)
+            self._stop.wait(self.interval)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.peak
+
+
+def run_load(url, payloads, total, concurrency, warmup, timeout, seed=0):
+    rng = random.Random(seed)
+    schedule = [rng.choice(payloads) for _ in range(total)]
+
+    # 워밍업 (모델 로드 / 첫 요청 비용 제외)
+    with requests.Session() as session:
+        for payload in payloads[:warmup]:
+            session.post(f'{url}/recommend', json=payload, timeout=timeout)
+
+    latencies, statuses = [], Counter()
+    lock = threading.Lock()
+    position = iter(range(total))
+
+    def worker():
+        with requests.Session() as session:
+            while True:
+                with lock:
+                    index = next(position, None)
+                if index is None:
+                    return
+                started = time.perf_counter()
+                try:
+                    response = session.post(f'{url}/recommend', json=schedule[index], timeout=timeout)
+                    ok = response.status_code == 200 and response.json().get('status') == 'success'
+                    status = 'ok' if ok else str(response.status_code)
+                except requests.RequestException as e:
+                    status = type(e).__name__
+                elapsed = time.perf_counter() - started
+                with lock:
+                    statuses[status] += 1
+                    if status == 'ok':
+                        latencies.append(elapsed)
+
+    threads = [threading.Thread(target=worker, name=f'load-{i}') for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, statuses, time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='/recommend 부하 테스트')
+    parser.add_argument('--url', help='측정할 서버 주소 (기본: app.py 를 별도 프로세스로 실행)')
+    parser.add_argument('--pid', type=int, help='--url 사용 시 RSS 를 측정할 서버 프로세스 pid')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--distinct', type=int, default=100, help='서로 다른 프로필 수')
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--startup-timeout', type=float, default=180)
+    parser.add_argument('--serve', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    add_baseline_args(parser)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        serve(args.port)
+        return 0
+
+    payloads = make_payloads(args.distinct)
+    process, url, pid = None, args.url, args.pid
+    if url is None:
+        process, url = start_server(args.startup_timeout)
+        pid = process.pid
+
+    try:
+        sampler = RssSampler(pid).start() if pid else None
+        rss_before = rss_mb(pid) if pid else None
+        latencies, statuses, elapsed = run_load(url, payloads, args.requests, args.concurrency, args.warmup,
+                                                args.timeout)
+        peak = sampler.stop() if sampler else None
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+
+    metrics = latency_summary(latencies)
+    metrics['requests_per_sec'] = round(len(latencies) / elapsed, 2)
+    metrics['elapsed_s'] = round(elapsed, 3)
+    metrics.update({f'status_{status}': count for status, count in sorted(statuses.items())})
+    if pid:
+        metrics['server_rss_start_mb'] = rss_before
+        metrics['server_rss_peak_mb'] = peak
+
+    params = {'concurrency': args.concurrency, 'requests': args.requests, 'distinct': args.distinct,
+              'external': args.url is not None}
+    return finish(make_result('load', params, metrics), args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,116 @@
+# micro_bench.py
+# 핫 패스 마이크로 벤치마크 (오프라인, ES / 네트워크 불필요)
+#
+#   python benchmarks/micro_bench.py                    # 전체 실행
+#   python benchmarks/micro_bench.py --only scoring     # scoring / normalize / sort_title 중 선택
+#   python benchmarks/micro_bench.py --compare          # benchmarks/baselines/micro.json 과 비교
+#
+#   scoring    : 프로필 1개 점수화(score_users, 백엔드별), recommend_top_destinations 캐시 miss / hit
+#   normalize  : update_spot.py / tour_to_elastic.py 공용 normalize_batch (합성 TourAPI 항목, 페이지 단위)
+#   sort_title : generate_sort_title
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import add_baseline_args, finish, latency_summary, make_result, measure, peak_rss_mb  # noqa: E402
+from benchmarks.normalize_bench import TITLE_HEADS, synthetic_items  # noqa: E402
+
+SECTIONS = ('scoring', 'normalize', 'sort_title')
+
+
+def bench_scoring(args):
+    from ML.recomendation import get_bundle, recommend_cache, recommend_top_destinations
+    from ML.scoring import BACKENDS, USER_FEATURES, sample_profiles, score_users
+
+    bundle = get_bundle()
+    profiles = sample_profiles(args.profiles)
+    metrics = {'candidates': len(bundle)}
+
+    for backend in args.backends:
+        if backend not in BACKENDS:
+            raise ValueError(f'알 수 없는 백엔드입니다: {backend}')
+        samples = []
+        score_users(bundle, profiles[:1], backend)  # 워밍업
+        for user in profiles:
+            started = time.perf_counter()
+            score_users(bundle, [user], backend)
+            samples.append(time.perf_counter() - started)
+        metrics.update(latency_summary(samples, f'score_{backend}_'))
+
+    user_inputs = [dict(zip(USER_FEATURES, user)) for user in profiles]
+    recommend_cache.clear()
+    cold, warm = [], []
+    for user_input in user_inputs:
+        started = time.perf_counter()
+        recommend_top_destinations(user_input)
+        cold.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        recommend_top_destinations(user_input)
+        warm.append(time.perf_counter() - started)
+    metrics.update(latency_summary(cold, 'recommend_miss_'))
+    metrics.update(latency_summary(warm, 'recommend_hit_'))
+    recommend_cache.clear()
+    return metrics
+
+
+def bench_normalize(args):
+    from elastic.normalize import normalize_batch
+
+    items = synthetic_items(args.items)
+    pages = [items[i:i + args.page_size] for i in range(0, len(items), args.page_size)]
+
+    def run():
+        for page in pages:
+            normalize_batch(page)
+
+    best = min(measure(run, args.repeat))
+    return {'normalize_items_per_sec': round(len(items) / best, 1), 'normalize_total_s': round(best, 4)}
+
+
+def bench_sort_title(args):
+    from elastic.normalize import generate_sort_title
+
+    rng = random.Random(42)
+    heads = TITLE_HEADS + ['Seoul', '7번국도', '', '★카페', 'ㄱ자 골목']
+    titles = [f'{rng.choice(heads)}{i}' if i % 50 else '' for i in range(args.items)]
+
+    def run():
+        for title in titles:
+            generate_sort_title(title)
+
+    best = min(measure(run, args.repeat))
+    return {'sort_title_per_sec': round(len(titles) / best, 1)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='추천 / 정규화 핫 패스 마이크로 벤치마크')
+    parser.add_argument('--only', action='append', choices=SECTIONS, help='실행할 항목 (여러 번 지정 가능)')
+    parser.add_argument('--profiles', type=int, default=30, help='점수화에 쓸 프로필 수 (학습 데이터 표본)')
+    parser.add_argument('--backends', nargs='+', default=['reference', 'pool'])
+    parser.add_argument('--items', type=int, default=20000, help='정규화 / sort_title 항목 수')
+    parser.add_argument('--page-size', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5)
+    add_baseline_args(parser)
+    args = parser.parse_args(argv)
+
+    sections = args.only or SECTIONS
+    metrics = {}
+    if 'scoring' in sections:
+        metrics.update(bench_scoring(args))
+    if 'normalize' in sections:
+        metrics.update(bench_normalize(args))
+    if 'sort_title' in sections:
+        metrics.update(bench_sort_title(args))
+    metrics['peak_rss_mb'] = peak_rss_mb()
+
+    params = {'sections': list(sections), 'profiles': args.profiles, 'backends': args.backends,
+              'items': args.items, 'page_size': args.page_size}
+    return finish(make_result('micro', params, metrics), args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,146 @@
+# normalize_bench.py
+# 여행지 정규화 처리량 비교: 기존 항목별 루프 vs elastic/normalize.py 의 normalize_batch
+#
+#   python benchmarks/normalize_bench.py --items 50000
+#
+# 합성 TourAPI 항목으로
+#   - 기존 방식(필드 변환 루프 + strptime + 항목마다 정규식 3개)과 처리량 비교
+#   - 세 경로(get_tour → 파일 → send_to_elastic, update_tour_data, 재정규화)가 같은 문서를 만드는지 확인
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from elastic.normalize import (allowed_fields, content_fingerprint, content_type_mapping,  # noqa: E402
+                               normalize_batch, snake_case_mapping)
+
+TITLE_HEADS = ['경복궁', '남산타워', 'N서울타워', 'k-pop 스퀘어', '63빌딩', '(구)서울역', '"한옥" 마을']
+
+
+def synthetic_items(n, seed=42):
+    rng = random.Random(seed)
+    items = []
+    for i in range(n):
+        created = datetime(2015 + i % 10, 1 + i % 12, 1 + i % 28, i % 24, i % 60, i % 60)
+        items.append({
+            "addr1": f"서울특별시 중구 세종대로 {i}",
+            "addr2": "",
+            "areacode": str(1 + i % 39),
+            "booktour": "",
+            "cat1": "A01", "cat2": "A0101", "cat3": "A01010100",
+            "contentid": str(100000 + i),
+            "contenttypeid": rng.choice(["12", "14", "15", "25", "28", "32", "38", "39"]),
+            "createdtime": created.strftime("%Y%m%d%H%M%S"),
+            "modifiedtime": created.strftime("%Y%m%d%H%M%S"),
+            "firstimage": f"http://tong.visitkorea.or.kr/cms/resource/{i}.jpg",
+            "firstimage2": "",
+            "cpyrhtDivCd": "Type3",
+            "mapx": "0" if i % 97 == 0 else f"{126 + rng.random():.10f}",
+            "mapy": f"{37 + rng.random():.10f}",
+            "mlevel": "6",
+            "sigungucode": "99" if i % 113 == 0 else str(1 + i % 25),
+            "tel": "",
+            "title": f"{rng.choice(TITLE_HEADS)} {i}",
+            "zipcode": "04524",
+        })
+    return items
+
+
+# 기존 update_tour_data 의 항목별 변환 (비교 기준)
+def legacy_generate_sort_title(title):
+    if not title:
+        return "\u200d"
+    first_char = title[0]
+    if re.match(r'[가-힣]', first_char):
+        return title
+    elif re.match(r'[a-zA-Z]', first_char):
+        return "\u200b" + title
+    elif re.match(r'[0-9]', first_char):
+        return "\u200c" + title
+    else:
+        return "\u200d" + title
+
+
+def legacy_normalize(items):
+    filtered_items = []
+    for item in items:
+        filtered_item = {}
+        for key, value in item.items():
+            new_key = snake_case_mapping.get(key, key)
+            if new_key in allowed_fields:
+                filtered_item[new_key] = value
+
+        if (filtered_item.get("sigungu_code") == "99" or
+                filtered_item.get("map_x") == "0" or
+                filtered_item.get("content_type_id") == "15"):
+            continue
+
+        created_time_str = filtered_item.get("created_time")
+        if created_time_str:
+            created_datetime = datetime.strptime(created_time_str, "%Y%m%d%H%M%S")
+            filtered_item["created_time"] = created_datetime.strftime("%Y-%m-%dT%H:%M:%S")
+
+        modified_time_str = filtered_item.get("modified_time")
+        if modified_time_str:
+            modified_datetime = datetime.strptime(modified_time_str, "%Y%m%d%H%M%S")
+            filtered_item["modified_time"] = modified_datetime.strftime("%Y-%m-%dT%H:%M:%S")
+
+        filtered_item['sort_title'] = legacy_generate_sort_title(filtered_item.get("title", ""))
+        filtered_item['location'] = {
+            "lat": float(filtered_item.get("map_y")),
+            "lon": float(filtered_item.get("map_x"))
+        }
+
+        type_id = filtered_item.get("content_type_id")
+        if type_id in content_type_mapping:
+            filtered_item['classified_type_id'] = content_type_mapping[type_id]
+
+        filtered_item['content_hash'] = content_fingerprint(filtered_item)
+        filtered_items.append(filtered_item)
+    return filtered_items
+
+
+def best_of(fn, items, page_size, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for i in range(0, len(items), page_size):
+            fn(items[i:i + page_size])
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='여행지 정규화 처리량 비교')
+    parser.add_argument('--items', type=int, default=50000)
+    parser.add_argument('--page-size', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    items = synthetic_items(args.items)
+
+    # 세 경로가 같은 문서를 만드는지 확인
+    sync_docs = normalize_batch(items)                           # update_tour_data
+    file_docs = json.loads(json.dumps(normalize_batch(items)))   # get_tour → JSON 파일
+    loaded_docs = normalize_batch(file_docs)                     # send_to_elastic
+    legacy_docs = legacy_normalize(items)
+    assert sync_docs == loaded_docs, '파일 경유 문서가 동기화 문서와 다릅니다.'
+    assert sync_docs == legacy_docs, '기존 변환 결과와 다릅니다.'
+
+    legacy_time = best_of(legacy_normalize, items, args.page_size, args.repeat)
+    batch_time = best_of(normalize_batch, items, args.page_size, args.repeat)
+
+    print(f'items: {len(items)} (정규화 후 {len(sync_docs)}건), page size {args.page_size}')
+    print(f'legacy loop     : {len(items) / legacy_time:>10.0f} items/s')
+    print(f'normalize_batch : {len(items) / batch_time:>10.0f} items/s ({legacy_time / batch_time:.2f}x)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
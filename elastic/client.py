@@ -0,0 +1,119 @@
+# client.py
+# 프로세스 공용 Elasticsearch 클라이언트
+#
+# 모든 elastic/ 모듈은 get_es() 로 같은 클라이언트를 사용한다.
+#   - 처음 호출할 때 생성 (import 시점에 소켓을 열지 않음)
+#   - 프로세스(pid) 별로 하나: gunicorn 워커가 fork 된 뒤에는 부모의 커넥션 풀을 쓰지 않고 새로 만든다
+#   - 커넥션 풀 / keep-alive, 벌크 요청 본문 gzip 압축, 요청 타임아웃, 타임아웃 재시도, 스니핑 설정
+#   - 모든 요청의 소요 시간을 작업 종류(bulk, mget, search ...)별 히스토그램으로 기록 (/metrics)
+# 접속 정보와 옵션은 환경 변수로 설정한다.
+import logging
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+from elastic_transport import Transport
+from elasticsearch import Elasticsearch
+
+from utils.metrics import es_request_seconds
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+def _env_bool(name, default):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+ELASTIC_HOST = os.getenv('ELASTIC_HOST', 'http://elasticsearch:9200')
+ELASTIC_USER = os.getenv('ELASTIC_USER', 'elastic')
+ELASTIC_CONNECTIONS_PER_NODE = int(os.getenv('ELASTIC_CONNECTIONS_PER_NODE', 10))
+ELASTIC_HTTP_COMPRESS = _env_bool('ELASTIC_HTTP_COMPRESS', True)
+ELASTIC_REQUEST_TIMEOUT = float(os.getenv('ELASTIC_REQUEST_TIMEOUT', 30))
+ELASTIC_MAX_RETRIES = int(os.getenv('ELASTIC_MAX_RETRIES', 3))
+ELASTIC_RETRY_ON_TIMEOUT = _env_bool('ELASTIC_RETRY_ON_TIMEOUT', True)
+# 단일 노드 / 도커 네트워크에서는 노드가 광고하는 주소로 접속이 안 될 수 있어 기본은 끔
+ELASTIC_SNIFF_ON_START = _env_bool('ELASTIC_SNIFF_ON_START', False)
+ELASTIC_SNIFF_ON_NODE_FAILURE = _env_bool('ELASTIC_SNIFF_ON_NODE_FAILURE', False)
+ELASTIC_SNIFF_TIMEOUT = float(os.getenv('ELASTIC_SNIFF_TIMEOUT', 1))
+
+_client = None
+_client_pid = None
+_lock = threading.Lock()
+
+
+# 요청 경로 → 지표 레이블 (/tour_spots/_bulk → bulk, GET /tour_spots/_doc/1 → get, PUT /diary → put_index)
+def es_operation(method, target):
+    path = target.split('?', 1)[0]
+    if not path.strip('/'):
+        return 'info'
+    for part in path.strip('/').split('/'):
+        if part.startswith('_'):
+            if part in ('_doc', '_create', '_update', '_source'):
+                return {'GET': 'get', 'HEAD': 'exists', 'DELETE': 'delete'}.get(method, 'index')
+            return part[1:]
+    return f'{method.lower()}_index'
+
+
+# 요청마다(재시도 포함) 소요 시간을 기록하는 Transport
+class InstrumentedTransport(Transport):
+    def perform_request(self, method, target, **kwargs):
+        started = time.perf_counter()
+        status = 'error'
+        try:
+            response = super().perform_request(method, target, **kwargs)
+            status = str(response.meta.status)
+            return response
+        except Exception as e:
+            status = type(e).__name__
+            raise
+        finally:
+            es_request_seconds.observe(time.perf_counter() - started, operation=es_operation(method, target),
+                                       status=status)
+
+
+def create_client(hosts=None, **overrides):
+    options = {
+        'basic_auth': (ELASTIC_USER, os.getenv('ELASTIC_PASSWORD')),
+        'connections_per_node': ELASTIC_CONNECTIONS_PER_NODE,
+        'http_compress': ELASTIC_HTTP_COMPRESS,
+        'request_timeout': ELASTIC_REQUEST_TIMEOUT,
+        'max_retries': ELASTIC_MAX_RETRIES,
+        'retry_on_timeout': ELASTIC_RETRY_ON_TIMEOUT,
+        'sniff_on_start': ELASTIC_SNIFF_ON_START,
+        'sniff_on_node_failure': ELASTIC_SNIFF_ON_NODE_FAILURE,
+        'sniff_timeout': ELASTIC_SNIFF_TIMEOUT,
+        'transport_class': InstrumentedTransport,
+    }
+    options.update(overrides)
+    hosts = hosts or [host.strip() for host in ELASTIC_HOST.split(',') if host.strip()]
+    return Elasticsearch(hosts, **options)
+
+
+# 현재 프로세스의 공용 클라이언트 (없거나 fork 이전에 만든 것이면 새로 생성)
+def get_es():
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+
+    with _lock:
+        if _client is None or _client_pid != pid:
+            _client = create_client()
+            _client_pid = pid
+            logger.info(f"Elasticsearch 클라이언트 생성: {ELASTIC_HOST} (pid {pid})")
+        return _client
+
+
+# 테스트 / 설정 변경 후 다시 만들 때 사용
+def reset_es():
+    global _client, _client_pid
+    with _lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client, _client_pid = None, None
@@ -1,15 +1,9 @@
-from elasticsearch import Elasticsearch
-from dotenv import load_dotenv
-import os
+from elastic.client import get_es
 
-load_dotenv()
-
-elastic_pwd = os.getenv("ELASTIC_PASSWORD")
 
 def delete_elasticsearch_index(index_name):
     try:
-        es = Elasticsearch("http://localhost:9200",
-                           basic_auth=('elastic', elastic_pwd))
+        es = get_es()
 
         if es.indices.exists(index=index_name):
             es.indices.delete(index=index_name)
@@ -1,17 +1,19 @@
 import json
-from elasticsearch import Elasticsearch, helpers
 from dotenv import load_dotenv
 import os
 import logging
 from datetime import datetime
 
+from elastic.client import get_es
 from elastic.delete_elastic_index import delete_elasticsearch_index
+from elasticsearch import helpers
+
+from elastic.index_alias import ensure_alias, reindex_alias
 
 logging.basicConfig(level=logging.INFO)
 
 load_dotenv()
 
-elastic_pwd = os.getenv("ELASTIC_PASSWORD")
 
 diary_index_body = {
     "settings": {
@@ -139,13 +141,20 @@ diary_index_body = {
 
 def create_diary_index():
     try:
-        es = Elasticsearch("http://localhost:9200", basic_auth=('elastic', elastic_pwd))
+        es = get_es()
 
-        if not es.indices.exists(index='diary'):
-            es.indices.create(index='diary', body=diary_index_body)
+        # diary 는 별칭, 실제 인덱스는 diary_v{n}
+        if ensure_alias(es, 'diary', diary_index_body):
             logging.info("Index created")
         else:
             logging.info("Index already exists")
     except Exception as e:
         logging.error(e)
 
+
+# diary_index_body 변경 시 무중단 재색인: 현재 diary 문서를 diary_v{n+1} 로 _reindex 후 별칭 교체
+# 별칭 도입 이전의 실제 diary 인덱스도 원본으로 쓸 수 있고, 교체 시 함께 제거된다.
+# 복사 중 들어온 쓰기는 별칭 교체 직전에 원본 쓰기를 잠깐 막고 보정한다. (reindex_alias 참고)
+def reindex_diary(min_ratio=1.0, keep=1):
+    # 일기가 하나도 없어도 별칭은 옮길 수 있도록 min_docs=0
+    return reindex_alias(get_es(), 'diary', diary_index_body, min_docs=0, min_ratio=min_ratio, keep=keep)
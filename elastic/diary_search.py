@@ -0,0 +1,221 @@
+# diary_search.py
+# 공개 여행 일지 검색 / 목록 (/diaries/search)
+#
+#   - 검색어: title / content / region 의 nori 필드 + ngram 서브필드
+#   - 필터: 공개 일지만(is_public), tags, area_code, sigungu_code, 여행 기간(start_date / end_date)
+#   - 정렬: recent(작성 시각) 또는 bookmarks(북마크 수 → 작성 시각)
+#   - 페이지네이션: search_after (+ 두 번째 페이지부터 point-in-time(PIT))
+#     첫 페이지는 PIT 없이 diary_id 를 마지막 정렬 기준으로 두고 조회한다. (1페이지만 보고 떠나는 요청이
+#     PIT 를 열어 두면 search.max_open_pit_context 에 금방 닿는다)
+#     커서로 다음 페이지를 요청하면 그때 PIT 를 열고, 커서에 PIT id / 마지막 정렬 값 / 검색 조건을 담아 이어 간다.
+#     from/size 와 달리 페이지가 깊어져도 비용이 같고, 두 번째 페이지부터는 그 사이에 색인된 문서 때문에 결과가 밀리지 않는다.
+import base64
+import json
+import re
+
+from elasticsearch import NotFoundError
+
+from elastic.client import get_es
+
+DIARY_INDEX = "diary"
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+MAX_QUERY_LENGTH = 100
+PIT_KEEP_ALIVE = "1m"
+
+SEARCH_FIELDS = ["title^3", "title.ngram^2", "region^2", "region.ngram", "content", "content.ngram"]
+
+# 목록에 필요한 필드 (본문은 하이라이트 조각만 반환)
+SOURCE_FIELDS = ["diary_id", "title", "region", "tags", "member_id", "created_time", "start_date", "end_date",
+                 "total_cost", "bookmark_count", "area_code", "sigungu_code"]
+
+# diary_id 는 같은 정렬 값끼리의 순서를 고정하는 기준 (PIT 를 쓰면 _shard_doc 이 그 뒤에 자동 추가된다)
+SORTS = {
+    "recent": [{"created_time": "desc"}, {"diary_id": "asc"}],
+    "bookmarks": [{"bookmark_count": {"order": "desc", "missing": "_last"}}, {"created_time": "desc"},
+                  {"diary_id": "asc"}],
+}
+
+# 첫 페이지(PIT 없음)의 정렬 값으로 PIT 검색을 이어 갈 때 붙이는 _shard_doc 값
+# diary_id 까지 같은 문서는 마지막으로 받은 문서뿐이므로, 최댓값을 두면 그 문서만 정확히 건너뛴다.
+SHARD_DOC_MAX = 2 ** 63 - 1
+
+_WHITESPACE = re.compile(r"\s+")
+_DATE = re.compile(r"^\d{8}$")
+
+
+# PIT 가 만료되어 커서를 더 이상 쓸 수 없을 때
+class CursorExpired(Exception):
+    pass
+
+
+def _encode_cursor(data):
+    raw = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _is_codes(value):
+    return isinstance(value, list) and all(isinstance(code, str) for code in value)
+
+
+# 커서에 담긴 검색 조건 검증 (parse_diary_params 결과와 같은 키 / 형식이어야 한다)
+def _valid_params(params):
+    return (isinstance(params, dict) and params.keys() == PARAM_KEYS and
+            isinstance(params["q"], str) and len(params["q"]) <= MAX_QUERY_LENGTH and
+            all(_is_codes(params[field]) for field in ("tags", "area_code", "sigungu_code")) and
+            all(value is None or (isinstance(value, str) and _DATE.match(value))
+                for value in (params["from"], params["to"])) and
+            params["sort"] in SORTS and
+            isinstance(params["limit"], int) and 1 <= params["limit"] <= MAX_LIMIT)
+
+
+def _decode_cursor(cursor):
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError("cursor 값이 올바르지 않습니다.") from e
+
+    valid = (isinstance(data, dict) and data.keys() == {"pit", "after", "params"} and
+             (data["pit"] is None or isinstance(data["pit"], str)) and
+             _valid_params(data["params"]) and
+             isinstance(data["after"], list) and
+             len(data["after"]) == len(SORTS[data["params"]["sort"]]) + (data["pit"] is not None) and
+             all(value is None or isinstance(value, (str, int, float)) for value in data["after"]))
+    if not valid:
+        raise ValueError("cursor 값이 올바르지 않습니다.")
+    return data
+
+
+def _split(value):
+    return sorted({part.strip() for part in (value or "").split(",") if part.strip()})
+
+
+# 요청 파라미터 → 검색 조건
+def parse_diary_params(args):
+    query = _WHITESPACE.sub(" ", (args.get("q") or "").strip())
+    if len(query) > MAX_QUERY_LENGTH:
+        raise ValueError(f"q 는 최대 {MAX_QUERY_LENGTH}자까지 입력할 수 있습니다.")
+
+    sort = args.get("sort", "recent")
+    if sort not in SORTS:
+        raise ValueError(f"sort 는 {', '.join(SORTS)} 중 하나여야 합니다.")
+
+    limit = int(args.get("limit", DEFAULT_LIMIT))
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ValueError(f"limit 는 1 ~ {MAX_LIMIT} 사이여야 합니다.")
+
+    # 여행 기간 (YYYYMMDD): 기간이 겹치는 일지
+    date_from, date_to = args.get("from"), args.get("to")
+    for value in (date_from, date_to):
+        if value and not _DATE.match(value):
+            raise ValueError("from / to 는 YYYYMMDD 형식이어야 합니다.")
+
+    return {
+        "q": query,
+        "tags": _split(args.get("tags")),
+        "area_code": _split(args.get("area_code")),
+        "sigungu_code": _split(args.get("sigungu_code")),
+        "from": date_from,
+        "to": date_to,
+        "sort": sort,
+        "limit": limit,
+    }
+
+
+PARAM_KEYS = {"q", "tags", "area_code", "sigungu_code", "from", "to", "sort", "limit"}
+
+
+def build_diary_query(params):
+    filters = [{"term": {"is_public": True}}]
+    for field in ("tags", "area_code", "sigungu_code"):
+        if params[field]:
+            filters.append({"terms": {field: params[field]}})
+    if params["from"]:
+        filters.append({"range": {"end_date": {"gte": params["from"]}}})
+    if params["to"]:
+        filters.append({"range": {"start_date": {"lte": params["to"]}}})
+
+    must = []
+    if params["q"]:
+        must.append({"multi_match": {"query": params["q"], "fields": SEARCH_FIELDS, "type": "most_fields"}})
+    return {"bool": {"must": must, "filter": filters}}
+
+
+def _close_pit(es, pit_id):
+    try:
+        es.close_point_in_time(id=pit_id)
+    except NotFoundError:
+        pass
+
+
+# 검색 실행. cursor 가 있으면 다른 파라미터는 무시하고 커서에 담긴 조건으로 다음 페이지를 가져온다.
+# 결과: {"diaries", "total", "next_cursor"}
+def search_diaries(args):
+    es = get_es()
+    cursor = args.get("cursor")
+    pit_id, search_after = None, None
+    if cursor:
+        state = _decode_cursor(cursor)
+        params, pit_id, search_after = state["params"], state["pit"], state["after"]
+        if pit_id is None:
+            # 두 번째 페이지: 여기서부터 PIT 로 결과를 고정한다.
+            try:
+                pit_id = es.open_point_in_time(index=DIARY_INDEX, keep_alive=PIT_KEEP_ALIVE)["id"]
+            except NotFoundError as e:
+                raise CursorExpired("일지 인덱스를 찾을 수 없습니다. 처음부터 다시 검색하세요.") from e
+            search_after = search_after + [SHARD_DOC_MAX]
+    else:
+        params = parse_diary_params(args)
+
+    body = {
+        "query": build_diary_query(params),
+        "sort": SORTS[params["sort"]],
+        "size": params["limit"],
+        "_source": SOURCE_FIELDS,
+        # 전체 건수는 첫 페이지에서만 계산
+        "track_total_hits": search_after is None,
+    }
+    if pit_id is None:
+        body["index"] = DIARY_INDEX
+    else:
+        body["pit"] = {"id": pit_id, "keep_alive": PIT_KEEP_ALIVE}
+    if search_after is not None:
+        body["search_after"] = search_after
+    if params["q"]:
+        body["highlight"] = {"fields": {"content": {"fragment_size": 100, "number_of_fragments": 1}}}
+
+    try:
+        response = es.search(**body)
+    except NotFoundError as e:
+        if pit_id is None:
+            # 일지 인덱스가 아직 없으면 빈 결과
+            return {"diaries": [], "total": 0, "next_cursor": None}
+        raise CursorExpired("검색 시간이 만료되었습니다. 처음부터 다시 검색하세요.") from e
+    except Exception:
+        if pit_id is not None:
+            _close_pit(es, pit_id)
+        raise
+
+    hits = response["hits"]["hits"]
+    if pit_id is not None:
+        pit_id = response.get("pit_id", pit_id)
+    diaries = []
+    for hit in hits:
+        diary = hit["_source"]
+        if "highlight" in hit:
+            diary["highlight"] = hit["highlight"]["content"][0]
+        diaries.append(diary)
+
+    next_cursor = None
+    if len(hits) == params["limit"]:
+        next_cursor = _encode_cursor({"pit": pit_id, "after": hits[-1]["sort"], "params": params})
+    elif pit_id is not None:
+        # 마지막 페이지: PIT 를 바로 닫아 검색 컨텍스트를 반환
+        _close_pit(es, pit_id)
+
+    return {
+        "diaries": diaries,
+        "total": response["hits"]["total"]["value"] if "total" in response["hits"] else None,
+        "next_cursor": next_cursor,
+    }
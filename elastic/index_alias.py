@@ -0,0 +1,200 @@
+# index_alias.py
+# 별칭(alias) 기반 무중단(blue/green) 재색인
+#
+#   tour_spots (alias) ──> tour_spots_v3 (현재)      tour_spots_v4 (새로 적재 중)
+#
+# 1. {alias}_v{n+1} 인덱스를 벌크 적재용 설정(refresh 끔, 복제본 0)으로 생성
+# 2. 새 인덱스에 데이터 적재
+# 3. 설정 복구 후 refresh, before_swap 호출 (적재 중 들어온 쓰기 보정 등), 문서 수 검증
+# 4. update_aliases 한 번으로 별칭을 새 인덱스로 원자적으로 교체
+#    (별칭과 같은 이름의 기존 실제 인덱스가 있으면 같은 요청에서 remove_index 로 제거)
+# 5. 이전 버전 인덱스 정리 (롤백용으로 keep 개 보관)
+# 검색은 항상 별칭을 보므로 재색인 중에도 비어 있는 시간이 없다.
+import copy
+import logging
+import re
+
+from elasticsearch import NotFoundError, helpers
+
+logger = logging.getLogger(__name__)
+
+# 벌크 적재 중 설정 (적재가 끝나면 인덱스 정의의 값 / 기본값으로 복구)
+BULK_LOAD_SETTINGS = {"refresh_interval": "-1", "number_of_replicas": 0}
+
+
+def _version_pattern(alias):
+    return re.compile(rf"^{re.escape(alias)}_v(\d+)$")
+
+
+# alias_v{n} 형식의 물리 인덱스를 버전 순으로 반환
+def versioned_indices(es, alias):
+    pattern = _version_pattern(alias)
+    names = es.indices.get(index=f"{alias}_v*", ignore_unavailable=True, allow_no_indices=True)
+    versions = [(int(match.group(1)), name) for name in names if (match := pattern.match(name))]
+    return [name for _, name in sorted(versions)]
+
+
+def next_index_name(es, alias):
+    indices = versioned_indices(es, alias)
+    last = int(_version_pattern(alias).match(indices[-1]).group(1)) if indices else 0
+    return f"{alias}_v{last + 1}"
+
+
+# 별칭이 가리키는 인덱스 목록 (별칭이 없으면 빈 목록)
+def alias_targets(es, alias):
+    try:
+        return sorted(es.indices.get_alias(name=alias).keys())
+    except NotFoundError:
+        return []
+
+
+# 별칭이 아니라 같은 이름의 실제 인덱스로 존재하는지 (별칭 도입 이전 구조)
+def is_concrete_index(es, alias):
+    return es.indices.exists(index=alias) and not alias_targets(es, alias)
+
+
+def create_versioned_index(es, alias, index_body):
+    index_name = next_index_name(es, alias)
+    body = copy.deepcopy(index_body)
+    body.setdefault("settings", {}).setdefault("index", {}).update(BULK_LOAD_SETTINGS)
+    es.indices.create(index=index_name, body=body)
+    logger.info(f"새 인덱스 생성: {index_name} (벌크 적재 설정)")
+    return index_name
+
+
+# 벌크 적재 설정 복구: 인덱스 정의에 값이 있으면 그 값, 없으면 null(클러스터 기본값)
+def restore_settings(es, index_name, index_body):
+    defined = index_body.get("settings", {}).get("index", {})
+    settings = {key: defined.get(key) for key in BULK_LOAD_SETTINGS}
+    es.indices.put_settings(index=index_name, settings={"index": settings})
+    es.indices.refresh(index=index_name)
+
+
+# 새 인덱스 문서 수 검증
+# 현재 별칭이 버전 인덱스를 가리키고 있으면 그 문서 수의 min_ratio 이상이어야 한다.
+def validate_count(es, index_name, alias, min_docs=1, min_ratio=0.9):
+    count = es.count(index=index_name)["count"]
+    previous = [name for name in alias_targets(es, alias) if _version_pattern(alias).match(name)]
+    previous_count = sum(es.count(index=name)["count"] for name in previous)
+
+    if count < min_docs:
+        raise ValueError(f"{index_name} 문서 수가 너무 적습니다: {count} < {min_docs}")
+    if previous_count and count < previous_count * min_ratio:
+        raise ValueError(f"{index_name} 문서 수가 기존 대비 부족합니다: {count} < {previous_count} × {min_ratio}")
+    logger.info(f"문서 수 검증 통과: {index_name} {count}건 (기존 {previous_count}건)")
+    return count
+
+
+# 인덱스 쓰기 차단 / 해제 (index.blocks.write, 이미 삭제된 인덱스는 건너뜀)
+def set_write_block(es, indices, blocked):
+    for index_name in indices:
+        try:
+            es.indices.put_settings(index=index_name, settings={"index.blocks.write": True if blocked else None})
+        except NotFoundError:
+            continue
+        logger.info(f"쓰기 {'차단' if blocked else '차단 해제'}: {index_name}")
+
+
+# 별칭을 새 인덱스로 원자적으로 교체
+def swap_alias(es, alias, index_name):
+    actions = [{"remove": {"index": old, "alias": alias}} for old in alias_targets(es, alias) if old != index_name]
+    if is_concrete_index(es, alias):
+        actions.append({"remove_index": {"index": alias}})
+    actions.append({"add": {"index": index_name, "alias": alias}})
+    es.indices.update_aliases(actions=actions)
+    logger.info(f"별칭 교체: {alias} -> {index_name}")
+
+
+# 별칭에 연결되지 않은 이전 버전 인덱스 삭제 (최근 keep 개는 롤백용으로 보관)
+def cleanup_old_indices(es, alias, keep=1):
+    active = set(alias_targets(es, alias))
+    stale = [name for name in versioned_indices(es, alias) if name not in active]
+    to_delete = stale[:-keep] if keep > 0 else stale
+    for name in to_delete:
+        es.indices.delete(index=name)
+        logger.info(f"이전 인덱스 삭제: {name}")
+    return to_delete
+
+
+# 별칭이 없을 때 첫 버전 인덱스를 만들고 별칭 연결 (일반 설정으로 생성)
+def ensure_alias(es, alias, index_body):
+    if alias_targets(es, alias) or es.indices.exists(index=alias):
+        return False
+    index_name = next_index_name(es, alias)
+    es.indices.create(index=index_name, body=index_body)
+    es.indices.update_aliases(actions=[{"add": {"index": index_name, "alias": alias}}])
+    logger.info(f"인덱스 생성 및 별칭 연결: {alias} -> {index_name}")
+    return True
+
+
+# 전체 blue/green 재색인
+# load(index_name) 이 새 인덱스에 데이터를 적재하고, 검증에 실패하면 새 인덱스를 지우고 예외를 다시 던진다.
+# before_swap(index_name) 은 문서 수 검증 전에 호출된다.
+# (적재 중 기존 인덱스에 생긴 문서까지 보정한 뒤 비교해야 min_ratio=1.0 에서도 검증이 맞는다.)
+def blue_green_reindex(es, alias, index_body, load, min_docs=1, min_ratio=0.9, keep=1, before_swap=None):
+    index_name = create_versioned_index(es, alias, index_body)
+    try:
+        load(index_name)
+        restore_settings(es, index_name, index_body)
+        if before_swap is not None:
+            before_swap(index_name)
+        count = validate_count(es, index_name, alias, min_docs=min_docs, min_ratio=min_ratio)
+    except Exception:
+        logger.error(f"재색인 실패, 새 인덱스 삭제: {index_name}")
+        es.indices.delete(index=index_name, ignore_unavailable=True)
+        raise
+
+    swap_alias(es, alias, index_name)
+    deleted = cleanup_old_indices(es, alias, keep=keep)
+    return {"index": index_name, "count": count, "deleted": deleted}
+
+
+def _doc_ids(es, index_name):
+    return {hit["_id"] for hit in helpers.scan(es, index=index_name, query={"query": {"match_all": {}}},
+                                               _source=False)}
+
+
+# source 에 없는 문서를 dest 에서 삭제 (삭제 건수 반환)
+def delete_missing(es, source, dest):
+    missing = _doc_ids(es, dest) - _doc_ids(es, source)
+    if missing:
+        helpers.bulk(es, ({"_op_type": "delete", "_index": dest, "_id": doc_id} for doc_id in missing),
+                     refresh=True)
+    return len(missing)
+
+
+# 현재 별칭(또는 같은 이름의 실제 인덱스) 문서를 {alias}_v{n+1} 로 _reindex 한 뒤 별칭 교체
+# 원본 _source 를 그대로 옮기므로 ES 에서만 관리하는 필드도 유지된다.
+# 복사하는 동안에도 쓰기는 원본 인덱스로 들어가므로, 별칭을 옮기기 직전에 보정한다.
+#   1. 원본 쓰기 차단 (index.blocks.write, 이 구간의 쓰기 요청은 실패하므로 호출하는 쪽에서 재시도)
+#   2. 한 번 더 _reindex: 문서 버전을 그대로 옮기므로(version_type=external) 복사 이후 바뀐 문서만 덮어씀
+#   3. 복사 이후 원본에서 삭제된 문서는 새 인덱스에서도 삭제
+#   4. 문서 수 검증, 별칭 교체 후 원본 쓰기 차단 해제 (롤백용으로 남는 이전 인덱스 포함, 실패해도 해제)
+# 쓰기가 막히는 시간은 전체 복사가 아니라 보정에 걸리는 시간뿐이다.
+def reindex_alias(es, alias, index_body, min_docs=1, min_ratio=1.0, keep=1):
+    sources = alias_targets(es, alias) or [alias]
+
+    def copy(index_name, label):
+        result = es.reindex(source={"index": alias}, dest={"index": index_name, "version_type": "external"},
+                            conflicts="proceed", wait_for_completion=True, refresh=True)
+        if result.get("failures"):
+            raise RuntimeError(f'{index_name} 재색인 실패: {result["failures"][:5]}')
+        logger.info(f'{alias} {label}: {result.get("total")}건 중 생성 {result.get("created", 0)}건, '
+                    f'갱신 {result.get("updated", 0)}건 -> {index_name}')
+
+    def load(index_name):
+        copy(index_name, "재색인")
+
+    def catch_up(index_name):
+        set_write_block(es, sources, True)
+        copy(index_name, "재색인 보정")
+        removed = delete_missing(es, alias, index_name)
+        if removed:
+            logger.info(f"{alias} 재색인 보정: 원본에서 삭제된 {removed}건 삭제 -> {index_name}")
+        es.indices.refresh(index=index_name)
+
+    try:
+        return blue_green_reindex(es, alias, index_body, load, min_docs=min_docs, min_ratio=min_ratio, keep=keep,
+                                  before_swap=catch_up)
+    finally:
+        set_write_block(es, sources, False)
@@ -0,0 +1,137 @@
+# json_stream.py
+# 대용량 JSON 파일을 한 항목씩 읽는 스트리밍 파서
+#
+# json.load 로 파일 전체를 올리지 않고, 일정 크기씩 읽으면서 항목 단위로 돌려준다.
+#   - JSON 배열 파일 ([{...}, {...}, ...]) : 배열 원소를 하나씩 디코딩
+#   - NDJSON 파일 (한 줄에 객체 하나)       : 줄 단위 디코딩
+# 어느 쪽이든 메모리에는 읽기 버퍼와 현재 항목만 유지된다.
+import codecs
+import json
+
+READ_SIZE = 1 << 16  # 64KB
+MAX_ITEM_SIZE = 1 << 24  # 항목 하나의 최대 크기 (16M 글자)
+_WHITESPACE = ' \t\r\n'
+
+
+class JsonStreamError(ValueError):
+    pass
+
+
+def _first_char(f):
+    head = f.read(4096).decode('utf-8-sig', errors='ignore')
+    stripped = head.lstrip(_WHITESPACE)
+    return stripped[:1]
+
+
+# JSON 배열 원소를 (항목, 항목이 끝난 바이트 오프셋) 으로 반환
+# start_offset 이 0 보다 크면 이전에 반환한 항목의 끝 오프셋에서 이어 읽는다 (배열 내부에서 재개).
+# 원소 사이에는 , 가 정확히 하나 있어야 한다 ([{..},,{..}] / [{..},] / [,{..}] 는 오류).
+# 항목 하나가 max_item_size 글자를 넘도록 디코딩되지 않으면 파일 나머지를 버퍼에 쌓지 않고 오류를 낸다.
+def iter_json_array(f, read_size=READ_SIZE, start_offset=0, max_item_size=MAX_ITEM_SIZE):
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buf = ''
+    pos = 0
+    eof = False
+    # open: [ 대기, value: 항목 대기 (empty 이면 ] 도 허용), sep: , 또는 ] 대기
+    state = 'sep' if start_offset > 0 else 'open'
+    empty = False
+
+    f.seek(start_offset)
+    offset = start_offset  # buf[pos] 의 파일 내 바이트 오프셋
+    if start_offset == 0 and f.read(len(codecs.BOM_UTF8)) == codecs.BOM_UTF8:
+        offset = len(codecs.BOM_UTF8)
+    f.seek(offset)
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = f.read(read_size)
+        if not chunk:
+            eof = True
+            buf = buf[pos:] + text_decoder.decode(b'', final=True)
+        else:
+            buf = buf[pos:] + text_decoder.decode(chunk)
+        pos = 0
+
+    while True:
+        # 공백 건너뛰기 (모두 1바이트 문자)
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+            offset += 1
+        if pos >= len(buf):
+            if eof:
+                raise JsonStreamError('JSON 배열이 닫히지 않았습니다.')
+            fill()
+            continue
+
+        char = buf[pos]
+        if state == 'open':
+            if char != '[':
+                raise JsonStreamError('JSON 배열 파일이 아닙니다.')
+            state, empty = 'value', True
+            pos += 1
+            offset += 1
+            continue
+
+        if state == 'sep':
+            if char == ']':
+                return
+            if char != ',':
+                raise JsonStreamError(f'항목 뒤에 , 또는 ] 가 와야 합니다 (offset {offset}).')
+            state, empty = 'value', False
+            pos += 1
+            offset += 1
+            continue
+
+        if char == ']' and empty:
+            return
+        if char in ',]':
+            raise JsonStreamError(f'빈 항목이 있습니다 (offset {offset}).')
+
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError as e:
+            # 버퍼 끝에서 항목이 잘린 경우: 더 읽어서 다시 시도
+            if eof:
+                raise JsonStreamError(f'JSON 항목 파싱 실패 (offset {offset}): {e}') from e
+            if len(buf) - pos > max_item_size:
+                raise JsonStreamError(f'JSON 항목 파싱 실패 (offset {offset}, {max_item_size}자 초과): {e}') from e
+            fill()
+            continue
+        if end == len(buf) and not eof:
+            # 숫자처럼 구분자 없이 끝나는 값이 잘렸을 수 있으므로 더 읽고 다시 디코딩
+            fill()
+            continue
+        offset += len(buf[pos:end].encode('utf-8'))
+        pos = end
+        state = 'sep'
+        yield item, offset
+
+
+# NDJSON 줄을 (항목, 줄이 끝난 바이트 오프셋) 으로 반환
+def iter_ndjson(f, start_offset=0):
+    f.seek(start_offset)
+    offset = start_offset
+    for line in f:
+        offset += len(line)
+        line = line.strip()
+        if line:
+            yield json.loads(line), offset
+
+
+# 파일 형식을 첫 글자로 판단해서 항목을 하나씩 반환
+# with_offsets=True 이면 (항목, 바이트 오프셋) 을 반환하고, 그 오프셋을 start_offset 으로 넘기면 다음 항목부터 재개한다.
+def iter_json_items(file_path, read_size=READ_SIZE, start_offset=0, with_offsets=False):
+    with open(file_path, 'rb') as f:
+        first = _first_char(f)
+        if first == '[':
+            items = iter_json_array(f, read_size, start_offset)
+        elif first == '{':
+            items = iter_ndjson(f, start_offset)
+        elif first:
+            raise JsonStreamError(f'지원하지 않는 JSON 형식입니다: {file_path}')
+        else:
+            return
+
+        for item, offset in items:
+            yield (item, offset) if with_offsets else item
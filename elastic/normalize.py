@@ -0,0 +1,165 @@
+# normalize.py
+# TourAPI 항목 → 색인용 여행지 문서 정규화
+#
+# get_tour(api/tour_spot.py), update_tour_data(elastic/update_spot.py), send_to_elastic(elastic/tour_to_elastic.py)
+# 세 경로가 모두 normalize_batch 를 사용하므로 같은 원본에서는 같은 문서가 만들어진다.
+#   1. 필드명 변환 (camelCase → snake_case) 및 허용 필드만 선택
+#   2. 제외 조건 (sigungu_code 99, map_x 0, content_type_id 15, 좌표 없음)
+#   3. 날짜 형식 변환, sort_title, location, classified_type_id, content_hash 생성
+# 이미 정규화된 문서를 다시 넣어도 결과가 같다. (get_tour 가 저장한 파일을 send_to_elastic 이 다시 정규화)
+#
+# 처리량 비교: python benchmarks/normalize_bench.py
+import hashlib
+import json
+import logging
+import re
+from datetime import datetime
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# 필드명 변환 매핑 테이블
+snake_case_mapping = {
+    "addr1": "addr1",
+    "addr2": "addr2",
+    "areacode": "area_code",
+    "booktour": "book_tour",
+    "cat1": "cat1",
+    "cat2": "cat2",
+    "cat3": "cat3",
+    "contentid": "content_id",
+    "contenttypeid": "content_type_id",
+    "createdtime": "created_time",
+    "firstimage": "first_image",
+    "firstimage2": "first_image2",
+    "cpyrhtDivCd": "cpyrht_div_cd",
+    "mapx": "map_x",
+    "mapy": "map_y",
+    "mlevel": "m_level",
+    "modifiedtime": "modified_time",
+    "sigungucode": "sigungu_code",
+    "tel": "tel",
+    "title": "title",
+    "zipcode": "zipcode"
+}
+
+# 가져올 필드 목록 (제외하고 싶은 필드는 포함시키지 않음)
+allowed_fields = {
+    "addr1", "addr2", "area_code", "cat1", "cat2", "cat3", "content_id",
+    "content_type_id", "created_time", "first_image", "first_image2",
+    "map_x", "map_y", "modified_time", "sigungu_code", "tel", "title"
+}
+
+# content_type_id 변환 규칙
+content_type_mapping = {
+    "12": "100",
+    "14": "100",
+    "25": "100",
+    "28": "100",
+    "38": "100",
+    "32": "200",
+    "39": "300"
+}
+
+# 제외 조건 (필드, 값)
+exclude_rules = (
+    ("sigungu_code", "99"),
+    ("map_x", "0"),
+    ("content_type_id", "15"),
+)
+
+# 원본 키와 이미 변환된 키 → 허용 필드 (변환 + 선택을 dict 조회 한 번으로)
+_field_map = {key: field for key, field in snake_case_mapping.items() if field in allowed_fields}
+_field_map.update((field, field) for field in allowed_fields)
+
+_HANGUL = re.compile(r'[가-힣]')
+_ALPHABET = re.compile(r'[a-zA-Z]')
+_DIGIT = re.compile(r'[0-9]')
+
+
+# 첫 글자별 정렬 접두 문자 (한글 < 영문 < 숫자 < 기타 순으로 정렬되도록)
+@lru_cache(maxsize=4096)
+def _sort_prefix(first_char):
+    if _HANGUL.match(first_char):
+        return ""
+    elif _ALPHABET.match(first_char):
+        return "\u200b"
+    elif _DIGIT.match(first_char):
+        return "\u200c"
+    else:
+        return "\u200d"
+
+
+# title의 첫 글자를 기준으로 정렬용 필드를 생성
+def generate_sort_title(title):
+    if not title:
+        return "\u200d"  # 보이지 않는 유니코드 문자 추가
+    return _sort_prefix(title[0]) + title
+
+
+# API 날짜(YYYYMMDDHHMMSS) → date_hour_minute_second 형식
+# 14자리 숫자는 문자열 슬라이싱, 이미 변환된 값은 그대로, 그 밖의 값만 strptime 으로 파싱한다.
+def format_api_time(value):
+    if len(value) == 14 and value.isdigit():
+        return f"{value[0:4]}-{value[4:6]}-{value[6:8]}T{value[8:10]}:{value[10:12]}:{value[12:14]}"
+    if len(value) == 19 and value[4] == "-" and value[10] == "T":
+        return value
+    return datetime.strptime(value, "%Y%m%d%H%M%S").strftime("%Y-%m-%dT%H:%M:%S")
+
+
+# 문서 지문: 정규화된 문서의 해시 (content_hash 필드 자신은 제외)
+# 동기화 시 색인된 값과 같으면 변경이 없는 것으로 보고 건너뛴다.
+def content_fingerprint(doc):
+    payload = {key: value for key, value in doc.items() if key != "content_hash"}
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha1(encoded).hexdigest()
+
+
+# 원본 항목 여러 개를 한 번에 정규화 (제외된 항목은 빠진 목록)
+def normalize_batch(items):
+    field_map = _field_map
+    sort_prefix = _sort_prefix
+    fingerprint = content_fingerprint
+    docs = []
+    excluded = 0
+
+    for item in items:
+        doc = {field_map[key]: value for key, value in item.items() if key in field_map}
+
+        if any(doc.get(field) == value for field, value in exclude_rules):
+            excluded += 1
+            continue
+        try:
+            location = {"lat": float(doc["map_y"]), "lon": float(doc["map_x"])}
+        except (KeyError, TypeError, ValueError):
+            logger.warning(f"content_id {doc.get('content_id')} 제외됨 (좌표 없음)")
+            excluded += 1
+            continue
+
+        created_time = doc.get("created_time")
+        if created_time:
+            doc["created_time"] = format_api_time(created_time)
+        modified_time = doc.get("modified_time")
+        if modified_time:
+            doc["modified_time"] = format_api_time(modified_time)
+
+        title = doc.get("title")
+        doc["sort_title"] = sort_prefix(title[0]) + title if title else "\u200d"
+        doc["location"] = location
+
+        classified = content_type_mapping.get(doc.get("content_type_id"))
+        if classified:
+            doc["classified_type_id"] = classified
+
+        doc["content_hash"] = fingerprint(doc)
+        docs.append(doc)
+
+    if excluded:
+        logger.debug(f"정규화: {len(docs)}건, 제외 {excluded}건")
+    return docs
+
+
+# 항목 하나 정규화 (제외 대상이면 None)
+def normalize_item(item):
+    docs = normalize_batch([item])
+    return docs[0] if docs else None
@@ -0,0 +1,183 @@
+# spot_geo.py
+# 지도용 여행지 조회 (/spots/nearby, /spots/tiles/<z>/<x>/<y>)
+#
+#   nearby : 좌표 기준 반경(geo_distance) 안의 여행지를 거리순으로 반환
+#   tiles  : 웹 지도 타일(z/x/y) 범위 안의 여행지
+#            - DETAIL_ZOOM 미만: geotile_grid(타일보다 GRID_PRECISION_OFFSET 단계 세밀한 격자) + geo_centroid 군집
+#            - DETAIL_ZOOM 이상: 여행지 목록
+# 타일 응답은 캐시하고, 동기화로 바뀐 여행지가 들어 있는 타일만 invalidate_locations 로 지운다.
+import math
+import os
+
+from elastic.client import get_es
+from elastic.spot_search import SPOT_INDEX
+from utils.cache import TTLCache
+
+MAX_TILE_ZOOM = int(os.getenv("SPOT_TILE_MAX_ZOOM", 18))
+DETAIL_ZOOM = int(os.getenv("SPOT_TILE_DETAIL_ZOOM", 14))
+GRID_PRECISION_OFFSET = 3  # 타일 하나를 8 × 8 격자로 군집
+MAX_TILE_SPOTS = 200
+
+DEFAULT_RADIUS_KM = 5.0
+MAX_RADIUS_KM = 50.0
+DEFAULT_NEARBY_LIMIT = 20
+MAX_NEARBY_LIMIT = 100
+
+# 지도에 필요한 필드만 반환 (타일 캐시 메모리 절약)
+MAP_SOURCE_FIELDS = ["content_id", "title", "location", "classified_type_id", "content_type_id", "first_image",
+                     "addr1"]
+
+# 타일 응답은 동기화 때 명시적으로 지우므로 TTL 을 길게 둔다.
+tile_cache = TTLCache(maxsize=int(os.getenv("SPOT_TILE_CACHE_SIZE", 512)),
+                      ttl=float(os.getenv("SPOT_TILE_CACHE_TTL", 86400)))
+
+# 타일 경계 위의 여행지를 양쪽 타일 모두에서 지우기 위한 여유 (도, geo_point 저장 정밀도 약 1e-7 보다 크게)
+TILE_BORDER_EPSILON = 1e-6
+
+# 타일 캐시 키에 들어가는 classified_type_id 값 (None = 필터 없음)
+TILE_TYPE_FILTERS = (None, "100", "200", "300")
+
+
+def _parse_float(args, name, default=None):
+    value = args.get(name, default)
+    if value is None:
+        raise ValueError(f"{name} 값이 필요합니다.")
+    return float(value)
+
+
+def _type_filter(args):
+    type_id = args.get("classified_type_id") or None
+    if type_id not in TILE_TYPE_FILTERS:
+        raise ValueError(f"classified_type_id 는 {', '.join(TILE_TYPE_FILTERS[1:])} 중 하나여야 합니다.")
+    return type_id
+
+
+# 좌표 기준 반경 검색 (거리순, distance_km 포함)
+def nearby_spots(args):
+    lat = _parse_float(args, "lat")
+    lon = _parse_float(args, "lon")
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError("lat / lon 범위가 올바르지 않습니다.")
+    radius = _parse_float(args, "radius", DEFAULT_RADIUS_KM)
+    if not 0 < radius <= MAX_RADIUS_KM:
+        raise ValueError(f"radius 는 0 ~ {MAX_RADIUS_KM}km 사이여야 합니다.")
+    limit = int(args.get("limit", DEFAULT_NEARBY_LIMIT))
+    if not 1 <= limit <= MAX_NEARBY_LIMIT:
+        raise ValueError(f"limit 는 1 ~ {MAX_NEARBY_LIMIT} 사이여야 합니다.")
+    type_id = _type_filter(args)
+
+    filters = [{"geo_distance": {"distance": f"{radius}km", "location": {"lat": lat, "lon": lon}}}]
+    if type_id:
+        filters.append({"term": {"classified_type_id": type_id}})
+
+    response = get_es().search(
+        index=SPOT_INDEX,
+        query={"bool": {"filter": filters}},
+        sort=[{"_geo_distance": {"location": {"lat": lat, "lon": lon}, "order": "asc", "unit": "km"}}],
+        size=limit,
+        _source=MAP_SOURCE_FIELDS,
+        track_total_hits=False,
+    )
+    return [dict(hit["_source"], distance_km=round(hit["sort"][0], 3)) for hit in response["hits"]["hits"]]
+
+
+# 좌표 → 줌 z 에서의 타일 번호 (웹 메르카토르)
+def tile_for(lat, lon, z):
+    n = 1 << z
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+# 타일 → 경계 (top_left, bottom_right)
+def tile_bounds(z, x, y):
+    n = 1 << z
+
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return ({"lat": lat(y), "lon": x / n * 360.0 - 180.0},
+            {"lat": lat(y + 1), "lon": (x + 1) / n * 360.0 - 180.0})
+
+
+def validate_tile(z, x, y):
+    if not 0 <= z <= MAX_TILE_ZOOM:
+        raise ValueError(f"z 는 0 ~ {MAX_TILE_ZOOM} 사이여야 합니다.")
+    n = 1 << z
+    if not (0 <= x < n and 0 <= y < n):
+        raise ValueError("타일 번호가 줌 범위를 벗어났습니다.")
+
+
+def _build_tile_body(z, x, y, type_id):
+    top_left, bottom_right = tile_bounds(z, x, y)
+    filters = [{"geo_bounding_box": {"location": {"top_left": top_left, "bottom_right": bottom_right}}}]
+    if type_id:
+        filters.append({"term": {"classified_type_id": type_id}})
+    body = {"query": {"bool": {"filter": filters}}, "track_total_hits": True}
+
+    if z >= DETAIL_ZOOM:
+        body.update(size=MAX_TILE_SPOTS, _source=MAP_SOURCE_FIELDS, sort=[{"content_id": "asc"}])
+    else:
+        precision = min(z + GRID_PRECISION_OFFSET, 29)
+        body.update(size=0, aggs={
+            "grid": {
+                "geotile_grid": {
+                    "field": "location",
+                    "precision": precision,
+                    "bounds": {"top_left": top_left, "bottom_right": bottom_right},
+                    "size": 1 << (2 * GRID_PRECISION_OFFSET),
+                },
+                "aggs": {"centroid": {"geo_centroid": {"field": "location"}}},
+            }
+        })
+    return body
+
+
+# 타일 응답 (캐시 우선): {"z", "x", "y", "count", "clusters" 또는 "spots", "cached"}
+def tile_spots(z, x, y, args):
+    validate_tile(z, x, y)
+    type_id = _type_filter(args)
+    key = (z, x, y, type_id)
+    cached = tile_cache.get(key)
+    if cached is not None:
+        return dict(cached, cached=True)
+
+    response = get_es().search(index=SPOT_INDEX, **_build_tile_body(z, x, y, type_id))
+    result = {"z": z, "x": x, "y": y, "count": response["hits"]["total"]["value"]}
+    if z >= DETAIL_ZOOM:
+        result["spots"] = [hit["_source"] for hit in response["hits"]["hits"]]
+    else:
+        result["clusters"] = [
+            {"key": bucket["key"], "count": bucket["doc_count"], "centroid": bucket["centroid"]["location"]}
+            for bucket in response["aggregations"]["grid"]["buckets"]
+        ]
+    tile_cache.set(key, result)
+    return dict(result, cached=False)
+
+
+# 좌표가 들어 있는 줌 z 의 타일 목록
+# geo_bounding_box 는 경계를 포함하므로 경계 위(TILE_BORDER_EPSILON 이내)의 좌표는 맞닿은 타일(최대 4개)에 모두 걸린다.
+def tiles_containing(lat, lon, z):
+    return {tile_for(lat + d_lat, lon + d_lon, z)
+            for d_lat in (-TILE_BORDER_EPSILON, TILE_BORDER_EPSILON)
+            for d_lon in (-TILE_BORDER_EPSILON, TILE_BORDER_EPSILON)}
+
+
+# 바뀐 여행지 좌표가 들어 있는 모든 줌의 타일 캐시 삭제 (삭제된 키 수 반환)
+# locations: {"lat", "lon"} 목록 (이동한 여행지는 이전 좌표와 새 좌표를 모두 넘긴다)
+def invalidate_locations(locations):
+    tiles = set()
+    for location in locations:
+        if not location:
+            continue
+        lat, lon = float(location["lat"]), float(location["lon"])
+        for z in range(MAX_TILE_ZOOM + 1):
+            tiles.update((z,) + tile for tile in tiles_containing(lat, lon, z))
+
+    removed = 0
+    for tile in tiles:
+        for type_id in TILE_TYPE_FILTERS:
+            if tile_cache.pop(tile + (type_id,)) is not None:
+                removed += 1
+    return removed
@@ -0,0 +1,251 @@
+# spot_mapping.py
+# 추천 여행지 이름(VISIT_AREA_NM) → tour_spots 문서(content_id) 매핑 테이블과 추천 결과 보강
+#
+# 추천 모델의 여행지 이름과 tour_spots 의 title 을 미리 msearch 로 맞춰 두고,
+# 추천 top-N 은 매핑된 content_id 로 mget 한 번에 여행지 정보(이미지, 주소, 좌표 등)를 붙인다.
+#   - 매핑 테이블은 SPOT_MAPPING_PATH 파일로 저장해서 재시작 후에도 그대로 사용
+#   - tour_spots 별칭 대상 인덱스가 바뀌면(재색인) 백그라운드에서 전체 재생성
+#   - 같은 인덱스면 마지막 확인 이후 modified_time 이 바뀐 문서만 가져와서 이름이 맞는 항목만 갱신 (야간 동기화 반영)
+#   - 모델만 바뀌었으면 새로 생긴 이름만 조회
+#   - 생성 중이거나 ES 오류가 나도 추천 응답은 막지 않고 spot 만 비워서 반환
+#   - 보강 mget 은 요청 스레드에서 실행되므로 짧은 타임아웃(SPOT_ENRICH_TIMEOUT), 재시도 없이 보내고 실패하면 spot 을 비움
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime
+
+from elasticsearch import helpers
+
+from elastic.client import get_es
+from elastic.index_alias import alias_targets
+from elastic.spot_search import SOURCE_FIELDS, SPOT_INDEX
+
+logger = logging.getLogger(__name__)
+
+SPOT_MAPPING_PATH = os.getenv("SPOT_MAPPING_PATH",
+                              os.path.join(os.path.dirname(os.path.abspath(__file__)), ".spot_mapping.json"))
+# tour_spots 변경 여부를 확인하는 최소 간격 (초)
+CHECK_INTERVAL = float(os.getenv("SPOT_MAPPING_CHECK_INTERVAL", 600))
+# 갱신에 실패했을 때 다시 시도하기까지의 최소 간격 (초)
+RETRY_INTERVAL = 30.0
+# msearch 한 번에 보낼 이름 수
+MSEARCH_BATCH = 100
+# 추천 보강 mget 타임아웃 (초, 재시도 없음)
+ENRICH_TIMEOUT = float(os.getenv("SPOT_ENRICH_TIMEOUT", 0.5))
+
+_state = {"mapping": None, "model_version": None, "tour_signature": None, "modified": None, "checked_at": None,
+          "attempted_at": None}
+_state_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+
+_PARENTHESES = re.compile(r"\(.*?\)|\[.*?\]")
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+# 비교용 이름 정규화: 괄호 내용, 공백, 문장부호 제거 후 소문자
+def normalize_name(name):
+    return _NON_WORD.sub("", _PARENTHESES.sub("", name)).lower()
+
+
+# tour_spots 서명: 별칭 대상 인덱스 (재색인으로 바뀌었을 때만 전체 재생성)
+def tour_signature(es):
+    return ",".join(alias_targets(es, SPOT_INDEX) or [SPOT_INDEX])
+
+
+# tour_spots 최신 modified_time (문서가 없으면 None)
+def latest_modified(es):
+    response = es.search(index=SPOT_INDEX, size=0, aggs={"modified": {"max": {"field": "modified_time"}}})
+    modified = response["aggregations"]["modified"]
+    return modified.get("value_as_string") or modified["value"]
+
+
+# 검색 결과 중 이름이 정확히 같은(정규화 기준) 문서만 매핑 (비슷한 이름의 다른 장소가 붙지 않도록)
+def _match(name, hits):
+    key = normalize_name(name)
+    for hit in hits:
+        source = hit.get("_source", {})
+        if normalize_name(source.get("title", "")) == key:
+            return source.get("content_id") or hit["_id"]
+    return None
+
+
+# 이름 목록 → {이름: content_id 또는 None} (msearch 배치)
+def build_mapping(es, names):
+    mapping = {}
+    names = list(names)
+    for i in range(0, len(names), MSEARCH_BATCH):
+        batch = names[i:i + MSEARCH_BATCH]
+        searches = []
+        for name in batch:
+            searches.append({"index": SPOT_INDEX})
+            searches.append({"query": {"match": {"title": {"query": name, "operator": "and"}}},
+                             "size": 3, "_source": ["content_id", "title"]})
+        responses = es.msearch(searches=searches)["responses"]
+        for name, response in zip(batch, responses):
+            hits = [] if "error" in response else response["hits"]["hits"]
+            mapping[name] = _match(name, hits)
+    return mapping
+
+
+# since 이후 modified_time 이 바뀐 문서로 매핑 갱신 (바뀐 이름 수 반환)
+#   - 제목이 추천 여행지 이름과 같아진 문서: 그 이름에 연결
+#   - 연결돼 있던 문서의 제목이 바뀌어 더 이상 맞지 않으면 연결 해제
+# 정규화 이름 → 이름, content_id → 연결된 이름 색인을 한 번 만들어 두고 문서마다 dict 조회만 한다.
+def apply_modified(es, mapping, names, since):
+    by_key = {}
+    for name in names:
+        by_key.setdefault(normalize_name(name), []).append(name)
+    name_keys = {}
+    by_content = {}
+    for name, mapped in mapping.items():
+        if mapped is not None:
+            name_keys[name] = normalize_name(name)
+            by_content.setdefault(mapped, set()).add(name)
+
+    changed = 0
+    hits = helpers.scan(es, index=SPOT_INDEX, query={"query": {"range": {"modified_time": {"gte": since}}}},
+                        _source=["content_id", "title"])
+    for hit in hits:
+        source = hit.get("_source", {})
+        content_id = source.get("content_id") or hit["_id"]
+        key = normalize_name(source.get("title", ""))
+        linked = by_content.setdefault(content_id, set())
+        for name in by_key.get(key, []):
+            if mapping.get(name) is None:
+                mapping[name] = content_id
+                name_keys[name] = key
+                linked.add(name)
+                changed += 1
+        for name in [name for name in linked if name_keys[name] != key]:
+            mapping[name] = None
+            linked.discard(name)
+            changed += 1
+    return changed
+
+
+def load_mapping_file():
+    try:
+        with open(SPOT_MAPPING_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_mapping_file(model_version, signature, modified, mapping):
+    data = {"model_version": model_version, "tour_signature": signature, "modified": modified,
+            "built_at": datetime.now().isoformat(), "mapping": mapping}
+    tmp_path = SPOT_MAPPING_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, SPOT_MAPPING_PATH)
+
+
+# 번들의 여행지 이름 목록 (번들마다 한 번만 계산)
+def _bundle_names(bundle):
+    names = bundle.derived.get("visit_area_names")
+    if names is None:
+        names = sorted({str(name) for name in bundle.candidates["VISIT_AREA_NM"]})
+        bundle.derived["visit_area_names"] = names
+    return names
+
+
+# 매핑 테이블 확인 / 재생성 (백그라운드 스레드에서 실행)
+def refresh_mapping(bundle, force=False):
+    if not _refresh_lock.acquire(blocking=False):
+        return False
+    try:
+        with _state_lock:
+            _state["attempted_at"] = time.monotonic()
+        es = get_es()
+        signature = tour_signature(es)
+        # 조회 도중 바뀐 문서를 놓치지 않도록 조회 전에 기준 시각을 읽어 둠 (다음 갱신은 이 시각부터)
+        modified = latest_modified(es)
+        with _state_lock:
+            current = dict(_state)
+        if current["mapping"] is None:
+            saved = load_mapping_file()
+            if saved:
+                current.update(mapping=saved["mapping"], model_version=saved["model_version"],
+                               tour_signature=saved["tour_signature"], modified=saved.get("modified"))
+
+        names = _bundle_names(bundle)
+        # 기준 시각이 없으면(빈 인덱스에서 만든 매핑) 증분 기준이 없으므로 전체 재생성
+        if (force or current["mapping"] is None or current["tour_signature"] != signature
+                or (current["modified"] is None and modified is not None)):
+            started = time.perf_counter()
+            mapping = build_mapping(es, names)
+            save_mapping_file(bundle.version, signature, modified, mapping)
+            matched = sum(1 for content_id in mapping.values() if content_id)
+            logger.info(f"여행지 매핑 생성: {matched} / {len(mapping)} 매핑, {time.perf_counter() - started:.1f}초")
+        else:
+            mapping = {name: current["mapping"].get(name) for name in names}
+            # 모델 교체: 새 이름만 조회
+            missing = [name for name in names if name not in current["mapping"]]
+            if missing:
+                mapping.update(build_mapping(es, missing))
+            # 같은 인덱스: 마지막 확인 이후 바뀐 문서만 반영
+            changed = 0
+            if modified != current["modified"]:
+                changed = apply_modified(es, mapping, names, current["modified"])
+            if missing or changed or current["model_version"] != bundle.version or modified != current["modified"]:
+                save_mapping_file(bundle.version, signature, modified, mapping)
+                logger.info(f"여행지 매핑 갱신: 새 이름 {len(missing)}개, 바뀐 문서 반영 {changed}개")
+
+        with _state_lock:
+            _state.update(mapping=mapping, model_version=bundle.version, tour_signature=signature,
+                          modified=modified, checked_at=time.monotonic())
+        return True
+    except Exception as e:
+        logger.error(f"여행지 매핑 생성 실패: {e}")
+        return False
+    finally:
+        _refresh_lock.release()
+
+
+# 요청 경로에서 호출: 모델 버전이 바뀌었거나 확인 간격이 지났으면 백그라운드 갱신을 시작하고 현재 매핑을 반환
+def current_mapping(bundle):
+    now = time.monotonic()
+    with _state_lock:
+        mapping = _state["mapping"]
+        stale = (mapping is None or _state["model_version"] != bundle.version or
+                 _state["checked_at"] is None or now - _state["checked_at"] > CHECK_INTERVAL)
+        retry = _state["attempted_at"] is None or now - _state["attempted_at"] > RETRY_INTERVAL
+    if stale and retry and not _refresh_lock.locked():
+        threading.Thread(target=refresh_mapping, args=(bundle,), name="spot-mapping", daemon=True).start()
+    return mapping or {}
+
+
+# 추천 결과(VISIT_AREA_NM 포함 레코드 목록)에 여행지 문서를 spot 필드로 추가 (mget 한 번)
+def enrich_recommendations(records, bundle):
+    mapping = current_mapping(bundle)
+    content_ids = {record["VISIT_AREA_NM"]: mapping.get(record["VISIT_AREA_NM"]) for record in records}
+    ids = sorted({content_id for content_id in content_ids.values() if content_id})
+
+    spots = {}
+    if ids:
+        try:
+            es = get_es().options(request_timeout=ENRICH_TIMEOUT, max_retries=0)
+            response = es.mget(index=SPOT_INDEX, ids=ids, _source=SOURCE_FIELDS)
+            spots = {doc["_id"]: doc["_source"] for doc in response["docs"] if doc.get("found")}
+        except Exception as e:
+            logger.warning(f"추천 여행지 정보 조회 실패: {e}")
+
+    for record in records:
+        record["spot"] = spots.get(content_ids[record["VISIT_AREA_NM"]])
+    return records
+
+
+def mapping_status():
+    with _state_lock:
+        mapping = _state["mapping"] or {}
+        return {
+            "model_version": _state["model_version"],
+            "tour_signature": _state["tour_signature"],
+            "modified": _state["modified"],
+            "names": len(mapping),
+            "matched": sum(1 for content_id in mapping.values() if content_id),
+            "refreshing": _refresh_lock.locked(),
+        }
@@ -0,0 +1,132 @@
+# spot_search.py
+# 여행지 검색 (/spots/search)
+#
+# 검색어 / 필터 → 미리 정해 둔 쿼리 템플릿으로 tour_spots 별칭을 검색한다.
+#   - 검색어: title / addr1 / addr2 의 nori 필드 + ngram 서브필드 (most_fields)
+#   - 필터: area_code, sigungu_code, cat1~3, content_type_id, classified_type_id (filter 컨텍스트, 점수 계산 없음)
+#   - 정렬: sort_title(ICU 한국어 정렬) → content_id, search_after 커서로 다음 페이지
+# 같은 파라미터의 응답은 짧은 TTL 캐시에서 바로 반환한다. ("제주" 같은 인기 검색어)
+import base64
+import json
+import os
+import re
+
+from elastic.client import get_es
+from utils.cache import TTLCache
+
+SPOT_INDEX = os.getenv("TOUR_SPOT_INDEX", "tour_spots")
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+MAX_QUERY_LENGTH = 100
+
+# 검색어가 들어갈 필드 (가중치)
+SEARCH_FIELDS = ["title^3", "title.ngram^2", "addr1", "addr1.ngram", "addr2.ngram"]
+
+# 필터 파라미터 → 필드 (쉼표로 여러 값 지정 가능)
+FILTER_FIELDS = ["area_code", "sigungu_code", "cat1", "cat2", "cat3", "content_type_id", "classified_type_id"]
+
+# 응답에 포함할 필드
+SOURCE_FIELDS = ["content_id", "title", "addr1", "addr2", "area_code", "sigungu_code", "cat1", "cat2", "cat3",
+                 "content_type_id", "classified_type_id", "first_image", "first_image2", "tel", "location",
+                 "modified_time", "rating", "avg_rating", "review_count", "bookmark_count"]
+
+SORT = [{"sort_title": "asc"}, {"content_id": "asc"}]
+
+search_cache = TTLCache(maxsize=int(os.getenv("SPOT_SEARCH_CACHE_SIZE", 512)),
+                        ttl=float(os.getenv("SPOT_SEARCH_CACHE_TTL", 60)))
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+# search_after 커서 (정렬 값) ↔ URL 에 넣을 수 있는 문자열
+def encode_cursor(sort_values):
+    raw = json.dumps(sort_values, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except ValueError as e:
+        raise ValueError("cursor 값이 올바르지 않습니다.") from e
+    if not isinstance(values, list) or len(values) != len(SORT):
+        raise ValueError("cursor 값이 올바르지 않습니다.")
+    return values
+
+
+# 요청 파라미터 → 정규화된 검색 조건 (캐시 키로도 사용)
+# 검색어는 앞뒤 공백 제거 / 연속 공백 축소 / 소문자, 필터 값은 정렬해서 순서가 달라도 같은 키가 되도록 한다.
+def parse_search_params(args):
+    query = _WHITESPACE.sub(" ", (args.get("q") or "").strip()).lower()
+    if len(query) > MAX_QUERY_LENGTH:
+        raise ValueError(f"q 는 최대 {MAX_QUERY_LENGTH}자까지 입력할 수 있습니다.")
+
+    filters = []
+    for field in FILTER_FIELDS:
+        raw = args.get(field)
+        if raw:
+            values = tuple(sorted({value.strip() for value in raw.split(",") if value.strip()}))
+            if values:
+                filters.append((field, values))
+
+    limit = int(args.get("limit", DEFAULT_LIMIT))
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ValueError(f"limit 는 1 ~ {MAX_LIMIT} 사이여야 합니다.")
+
+    cursor = args.get("cursor") or None
+    if cursor:
+        decode_cursor(cursor)
+
+    return {"q": query, "filters": tuple(filters), "limit": limit, "cursor": cursor}
+
+
+# 검색 조건 → 쿼리 본문
+def build_search_body(params):
+    if params["q"]:
+        must = [{"multi_match": {"query": params["q"], "fields": SEARCH_FIELDS, "type": "most_fields",
+                                 "operator": "and"}}]
+    else:
+        must = [{"match_all": {}}]
+
+    body = {
+        "query": {
+            "bool": {
+                "must": must,
+                "filter": [{"terms": {field: list(values)}} for field, values in params["filters"]],
+            }
+        },
+        "sort": SORT,
+        "size": params["limit"],
+        "_source": SOURCE_FIELDS,
+        # 전체 건수는 첫 페이지에서만 계산
+        "track_total_hits": params["cursor"] is None,
+    }
+    if params["cursor"]:
+        body["search_after"] = decode_cursor(params["cursor"])
+    return body
+
+
+def _cache_key(params):
+    return (params["q"], params["filters"], params["limit"], params["cursor"])
+
+
+# 검색 실행 (캐시 우선). 결과: {"spots", "total", "next_cursor", "cached"}
+def search_spots(args):
+    params = parse_search_params(args)
+    key = _cache_key(params)
+    cached = search_cache.get(key)
+    if cached is not None:
+        return dict(cached, cached=True)
+
+    response = get_es().search(index=SPOT_INDEX, **build_search_body(params))
+    hits = response["hits"]["hits"]
+    next_cursor = encode_cursor(hits[-1]["sort"]) if len(hits) == params["limit"] else None
+    result = {
+        "spots": [hit["_source"] for hit in hits],
+        "total": response["hits"]["total"]["value"] if "total" in response["hits"] else None,
+        "next_cursor": next_cursor,
+    }
+    search_cache.set(key, result)
+    return dict(result, cached=False)
@@ -1,17 +1,24 @@
 import json
 import logging
 import os
-import re
-from datetime import datetime
+import time
+from itertools import islice
 
 from dotenv import load_dotenv
-from elasticsearch import Elasticsearch, helpers
+from elasticsearch import helpers
+
+from elastic.client import get_es
+from elastic.index_alias import blue_green_reindex, reindex_alias
+from elastic.json_stream import iter_json_items
+from elastic.normalize import normalize_batch
+from elastic.spot_geo import tile_cache
+from elastic.spot_search import search_cache
+from utils.metrics import job_timer, record_job_items
 
 logging.basicConfig(level=logging.INFO)
 
 load_dotenv()
 
-elastic_pwd = os.getenv("ELASTIC_PASSWORD")
 
 tour_index_body = {
     "settings": {
@@ -115,98 +122,208 @@ tour_index_body = {
             "bookmark_count": {"type": "float"},
             "location": {"type": "geo_point"},
             "classified_type_id": {"type": "keyword"},
+            "content_hash": {"type": "keyword", "index": False},
         }
     }
 }
 
-# content_type_id 변환 규칙
-content_type_mapping = {
-    "12": "100",
-    "14": "100",
-    "25": "100",
-    "28": "100",
-    "38": "100",
-    "32": "200",
-    "39": "300"
-}
 
-# title의 첫 글자를 기준으로 정렬용 필드를 생성
-def generate_sort_title(title):
-    if not title:
-        return "\u200d" # 보이지 않는 유니코드 문자 추가
-    first_char = title[0]
-    if re.match(r'[가-힣]', first_char):
-        return title
-    elif re.match(r'[a-zA-Z]', first_char):
-        return "\u200b" + title
-    elif re.match(r'[0-9]', first_char):
-        return "\u200c" + title
+# 문서 ID 는 content_id 로 고정한다. (update_tour_data 와 같은 ID → 재실행해도 중복 문서가 생기지 않음)
+def build_action(doc, index_name):
+    action = {
+        "_index": index_name,
+        "_source": doc
+    }
+    if doc.get("content_id"):
+        action["_id"] = doc["content_id"]
     else:
-        return "\u200d" + title
+        logging.warning(f'content_id 가 없는 문서는 자동 ID 로 색인됩니다: {doc.get("title")}')
+    return action
+
+
+# 파일 → 문서 → 벌크 액션으로 이어지는 제너레이터 파이프라인
+# segment_size 개 항목씩 한 번에 정규화해서 (액션 목록, 마지막 항목의 파일 내 바이트 오프셋) 으로 반환
+def generate_action_segments(file_path, index_name, segment_size, start_offset=0):
+    items = iter_json_items(file_path, start_offset=start_offset, with_offsets=True)
+    while True:
+        segment = list(islice(items, segment_size))
+        if not segment:
+            return
+        docs = normalize_batch(item for item, _ in segment)
+        yield [build_action(doc, index_name) for doc in docs], segment[-1][1]
+
+
+# 체크포인트: 마지막으로 색인이 확인된 배치 번호와 파일 바이트 오프셋
+# 원본 파일의 크기/수정 시각이나 대상 인덱스가 바뀌면 무효로 본다.
+def checkpoint_path(file_path):
+    return file_path + ".checkpoint.json"
+
+
+def _file_signature(file_path):
+    stat = os.stat(file_path)
+    return {"file_size": stat.st_size, "file_mtime": stat.st_mtime}
+
+
+def load_checkpoint(file_path, index_name):
+    try:
+        with open(checkpoint_path(file_path), "r", encoding="utf-8") as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    signature = _file_signature(file_path)
+    if (checkpoint.get("index") != index_name or
+            checkpoint.get("file_size") != signature["file_size"] or
+            checkpoint.get("file_mtime") != signature["file_mtime"]):
+        logging.info("원본 파일 또는 인덱스가 바뀌어 체크포인트를 무시합니다.")
+        return None
+    return checkpoint
+
+
+def save_checkpoint(file_path, index_name, offset, batches, docs):
+    checkpoint = dict(_file_signature(file_path), index=index_name, offset=offset, batches=batches, docs=docs)
+    tmp_path = checkpoint_path(file_path) + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, checkpoint_path(file_path))
+
+
+def clear_checkpoint(file_path):
+    if os.path.exists(checkpoint_path(file_path)):
+        os.remove(checkpoint_path(file_path))
+
 
+# 벌크 항목이 429 (es_rejected_execution) 로 거절되었을 때의 재시도 횟수와 지수 백오프 (streaming_bulk 기본값과 같음)
+BULK_MAX_RETRIES = 3
+BULK_INITIAL_BACKOFF = 2
+BULK_MAX_BACKOFF = 600
 
-# 위의 createdtime, modifiedtime의 format은 넣을 데이터의 현재 포멧을 말하는 것이다.
-# 따라서 현재 JSON파일에 들어가있는 포멧과 일치시켜야 한다
-def send_to_elastic(file_path):
-    es = Elasticsearch("http://elasticsearch:9200",
-                       basic_auth=('elastic', elastic_pwd))
-    index_name = "tour_spots"
-    batch_size = 2000
+
+def _item_status(result):
+    return next(iter(result.values())).get("status")
+
+
+# parallel_bulk 는 streaming_bulk 와 달리 429 재시도를 하지 않아서 여기서 처리한다.
+# 결과는 액션 순서대로 나오므로 429 로 거절된 액션만 모아 백오프 후 다시 보낸다.
+# (요청 전체가 429 로 거절되어도 raise_on_exception=False 라서 항목별 429 로 나온다.)
+def parallel_bulk_with_retry(es, actions, thread_count, chunk_size, max_retries=BULK_MAX_RETRIES,
+                             initial_backoff=BULK_INITIAL_BACKOFF, max_backoff=BULK_MAX_BACKOFF):
+    for attempt in range(max_retries + 1):
+        if attempt:
+            time.sleep(min(max_backoff, initial_backoff * 2 ** (attempt - 1)))
+        results = helpers.parallel_bulk(es, actions, thread_count=thread_count, chunk_size=chunk_size,
+                                        raise_on_error=False, raise_on_exception=False)
+        rejected = []
+        for (ok, result), action in zip(results, actions):
+            if not ok and attempt < max_retries and _item_status(result) == 429:
+                rejected.append(action)
+            else:
+                yield ok, result
+        if not rejected:
+            return
+        logging.warning(f'429 로 거절된 {len(rejected)}건 재시도 ({attempt + 1}/{max_retries})')
+        actions = rejected
+
+
+# JSON(배열 또는 NDJSON) 파일을 스트리밍으로 읽어 Elasticsearch에 벌크 색인
+# 파일 크기와 무관하게 메모리에는 읽기 버퍼와 벌크 청크(batch_size) 하나만 유지된다.
+# parallel=True 이면 parallel_bulk 로 thread_count 개의 청크를 동시에 전송한다.
+# 청크가 모두 색인될 때마다 체크포인트를 남기므로, 중단된 뒤 다시 실행하면 (resume=True) 이어서 색인한다.
+# 실패한 문서가 있는 구간부터는 체크포인트를 더 진행하지 않고 남겨 두어, 다시 실행하면 그 구간부터 재색인한다.
+# (문서 ID 가 content_id 라서 이미 색인된 뒤쪽 구간을 다시 보내도 중복되지 않음)
+def send_to_elastic(file_path, batch_size=2000, parallel=False, thread_count=2, resume=True,
+                    index_name="tour_spots"):
+    es = get_es()
     total_docs = 0
+    failed_docs = 0
+    started = time.perf_counter()
 
     try:
-        if not es.indices.exists(index=index_name):
-            es.indices.create(index=index_name, body=tour_index_body)
-        else:
-            print("Index already exists")
-
-        with open(file_path, "r", encoding='utf-8') as f:
-            tour_data = json.load(f)
-
-            for item in tour_data:  # tour_data를 순회하며 각 item (도큐먼트) 처리
-                created_time_str = item.get("created_time")
-                if created_time_str:  # createdtime 값이 있는 경우에만 변환
-                    created_datetime = datetime.strptime(created_time_str, "%Y%m%d%H%M%S")  # 기존 형식 파싱
-                    item["created_time"] = created_datetime.strftime("%Y-%m-%dT%H:%M:%S")  # 새 형식으로 변환 및 저장
-
-                modified_time_str = item.get("modified_time")
-                if modified_time_str:  # modifiedtime 값이 있는 경우에만 변환
-                    modified_datetime = datetime.strptime(modified_time_str, "%Y%m%d%H%M%S")  # 기존 형식 파싱
-                    item["modified_time"] = modified_datetime.strftime("%Y-%m-%dT%H:%M:%S")  # 새 형식으로 변환 및 저장
-
-                item['sort_title'] = generate_sort_title(item.get("title", ""))
-                item['location'] = {
-                    "lat": float(item.get("map_y")),  # 위도
-                    "lon": float(item.get("map_x"))  # 경도
-                }
+        with job_timer("tour_bulk_load") as run:
+            if not es.indices.exists(index=index_name):
+                es.indices.create(index=index_name, body=tour_index_body)
+            else:
+                logging.info("Index already exists")
 
-                type_id = item.get("content_type_id")
-                if type_id in content_type_mapping:
-                    item['classified_type_id'] = content_type_mapping[type_id]
+            checkpoint = load_checkpoint(file_path, index_name) if resume else None
+            start_offset, batches, resumed_docs = 0, 0, 0
+            if checkpoint:
+                start_offset, batches, resumed_docs = checkpoint["offset"], checkpoint["batches"], checkpoint["docs"]
+                logging.info(f'체크포인트에서 재개 : 배치 {batches}, {resumed_docs}건 완료, offset {start_offset}')
 
-            for i in range(0, len(tour_data), batch_size):
-                batch = tour_data[i:i + batch_size]
-                actions = [
-                    {
-                        "_index": index_name,
-                        "_source": data
-                    }
-                    for data in batch
-                ]
+            segment_size = batch_size * (thread_count if parallel else 1)
+
+            for actions, offset in generate_action_segments(file_path, index_name, segment_size, start_offset):
+                if parallel:
+                    results = parallel_bulk_with_retry(es, actions, thread_count=thread_count, chunk_size=batch_size)
+                else:
+                    results = helpers.streaming_bulk(es, actions, chunk_size=batch_size, max_retries=BULK_MAX_RETRIES,
+                                                     raise_on_error=False)
 
-                success, failed = helpers.bulk(es, actions)
-                total_docs += success
-                print(f'인덱싱 진행중... : {total_docs} / {len(tour_data)}')
+                segment_ok, segment_failed = 0, 0
+                for ok, result in results:
+                    if ok:
+                        segment_ok += 1
+                    else:
+                        segment_failed += 1
+                        logging.error(f'색인 실패: {result}')
+                total_docs += segment_ok
+                failed_docs += segment_failed
+                record_job_items("tour_bulk_load", {"batches": 1, "indexed": segment_ok, "failed": segment_failed})
 
-                if failed:
-                    print(f'오류 발생')
-                    print(failed)
+                batches += 1
+                if not failed_docs:
+                    save_checkpoint(file_path, index_name, offset, batches, resumed_docs + total_docs)
 
-            print('벌크 인덱싱 성공')
+                elapsed = time.perf_counter() - started
+                logging.info(f'인덱싱 진행중... : 배치 {batches}, {resumed_docs + total_docs}건 '
+                             f'({(total_docs + failed_docs) / elapsed:.1f} docs/sec)')
+
+            if failed_docs:
+                run["status"] = "partial"
+                logging.warning('실패한 문서가 있어 체크포인트를 남깁니다. 다시 실행하면 실패한 구간부터 재색인합니다.')
+            else:
+                clear_checkpoint(file_path)
+
+        elapsed = time.perf_counter() - started
+        logging.info(f'벌크 인덱싱 완료 : 성공 {total_docs}건, 실패 {failed_docs}건, '
+                     f'{elapsed:.1f}초 ({(total_docs + failed_docs) / elapsed if elapsed else 0:.1f} docs/sec)')
+        return {"indexed": total_docs, "failed": failed_docs, "resumed_from": resumed_docs, "elapsed": elapsed}
     except Exception as e:
         if isinstance(e, helpers.BulkIndexError):
-            print('***실패 정보 출력***')
+            logging.error('***실패 정보 출력***')
             logging.error(e.errors)
         else:
             logging.error(f'오류 메시지 발생 : {e}')
             logging.error(type(e))
+
+
+# 매핑/설정 변경 시 무중단 재색인: tour_spots_v{n+1} 에 전체 적재 후 tour_spots 별칭을 교체
+# 기존 방식(인덱스 삭제 → send_to_elastic)과 달리 적재 중에도 검색은 이전 인덱스를 그대로 본다.
+# 기존 데이터가 있으면 원본 JSON 이 아니라 현재 별칭에서 _reindex 한다. (reindex_alias 참고)
+#   - detail / rating / bookmark_count / review_count / avg_rating 처럼 ES 에만 있는 필드 유지
+#   - 적재 중 야간 동기화가 쓴 수정 / 삭제는 쓰기 차단 후 보정 단계에서 반영
+#     (보정 중 동기화 벌크는 실패로 기록되고, 마커가 넘어가지 않아 다음 실행에서 다시 처리된다)
+# file_path 는 tour_spots 가 아직 없을 때 첫 적재에만 쓴다.
+def reindex_tour_spots(file_path=None, alias="tour_spots", batch_size=2000, parallel=False, thread_count=2,
+                       min_ratio=1.0, keep=1):
+    es = get_es()
+    if es.indices.exists(index=alias):
+        result = reindex_alias(es, alias, tour_index_body, min_ratio=min_ratio, keep=keep)
+    else:
+        if file_path is None:
+            raise ValueError(f'{alias} 인덱스가 없어 원본 JSON 파일(file_path)이 필요합니다.')
+
+        def load(index_name):
+            # 실패하면 새 인덱스가 삭제되고 같은 이름이 다시 쓰이므로 체크포인트로 재개하지 않는다.
+            result = send_to_elastic(file_path, batch_size=batch_size, parallel=parallel, thread_count=thread_count,
+                                     resume=False, index_name=index_name)
+            if result is None or result["failed"]:
+                raise RuntimeError(f'{index_name} 적재 실패: {result}')
+
+        result = blue_green_reindex(es, alias, tour_index_body, load, min_ratio=min_ratio, keep=keep)
+
+    # 별칭이 새 인덱스로 바뀌었으므로 이전 인덱스 기준의 타일 / 검색 캐시는 모두 삭제
+    tile_cache.clear()
+    search_cache.clear()
+    return result
@@ -1,12 +1,16 @@
+import argparse
+import json
 import logging
 import datetime
-import re
-import requests
-from elasticsearch import Elasticsearch
+from elasticsearch import helpers
 import os
 from dotenv import load_dotenv
 
-from elastic.tour_to_elastic import generate_sort_title
+from api.tour_fetcher import TourApiFetcher
+from elastic.client import get_es
+from elastic.normalize import normalize_batch
+from elastic.spot_geo import invalidate_locations
+from utils.metrics import job_timer, record_job_items
 
 # 로깅 설정
 logging.basicConfig(
@@ -18,168 +22,228 @@ logger = logging.getLogger(__name__)
 
 # 환경 변수 로드
 load_dotenv()
-elastic_pwd = os.getenv("ELASTIC_PASSWORD")
-
-# Elasticsearch 연결
-es = Elasticsearch("http://elasticsearch:9200", basic_auth=('elastic', elastic_pwd))
 
 # API 설정
-tour_api_url = "http://apis.data.go.kr/B551011/KorService1/areaBasedSyncList1"
+tour_api_operation = "areaBasedSyncList1"
 service_key = "IgykVu0qTZbi+3YtfC645Gag515ri7KsHHpE3r6Ef3iTiNaSDdmKZJizindrVRYzN4DEDknnAjoziHs/KDj/6g=="
 
-# content_type_id 변환 규칙
-content_type_mapping = {
-    "12": "100",
-    "14": "100",
-    "25": "100",
-    "28": "100",
-    "38": "100",
-    "32": "200",
-    "39": "300"
-}
-
-# 필드 변환 및 필터링 설정
-snake_case_mapping = {
-    "addr1": "addr1",
-    "addr2": "addr2",
-    "areacode": "area_code",
-    "booktour": "book_tour",
-    "cat1": "cat1",
-    "cat2": "cat2",
-    "cat3": "cat3",
-    "contentid": "content_id",
-    "contenttypeid": "content_type_id",
-    "createdtime": "created_time",
-    "firstimage": "first_image",
-    "firstimage2": "first_image2",
-    "cpyrhtDivCd": "cpyrht_div_cd",
-    "mapx": "map_x",
-    "mapy": "map_y",
-    "mlevel": "m_level",
-    "modifiedtime": "modified_time",
-    "sigungucode": "sigungu_code",
-    "tel": "tel",
-    "title": "title",
-    "zipcode": "zipcode"
-}
-
-allowed_fields = {
-    "addr1", "addr2", "area_code", "cat1", "cat2", "cat3", "content_id",
-    "content_type_id", "created_time", "first_image", "first_image2",
-    "map_x", "map_y", "modified_time", "sigungu_code", "tel", "title"
-}
-
-
-# 스케줄링 작업 정의
-def update_tour_data():
-    logger.info(f"스케줄러 실행: {datetime.datetime.now()}")
-
-    # 하루 전 날짜 계산
-    yesterday = (datetime.datetime.now() - datetime.timedelta(days=1)).strftime("%Y%m%d")
-    logger.info(f"대상 수정일 (modifiedtime): {yesterday}")
-
-    # API에서 modifiedtime이 하루 전인 데이터 조회
+# 벌크 요청 / mget 한 번에 보낼 문서 수
+bulk_chunk_size = 500
+
+# 마지막으로 동기화를 마친 수정일 기록 (누락된 날짜를 이어서 처리하는 catch-up 용)
+sync_state_path = os.getenv("TOUR_SYNC_STATE_PATH",
+                            os.path.join(os.path.dirname(os.path.abspath(__file__)), ".tour_sync_state.json"))
+# catch-up 으로 한 번에 처리할 최대 일수
+max_catchup_days = int(os.getenv("TOUR_SYNC_MAX_CATCHUP_DAYS", 14))
+
+date_format = "%Y%m%d"
+
+
+# 이미 색인된 문서 조회 (mget, detail 필드 유무와 문서 지문, 이전 좌표만 가져옴)
+def find_existing(index_name, content_ids):
+    existing = {}
+    for i in range(0, len(content_ids), bulk_chunk_size):
+        response = get_es().mget(index=index_name, ids=content_ids[i:i + bulk_chunk_size],
+                                 _source=["detail", "content_hash", "location"])
+        for doc in response["docs"]:
+            if doc.get("found"):
+                existing[doc["_id"]] = doc.get("_source", {})
+    return existing
+
+
+# API 에서 받은 필드만 부분 업데이트하고 없으면 생성 (doc_as_upsert)
+# detail, rating, bookmark_count 등 서비스에서 추가한 필드는 그대로 유지된다.
+def bulk_upsert(index_name, items):
+    actions = (
+        {
+            "_op_type": "update",
+            "_index": index_name,
+            "_id": item["content_id"],
+            "doc": item,
+            "doc_as_upsert": True,
+        }
+        for item in items
+    )
+
+    succeeded, failures = 0, []
+    for ok, result in helpers.streaming_bulk(get_es(), actions, chunk_size=bulk_chunk_size, max_retries=3,
+                                             raise_on_error=False, raise_on_exception=False):
+        if ok:
+            succeeded += 1
+        else:
+            info = result.get("update", {})
+            failures.append({"content_id": info.get("_id"), "error": info.get("error")})
+    return succeeded, failures
+
+
+def load_last_synced():
+    try:
+        with open(sync_state_path, "r", encoding="utf-8") as f:
+            return json.load(f).get("last_synced")
+    except (OSError, ValueError):
+        return None
+
+
+def save_last_synced(date):
+    last = load_last_synced()
+    if last and last >= date:
+        return
+    tmp_path = sync_state_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"last_synced": date, "updated_at": datetime.datetime.now().isoformat()}, f)
+    os.replace(tmp_path, sync_state_path)
+
+
+# 동기화할 수정일 목록 (YYYYMMDD)
+# start_date 가 없으면 마지막 동기화 다음 날부터 (기록이 없으면 end_date 하루), 최대 max_catchup_days 일
+def sync_dates(start_date=None, end_date=None):
+    yesterday = datetime.date.today() - datetime.timedelta(days=1)
+    end = datetime.datetime.strptime(end_date, date_format).date() if end_date else yesterday
+
+    if start_date:
+        start = datetime.datetime.strptime(start_date, date_format).date()
+    else:
+        last = load_last_synced()
+        start = datetime.datetime.strptime(last, date_format).date() + datetime.timedelta(days=1) if last else end
+        earliest = end - datetime.timedelta(days=max_catchup_days - 1)
+        if start < earliest:
+            logger.warning(f"마지막 동기화({last}) 이후 {max_catchup_days}일을 넘어 {earliest:%Y%m%d} 부터 처리합니다.")
+            start = earliest
+
+    return [(start + datetime.timedelta(days=i)).strftime(date_format) for i in range((end - start).days + 1)]
+
+
+# 하루치(수정일 기준) 동기화
+def sync_modified_date(modified_date, index_name="tour_spots"):
+    logger.info(f"대상 수정일 (modifiedtime): {modified_date}")
+
+    # API에서 modifiedtime이 해당 날짜인 데이터 조회
     params = {
         "MobileOS": "ETC",
         "MobileApp": "Plan4Land",
         "_type": "json",
         "serviceKey": service_key,
-        "numOfRows": 200,
-        "pageNo": 1,
-        "modifiedtime": yesterday,
+        "modifiedtime": modified_date,
         "listYN": "Y"
     }
 
+    # 페이지 병렬 수집 (속도 제한 + 재시도), 정규화는 페이지 단위로 수집 워커 스레드에서 실행 (1페이지만 호출 스레드)
+    fetcher = TourApiFetcher(tour_api_operation, params)
+    items_total = fetcher.fetch_all(normalize_batch)
+    summary = {"date": modified_date, "pages": fetcher.metrics["pages_done"], "fetched": len(items_total),
+               "unchanged": 0, "skipped": 0, "indexed": 0, "created": 0, "tiles_invalidated": 0, "touched": [],
+               "failures": [], "failed_pages": fetcher.metrics["failed_pages"]}
+
+    if fetcher.metrics['total_count'] == 0:
+        logger.info("업데이트할 데이터가 없습니다.")
+        return summary
+
+    if fetcher.metrics['failed_pages']:
+        logger.error(f"수집 실패 페이지: {fetcher.metrics['failed_pages']}")
+
+    # 같은 content_id 가 여러 번 내려오면 마지막 항목만 사용, content_id 가 없는 항목은 건너뛰고 건수만 기록
+    latest = {}
+    for item in items_total:
+        content_id = item.get("content_id")
+        if not content_id:
+            summary["skipped"] += 1
+            logger.warning(f"content_id 없는 항목 제외됨 (title: {item.get('title')})")
+            continue
+        latest[content_id] = item
+
+    # mget 으로 색인된 문서 지문과 비교해서 바뀐 문서만 벌크 upsert
+    existing = find_existing(index_name, list(latest))
+    changed = [item for content_id, item in latest.items()
+               if existing.get(content_id, {}).get("content_hash") != item["content_hash"]]
+    with_detail = sum(1 for source in existing.values() if "detail" in source)
+    summary["unchanged"] = len(latest) - len(changed)
+    summary["created"] = len(latest) - len(existing)
+    logger.info(f"기존 문서 {len(existing)}건 (detail 유지 {with_detail}건), 신규 문서 {summary['created']}건, "
+                f"변경 없음 {summary['unchanged']}건")
+
+    succeeded, failures = bulk_upsert(index_name, changed)
+    for failure in failures:
+        logger.error(f"content_id {failure['content_id']} 처리 중 오류: {failure['error']}")
+    summary["indexed"] = succeeded
+    summary["failures"] = failures
+
+    # 바뀐 여행지가 들어 있는 지도 타일 캐시만 삭제 (좌표가 바뀐 경우 이전 위치의 타일도)
+    touched = [item["location"] for item in changed]
+    touched += [existing[item["content_id"]].get("location") for item in changed if item["content_id"] in existing]
+    summary["tiles_invalidated"] = invalidate_locations(touched)
+    # 다른 프로세스(웹 워커)의 타일 캐시도 같은 타일만 지울 수 있도록 좌표를 결과에 남김 (jobs/sync_runner.py)
+    summary["touched"] = touched_points(touched)
+    return summary
+
+
+# /metrics 의 gotgam_job_items_total 에 기록하는 처리 건수 (kind → 건수)
+def job_items(result):
+    return {
+        "pages": result["pages"], "fetched": result["fetched"], "unchanged": result["unchanged"],
+        "skipped": result["skipped"], "indexed": result["indexed"], "failed": len(result["failures"]),
+        "failed_pages": sum(len(pages) for pages in result["failed_pages"].values()),
+    }
+
+
+# 좌표 목록 → 중복 없는 [lat, lon] 목록 (실행 기록에 남기는 형식)
+def touched_points(locations):
+    points = {(round(float(location["lat"]), 6), round(float(location["lon"]), 6))
+              for location in locations if location}
+    return sorted([lat, lon] for lat, lon in points)
+
+
+# 스케줄링 작업 정의
+# 기본은 마지막 동기화 이후 어제까지 (누락된 날이 있으면 catch-up), start_date / end_date 로 기간 지정 가능
+# 수집 실패 페이지나 색인 실패가 없는 날까지만 동기화 기록을 앞으로 옮긴다.
+def update_tour_data(start_date=None, end_date=None):
+    logger.info(f"스케줄러 실행: {datetime.datetime.now()}")
+
     try:
-        # 총 데이터 수 확인
-        response = requests.get(tour_api_url, params=params)
-        response.raise_for_status()
-        data = response.json()
-        total_counts = data['response']['body']['totalCount']
-        logger.info(f"총 데이터 수: {total_counts}")
-
-        if total_counts == 0:
-            logger.info("업데이트할 데이터가 없습니다.")
-            return
-
-        items_total = []
-
-        # 페이지네이션 처리
-        for page in range(1, (total_counts // 200) + 2):
-            params["pageNo"] = page
-            try:
-                response = requests.get(tour_api_url, params=params)
-                response.raise_for_status()
-                data = response.json()
-                items = data['response']['body']['items']['item']
-
-                # 데이터 처리
-                for item in items:
-                    filtered_item = {}
-                    for key, value in item.items():
-                        new_key = snake_case_mapping.get(key, key)
-                        if new_key in allowed_fields:
-                            filtered_item[new_key] = value
-
-                    # 제외 조건 적용
-                    if (filtered_item.get("sigungu_code") == "99" or
-                        filtered_item.get("map_x") == "0" or
-                        filtered_item.get("content_type_id") == "15"):
-                        logger.info(f"content_id {filtered_item.get('content_id')} 제외됨 (조건 충족)")
-                        continue
-
-                    # 날짜 형식 변환
-                    created_time_str = filtered_item.get("created_time")
-                    if created_time_str:
-                        created_datetime = datetime.datetime.strptime(created_time_str, "%Y%m%d%H%M%S")
-                        filtered_item["created_time"] = created_datetime.strftime("%Y-%m-%dT%H:%M:%S")
-
-                    modified_time_str = filtered_item.get("modified_time")
-                    if modified_time_str:
-                        modified_datetime = datetime.datetime.strptime(modified_time_str, "%Y%m%d%H%M%S")
-                        filtered_item["modified_time"] = modified_datetime.strftime("%Y-%m-%dT%H:%M:%S")
-
-                    # char_type 및 location 추가
-                    filtered_item['sort_title'] = generate_sort_title(filtered_item.get("title", ""))
-                    filtered_item['location'] = {
-                        "lat": float(filtered_item.get("map_y")),
-                        "lon": float(filtered_item.get("map_x"))
-                    }
-
-                    # content_type_id 변환
-                    type_id = filtered_item.get("content_type_id")
-                    if type_id in content_type_mapping:
-                        filtered_item['classified_type_id'] = content_type_mapping[type_id]
-
-                    items_total.append(filtered_item)
-
-                logger.info(f"페이지 {page} 처리 완료 ({len(items_total)} / {total_counts})")
-
-            except requests.exceptions.RequestException as e:
-                logger.error(f"페이지 {page} 요청 실패: {e}")
-                continue
-
-        # Elasticsearch에 저장
-        for item in items_total:
-            content_id = item.get("content_id")
-            try:
-                # 기존 데이터 조회
-                response = es.get(index="tour_spots", id=content_id, ignore=404)
-                existing_data = response.get("_source", None)
-
-                # detail 필드가 있는지 확인하고 제거 로그 출력
-                if existing_data and 'detail' in existing_data:
-                    logger.info(f"content_id {content_id}에서 Detail 필드 제거됨 (덮어씌우기)")
-
-                # 데이터 업데이트 또는 삽입
-                es.index(index="tour_spots", id=content_id, body=item)
-                logger.info(f"content_id {content_id} 업데이트 완료")
-
-            except Exception as e:
-                logger.error(f"content_id {content_id} 처리 중 오류: {e}")
-                continue
-
-        logger.info("모든 데이터 업데이트 완료")
+        with job_timer("tour_sync") as run:
+            dates = sync_dates(start_date, end_date)
+            if not dates:
+                logger.info("이미 동기화가 끝난 기간입니다.")
+
+            result = {"dates": dates, "pages": 0, "fetched": 0, "unchanged": 0, "skipped": 0, "indexed": 0,
+                      "created": 0, "tiles_invalidated": 0, "touched": [], "failures": [], "failed_pages": {}}
+            completed = True
+            for modified_date in dates:
+                summary = sync_modified_date(modified_date)
+                for key in ("pages", "fetched", "unchanged", "skipped", "indexed", "created", "tiles_invalidated"):
+                    result[key] += summary[key]
+                result["touched"].extend(summary["touched"])
+                result["failures"].extend(summary["failures"])
+                if summary["failed_pages"]:
+                    result["failed_pages"][modified_date] = summary["failed_pages"]
+
+                completed = completed and not summary["failures"] and not summary["failed_pages"]
+                if completed:
+                    save_last_synced(modified_date)
+
+            result["touched"] = sorted({tuple(point) for point in result["touched"]})
+            result["items"] = job_items(result)
+            # 처리 건수 / 실행 시간 지표 (/metrics)
+            record_job_items("tour_sync", result["items"])
+            if not completed:
+                run["status"] = "partial"
+
+        logger.info(f"모든 데이터 업데이트 완료 (페이지 {result['pages']}개, 수집 {result['fetched']}건, "
+                    f"변경 없음 {result['unchanged']}건, 제외 {result['skipped']}건, 성공 {result['indexed']}건, 실패 {len(result['failures'])}건)")
+        return result
 
     except Exception as e:
-        logger.error(f"스케줄링 작업 중 오류 발생: {e}")
\ No newline at end of file
+        logger.error(f"스케줄링 작업 중 오류 발생: {e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='TourAPI 수정일 기준 여행지 동기화')
+    parser.add_argument('--from', dest='start_date', help='시작 수정일 (YYYYMMDD, 기본: 마지막 동기화 다음 날)')
+    parser.add_argument('--to', dest='end_date', help='마지막 수정일 (YYYYMMDD, 기본: 어제)')
+    args = parser.parse_args(argv)
+
+    result = update_tour_data(args.start_date, args.end_date)
+    return 0 if result and not result["failures"] and not result["failed_pages"] else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
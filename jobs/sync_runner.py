@@ -0,0 +1,300 @@
+# sync_runner.py
+# 여행지 야간 동기화 실행기 (웹 워커와 분리된 단일 실행)
+#
+#   python -m jobs.sync_runner                  # 스케줄러 (매일 JOB_CRON_HOUR:JOB_CRON_MINUTE 실행)
+#   python -m jobs.sync_runner --once           # 지금 한 번 실행
+#   python -m jobs.sync_runner --once --from 20240101 --to 20240107
+#
+# 동기화는 항상 별도 자식 프로세스에서 실행한다.
+#   - 파일 잠금(flock): 같은 JOB_LOCK_PATH 를 쓰는 프로세스(다른 컨테이너 포함) 중 하나만 실행, 겹치는 실행은 skipped 로 기록
+#     잠금 fd 를 자식에게도 넘기므로 실행기가 먼저 죽어도 자식이 끝날 때까지 잠금이 유지된다.
+#     실행 여부 조회(is_running)는 작업 잠금을 건드리지 않고 별도 표시 파일(JOB_PROBE_PATH)에 공유 잠금만 시도한다.
+#   - 자식은 시작하자마자 nice / CPU 시간 / 주소 공간 제한을 건다. (웹 요청 처리보다 낮은 우선순위)
+#   - JOB_TIMEOUT 을 넘기면 자식을 종료하고 timeout 으로 기록
+#   - 실행 결과(소요 시간, 수집 / 색인 / 변경 없음 / 실패 건수)는 JOB_HISTORY_PATH 에 JSON Lines 로 누적 (/jobs/history)
+#   - 자식의 캐시 / 지표는 웹 프로세스에 닿지 않으므로, 바뀐 여행지 좌표(touched)와 처리 건수(items)도 기록에 남기고
+#     웹 프로세스가 apply_run 으로 자기 타일 캐시 / 지표에 반영한다.
+import argparse
+import fcntl
+import json
+import logging
+import os
+import resource
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+JOB_NAME = 'tour_sync'
+JOB_LOCK_PATH = os.getenv('JOB_LOCK_PATH', os.path.join(DATA_DIR, '.tour_sync.lock'))
+# 실행 중 표시 파일: 작업 잠금을 잡은 실행이 배타 잠금을 함께 잡고, 조회는 공유 잠금으로 확인
+JOB_PROBE_PATH = os.getenv('JOB_PROBE_PATH', JOB_LOCK_PATH + '.running')
+JOB_HISTORY_PATH = os.getenv('JOB_HISTORY_PATH', os.path.join(DATA_DIR, '.tour_sync_history.jsonl'))
+# 보관할 최대 실행 기록 수
+JOB_HISTORY_KEEP = int(os.getenv('JOB_HISTORY_KEEP', 200))
+
+JOB_CRON_HOUR = int(os.getenv('JOB_CRON_HOUR', 3))
+JOB_CRON_MINUTE = int(os.getenv('JOB_CRON_MINUTE', 0))
+
+# 자식 프로세스 자원 제한 (0 이면 제한 없음)
+JOB_NICE = int(os.getenv('JOB_NICE', 10))
+JOB_CPU_SECONDS = int(os.getenv('JOB_CPU_SECONDS', 1800))
+# 주소 공간(RLIMIT_AS) 제한: 실제 메모리(RSS)보다 크게 잡히므로 자식은 MALLOC_ARENA_MAX 로 스레드별 malloc 영역을 줄여서 시작한다.
+# docker-compose 의 runner 메모리 제한은 이 값 + 실행기 자신(약 128MB)보다 커야 자식이 rlimit 보다 먼저 OOM 으로 죽지 않는다.
+JOB_MEMORY_MB = int(os.getenv('JOB_MEMORY_MB', 512))
+JOB_MALLOC_ARENA_MAX = os.getenv('JOB_MALLOC_ARENA_MAX', '2')
+JOB_TIMEOUT = float(os.getenv('JOB_TIMEOUT', 3600))
+
+# 기록에 남길 요약 항목
+SUMMARY_FIELDS = ('pages', 'fetched', 'unchanged', 'skipped', 'indexed', 'created', 'tiles_invalidated')
+# 기록에 남길 바뀐 여행지 좌표 최대 수 (넘으면 touched_truncated, 웹 프로세스는 타일 캐시 전체 삭제)
+JOB_TOUCHED_MAX = int(os.getenv('JOB_TOUCHED_MAX', 2000))
+
+
+# 잠금 파일을 열고 비차단 flock. 성공하면 (잠금 파일, 표시 파일), 이미 다른 프로세스가 잡고 있으면 None
+def acquire_lock(path=JOB_LOCK_PATH, probe_path=JOB_PROBE_PATH):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    lock_file = open(path, 'a+')
+    try:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    lock_file.seek(0)
+    lock_file.truncate()
+    lock_file.write(f'{socket.gethostname()}:{os.getpid()} {datetime.now().isoformat(timespec="seconds")}\n')
+    lock_file.flush()
+
+    # 표시 파일은 차단 flock: 조회 쪽 공유 잠금은 잡자마자 놓으므로 잠깐만 기다린다.
+    os.makedirs(os.path.dirname(os.path.abspath(probe_path)), exist_ok=True)
+    probe_file = open(probe_path, 'a+')
+    fcntl.flock(probe_file.fileno(), fcntl.LOCK_EX)
+    return lock_file, probe_file
+
+
+# 다른 프로세스가 실행 중인지 (표시 파일에 비차단 공유 잠금을 시도하고 바로 놓음)
+#   작업 잠금은 시도하지 않으므로, 조회와 예약 실행이 겹쳐도 예약 실행이 skipped 로 기록되지 않는다.
+def is_running(probe_path=JOB_PROBE_PATH):
+    try:
+        probe_file = open(probe_path, 'r')
+    except OSError:
+        return False
+    with probe_file:
+        try:
+            fcntl.flock(probe_file.fileno(), fcntl.LOCK_SH | fcntl.LOCK_NB)
+        except OSError:
+            return True
+    return False
+
+
+# trim 은 잠금을 잡은 실행만 사용 (정리 중에 다른 프로세스가 기록을 덮어쓰지 않도록)
+def append_history(entry, path=JOB_HISTORY_PATH, trim=True):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    # 기록이 보관 수의 두 배를 넘으면 최근 것만 남김
+    entries = read_history(limit=None, path=path) if trim else []
+    if len(entries) > JOB_HISTORY_KEEP * 2:
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for item in entries[-JOB_HISTORY_KEEP:]:
+                f.write(json.dumps(item, ensure_ascii=False) + '\n')
+        os.replace(tmp_path, path)
+
+
+# 실행 기록 (오래된 것부터, limit 이면 최근 limit 개)
+def read_history(limit=20, path=JOB_HISTORY_PATH):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+    except OSError:
+        return []
+    entries = []
+    for line in lines if limit is None else lines[-limit:]:
+        try:
+            entries.append(json.loads(line))
+        except ValueError:
+            continue
+    return entries
+
+
+def history_mtime(path=JOB_HISTORY_PATH):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+# 자식 프로세스: 낮은 우선순위 + CPU 시간 / 주소 공간 제한
+def apply_limits():
+    if JOB_NICE:
+        os.nice(JOB_NICE)
+    if JOB_CPU_SECONDS:
+        # soft 한도에서 SIGXCPU 로 종료, hard 는 정리할 여유를 조금 둔다.
+        resource.setrlimit(resource.RLIMIT_CPU, (JOB_CPU_SECONDS, JOB_CPU_SECONDS + 30))
+    if JOB_MEMORY_MB:
+        limit = JOB_MEMORY_MB * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _summary(result):
+    summary = {key: result.get(key, 0) for key in SUMMARY_FIELDS}
+    summary['dates'] = result.get('dates', [])
+    summary['failures'] = len(result.get('failures', []))
+    summary['failed_pages'] = sum(len(pages) for pages in result.get('failed_pages', {}).values())
+    summary['items'] = result.get('items', {})
+    touched = [list(point) for point in result.get('touched', [])]
+    if len(touched) > JOB_TOUCHED_MAX:
+        summary['touched_truncated'] = True
+        touched = []
+    summary['touched'] = touched
+    return summary
+
+
+# --child: 실제 동기화. 마지막 줄에 요약 JSON 을 stdout 으로 출력
+def run_child(start_date, end_date):
+    apply_limits()
+    from elastic.update_spot import update_tour_data
+
+    result = update_tour_data(start_date, end_date)
+    if result is None:
+        return 1
+    summary = _summary(result)
+    print(json.dumps(summary, ensure_ascii=False), flush=True)
+    return 0 if not summary['failures'] and not summary['failed_pages'] else 3
+
+
+def _child_command(start_date, end_date):
+    command = [sys.executable, '-m', 'jobs.sync_runner', '--child']
+    if start_date:
+        command += ['--from', start_date]
+    if end_date:
+        command += ['--to', end_date]
+    return command
+
+
+# 잠금을 잡고 자식 프로세스로 동기화 1회 실행, 실행 기록 반환
+def run_job(start_date=None, end_date=None, trigger='schedule'):
+    entry = {'job': JOB_NAME, 'trigger': trigger, 'host': socket.gethostname(),
+             'started_at': datetime.now().isoformat(timespec='seconds')}
+
+    lock = acquire_lock()
+    if lock is None:
+        entry.update(status='skipped', reason='이전 동기화가 아직 실행 중입니다.', duration_s=0)
+        logger.warning(f'{JOB_NAME} 건너뜀: 다른 프로세스가 실행 중')
+        append_history(entry, trim=False)
+        return entry
+
+    lock_file, probe_file = lock
+    started = time.perf_counter()
+    try:
+        process = subprocess.Popen(_child_command(start_date, end_date), cwd=os.path.dirname(DATA_DIR),
+                                   stdout=subprocess.PIPE, text=True, pass_fds=(lock_file.fileno(), probe_file.fileno()),
+                                   env=dict(os.environ, MALLOC_ARENA_MAX=JOB_MALLOC_ARENA_MAX))
+        entry['pid'] = process.pid
+        try:
+            stdout, _ = process.communicate(timeout=JOB_TIMEOUT or None)
+            entry['exit_code'] = process.returncode
+        except subprocess.TimeoutExpired:
+            process.kill()
+            stdout, _ = process.communicate()
+            entry['exit_code'] = process.returncode
+            entry['status'] = 'timeout'
+
+        summary = None
+        for line in reversed((stdout or '').strip().splitlines()):
+            try:
+                summary = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(summary, dict):
+                break
+            summary = None
+        if summary:
+            entry.update(summary)
+
+        if 'status' not in entry:
+            if entry['exit_code'] == 0:
+                entry['status'] = 'success'
+            elif entry['exit_code'] == 3:
+                entry['status'] = 'partial'
+            else:
+                entry['status'] = 'failed'
+    except Exception as e:
+        entry.update(status='failed', error=str(e))
+        logger.error(f'{JOB_NAME} 실행 실패: {e}')
+    finally:
+        entry['finished_at'] = datetime.now().isoformat(timespec='seconds')
+        entry['duration_s'] = round(time.perf_counter() - started, 3)
+        append_history(entry)
+        probe_file.close()
+        lock_file.close()
+
+    logger.info(f"{JOB_NAME} {entry['status']}: {entry['duration_s']}초, 색인 {entry.get('indexed', 0)}건")
+    return entry
+
+
+# 다른 프로세스에서 끝난 실행 기록을 이 프로세스에 반영 (웹 워커가 호출)
+#   - 바뀐 여행지 좌표가 들어 있는 타일 캐시만 삭제
+#   - 실패 / 시간 초과로 끝났거나 좌표 목록이 잘린 실행은 어느 타일이 바뀌었는지 알 수 없으므로 타일 캐시 전체 삭제
+#   - 실행 시간 / 처리 건수 / 마지막 성공 시각을 /metrics 에 반영
+# 삭제한 타일 캐시 키 수 반환 (전체 삭제면 None)
+def apply_run(entry):
+    from elastic.spot_geo import invalidate_locations, tile_cache
+    from utils.metrics import record_job_run
+
+    status = entry.get('status')
+    if status != 'skipped':
+        finished_at = entry.get('finished_at')
+        finished_ts = datetime.fromisoformat(finished_at).timestamp() if finished_at else None
+        record_job_run(entry.get('job', JOB_NAME), status, entry.get('duration_s', 0), entry.get('items', {}),
+                       finished_ts)
+
+    if status in ('failed', 'timeout') or entry.get('touched_truncated'):
+        tile_cache.clear()
+        return None
+    return invalidate_locations({'lat': lat, 'lon': lon} for lat, lon in entry.get('touched', []))
+
+
+# APScheduler 로 매일 실행 (한 프로세스 안에서도 겹치지 않도록 max_instances=1)
+def add_schedule(scheduler):
+    scheduler.add_job(run_job, 'cron', hour=JOB_CRON_HOUR, minute=JOB_CRON_MINUTE, id=JOB_NAME,
+                      max_instances=1, coalesce=True, misfire_grace_time=3600, replace_existing=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='여행지 야간 동기화 실행기')
+    parser.add_argument('--once', action='store_true', help='스케줄 없이 지금 한 번 실행')
+    parser.add_argument('--from', dest='start_date', help='시작 수정일 (YYYYMMDD)')
+    parser.add_argument('--to', dest='end_date', help='마지막 수정일 (YYYYMMDD)')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        return run_child(args.start_date, args.end_date)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+    if args.once:
+        entry = run_job(args.start_date, args.end_date, trigger='manual')
+        return 0 if entry['status'] == 'success' else 1
+
+    from apscheduler.schedulers.blocking import BlockingScheduler
+
+    scheduler = BlockingScheduler()
+    add_schedule(scheduler)
+    logger.info(f'{JOB_NAME} 스케줄러 시작 (매일 {JOB_CRON_HOUR:02d}:{JOB_CRON_MINUTE:02d})')
+    try:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,7 @@
+# 테스트 공용 설정: 저장소 루트를 import 경로에 추가하고, 모듈 import 에 필요한 환경 변수 기본값 설정
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('ELASTIC_PASSWORD', 'test')
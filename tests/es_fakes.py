@@ -0,0 +1,141 @@
+# 테스트용 메모리 가짜 Elasticsearch (별칭 / 쓰기 차단 / _reindex 버전 처리만 흉내)
+import fnmatch
+
+from elasticsearch import NotFoundError
+
+from elastic import index_alias
+
+
+class WriteBlocked(Exception):
+    pass
+
+
+def _not_found(name):
+    return NotFoundError(f'no such index [{name}]', meta=None, body={})
+
+
+class FakeIndices:
+    def __init__(self, es):
+        self.es = es
+
+    def get(self, index, **_):
+        return {name: {} for name in self.es.docs if fnmatch.fnmatch(name, index)}
+
+    def get_alias(self, name):
+        targets = {index: {} for index, aliases in self.es.aliases.items() if name in aliases}
+        if not targets:
+            raise _not_found(name)
+        return targets
+
+    def exists(self, index):
+        return index in self.es.docs or any(index in aliases for aliases in self.es.aliases.values())
+
+    def create(self, index, body=None):
+        self.es.docs[index] = {}
+        self.es.aliases[index] = set()
+
+    def put_settings(self, index, settings):
+        if index not in self.es.docs:
+            raise _not_found(index)
+        if 'index.blocks.write' in settings:
+            if settings['index.blocks.write']:
+                self.es.blocked.add(index)
+            else:
+                self.es.blocked.discard(index)
+
+    def refresh(self, index):
+        pass
+
+    def update_aliases(self, actions):
+        for action in actions:
+            (kind, spec), = action.items()
+            if kind == 'add':
+                self.es.aliases[spec['index']].add(spec['alias'])
+            elif kind == 'remove':
+                self.es.aliases[spec['index']].discard(spec['alias'])
+            elif kind == 'remove_index':
+                self.delete(spec['index'])
+
+    def delete(self, index, ignore_unavailable=False):
+        self.es.docs.pop(index, None)
+        self.es.aliases.pop(index, None)
+        self.es.blocked.discard(index)
+
+
+class FakeElasticsearch:
+    def __init__(self):
+        self.docs = {}      # 인덱스 → {_id: (version, source)}
+        self.aliases = {}   # 인덱스 → 별칭 집합
+        self.blocked = set()
+        self.indices = FakeIndices(self)
+        self.reindex_calls = 0
+        self.after_reindex = []  # reindex 호출 순서별 콜백 (재색인 도중 다른 클라이언트의 쓰기 흉내)
+
+    def resolve(self, name):
+        if name in self.docs:
+            return name
+        targets = [index for index, aliases in self.aliases.items() if name in aliases]
+        if len(targets) != 1:
+            raise _not_found(name)
+        return targets[0]
+
+    # 별칭을 통한 쓰기 (version 증가)
+    def write(self, name, doc_id, source):
+        index = self.resolve(name)
+        if index in self.blocked:
+            raise WriteBlocked(index)
+        version = self.docs[index].get(doc_id, (0, None))[0] + 1
+        self.docs[index][doc_id] = (version, source)
+
+    def delete_doc(self, name, doc_id):
+        index = self.resolve(name)
+        if index in self.blocked:
+            raise WriteBlocked(index)
+        self.docs[index].pop(doc_id, None)
+
+    def count(self, index):
+        return {'count': len(self.docs[self.resolve(index)])}
+
+    def reindex(self, source, dest, conflicts=None, **_):
+        assert dest.get('version_type') == 'external' and conflicts == 'proceed'
+        src, dst = self.docs[self.resolve(source['index'])], self.docs[dest['index']]
+        created = updated = 0
+        for doc_id, (version, body) in list(src.items()):
+            current = dst.get(doc_id)
+            if current is None:
+                created += 1
+            elif current[0] < version:
+                updated += 1
+            else:
+                continue
+            dst[doc_id] = (version, body)
+
+        callbacks = self.after_reindex
+        if self.reindex_calls < len(callbacks) and callbacks[self.reindex_calls]:
+            callbacks[self.reindex_calls]()
+        self.reindex_calls += 1
+        return {'total': len(src), 'created': created, 'updated': updated, 'failures': []}
+
+
+# 별칭 alias → {alias}_v1 인덱스에 docs 를 넣은 가짜 ES (index_alias 의 scan / bulk 도 가짜로 대체)
+def fake_es_with_alias(monkeypatch, alias, docs):
+    fake = FakeElasticsearch()
+    fake.indices.create(f'{alias}_v1')
+    fake.indices.update_aliases([{'add': {'index': f'{alias}_v1', 'alias': alias}}])
+    for doc_id, source in docs.items():
+        fake.write(alias, doc_id, source)
+
+    def scan(client, index, **_):
+        return ({'_id': doc_id} for doc_id in list(client.docs[client.resolve(index)]))
+
+    def bulk(client, actions, **_):
+        for action in actions:
+            client.docs[client.resolve(action['_index'])].pop(action['_id'], None)
+
+    monkeypatch.setattr(index_alias.helpers, 'scan', scan)
+    monkeypatch.setattr(index_alias.helpers, 'bulk', bulk)
+    return fake
+
+
+def sources(fake, index):
+    return {doc_id: body for doc_id, (_, body) in fake.docs[index].items()}
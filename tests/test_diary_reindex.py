@@ -0,0 +1,69 @@
+# diary 무중단 재색인 중 들어온 쓰기가 새 인덱스에 반영되는지 (메모리 가짜 Elasticsearch)
+import pytest
+
+import elastic.diary_elastic as diary_elastic
+from es_fakes import WriteBlocked, fake_es_with_alias, sources
+
+
+@pytest.fixture
+def es(monkeypatch):
+    fake = fake_es_with_alias(monkeypatch, 'diary', {f'd{i}': {'title': f'일기 {i}'} for i in range(5)})
+    monkeypatch.setattr(diary_elastic, 'get_es', lambda: fake)
+    return fake
+
+
+def test_writes_during_copy_reach_new_index(es):
+    def concurrent_writes():
+        es.write('diary', 'd5', {'title': '새 일기'})          # 생성
+        es.write('diary', 'd1', {'title': '수정된 일기 1'})    # 수정
+        es.delete_doc('diary', 'd2')                           # 삭제
+
+    es.after_reindex = [concurrent_writes]
+    result = diary_elastic.reindex_diary()
+
+    assert result['index'] == 'diary_v2'
+    assert es.resolve('diary') == 'diary_v2'
+    assert sources(es, 'diary_v2') == sources(es, 'diary_v1')
+    assert sources(es, 'diary_v2')['d1'] == {'title': '수정된 일기 1'}
+    assert 'd5' in es.docs['diary_v2'] and 'd2' not in es.docs['diary_v2']
+    assert result['count'] == 5
+
+
+# 복사 중 생성만 있으면 원본 문서 수가 늘어나므로, 보정 전에 검증하면 min_ratio=1.0 에서 실패한다.
+def test_create_during_copy_passes_count_check(es):
+    es.after_reindex = [lambda: es.write('diary', 'd5', {'title': '새 일기'})]
+    result = diary_elastic.reindex_diary()
+
+    assert es.resolve('diary') == 'diary_v2'
+    assert sources(es, 'diary_v2') == sources(es, 'diary_v1')
+    assert result['count'] == 6
+
+
+def test_writes_blocked_during_catch_up_and_released_after(es):
+    attempts = []
+
+    def write_during_catch_up():
+        with pytest.raises(WriteBlocked):
+            es.write('diary', 'd9', {'title': '보정 중 쓰기'})
+        attempts.append('blocked')
+
+    es.after_reindex = [None, write_during_catch_up]
+    diary_elastic.reindex_diary()
+
+    assert attempts == ['blocked']
+    assert not es.blocked
+    es.write('diary', 'd9', {'title': '교체 후 쓰기'})
+    assert 'd9' in es.docs['diary_v2']
+
+
+def test_failed_catch_up_releases_block_and_keeps_alias(es):
+    def fail():
+        raise RuntimeError('reindex failed')
+
+    es.after_reindex = [None, fail]
+    with pytest.raises(RuntimeError):
+        diary_elastic.reindex_diary()
+
+    assert es.resolve('diary') == 'diary_v1'
+    assert 'diary_v2' not in es.docs
+    assert not es.blocked
@@ -0,0 +1,92 @@
+# /diaries/search 페이지네이션: 첫 페이지는 PIT 없이, 커서 요청부터 PIT 사용 / 잘못된 커서는 400
+import base64
+import json
+
+import pytest
+
+import app as app_module
+from elastic import diary_search
+
+
+class FakeElasticsearch:
+    def __init__(self, total):
+        self.total = total
+        self.searches = []
+        self.opened = []
+        self.closed = []
+
+    def open_point_in_time(self, index, keep_alive):
+        pit_id = f'pit-{len(self.opened) + 1}'
+        self.opened.append(pit_id)
+        return {'id': pit_id}
+
+    def close_point_in_time(self, id):
+        self.closed.append(id)
+
+    # created_time 내림차순 → diary_id 오름차순으로 정렬된 가짜 일지 (search_after 는 위치로만 흉내)
+    def search(self, **body):
+        self.searches.append(body)
+        start = 0
+        if 'search_after' in body:
+            start = int(body['search_after'][1][1:]) + 1
+        size = body['size']
+        hits = []
+        for i in range(start, min(start + size, self.total)):
+            sort = [1000 - i, f'd{i}'] + ([i] if 'pit' in body else [])
+            hits.append({'_source': {'diary_id': f'd{i}'}, 'sort': sort})
+        response = {'hits': {'hits': hits, 'total': {'value': self.total}}}
+        if 'pit' in body:
+            response['pit_id'] = body['pit']['id']
+        return response
+
+
+@pytest.fixture
+def es(monkeypatch):
+    fake = FakeElasticsearch(total=5)
+    monkeypatch.setattr(diary_search, 'get_es', lambda: fake)
+    return fake
+
+
+def test_first_page_opens_no_pit(es):
+    result = diary_search.search_diaries({'limit': '2'})
+    assert es.opened == [] and 'pit' not in es.searches[0]
+    assert es.searches[0]['index'] == diary_search.DIARY_INDEX
+    assert result['total'] == 5 and result['next_cursor']
+
+
+def test_cursor_opens_pit_and_closes_on_last_page(es):
+    first = diary_search.search_diaries({'limit': '2'})
+    second = diary_search.search_diaries({'cursor': first['next_cursor']})
+    assert es.opened == ['pit-1']
+    assert es.searches[1]['pit']['id'] == 'pit-1'
+    assert es.searches[1]['search_after'] == [999, 'd1', diary_search.SHARD_DOC_MAX]
+    assert [diary['diary_id'] for diary in second['diaries']] == ['d2', 'd3']
+
+    last = diary_search.search_diaries({'cursor': second['next_cursor']})
+    assert es.opened == ['pit-1'] and es.closed == ['pit-1']
+    assert [diary['diary_id'] for diary in last['diaries']] == ['d4'] and last['next_cursor'] is None
+
+
+def _cursor(data):
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip('=')
+
+
+def test_malformed_cursor_returns_400(es):
+    params = diary_search.parse_diary_params({})
+    valid = {'pit': None, 'after': [1, 'd0'], 'params': params}
+    bad = [
+        {key: value for key, value in valid.items() if key != 'pit'},
+        dict(valid, params={key: value for key, value in params.items() if key != 'q'}),
+        dict(valid, params=dict(params, tags='a,b')),
+        dict(valid, params=dict(params, limit='20')),
+        dict(valid, after=[1]),
+        dict(valid, pit=3),
+        ['not', 'a', 'dict'],
+    ]
+    client = app_module.app.test_client()
+    for data in bad:
+        response = client.get('/diaries/search', query_string={'cursor': _cursor(data)})
+        assert response.status_code == 400, data
+    assert client.get('/diaries/search', query_string={'cursor': '%%%'}).status_code == 400
+    assert client.get('/diaries/search', query_string={'cursor': _cursor(valid)}).status_code == 200
+    assert es.opened == ['pit-1']
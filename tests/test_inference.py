@@ -0,0 +1,88 @@
+# 추론 실행기 대기열 제한(QueueFull → 429) / 기한(DeadlineExceeded → 503) 테스트
+import threading
+import time
+
+import pytest
+
+from ML.inference import DeadlineExceeded, InferenceExecutor, QueueFull, check_deadline
+
+
+def occupy(executor, count):
+    release = threading.Event()
+    started = threading.Semaphore(0)
+
+    def block():
+        started.release()
+        release.wait(5)
+
+    threads = [threading.Thread(target=executor.run, args=(block,), kwargs={'timeout': 5}) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for _ in range(min(count, executor.max_workers)):
+        assert started.acquire(timeout=5)
+    return release, threads
+
+
+def test_queue_full_rejects_without_waiting():
+    executor = InferenceExecutor(max_workers=1, max_queue=1, timeout=5)
+    release, threads = occupy(executor, 2)
+    try:
+        with pytest.raises(QueueFull):
+            executor.run(lambda: 'never')
+        assert executor.stats()['rejected'] == 1
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join()
+    assert executor.run(lambda: 'ok') == 'ok'
+    assert executor.stats()['pending'] == 0
+
+
+def test_deadline_while_running():
+    executor = InferenceExecutor(max_workers=1, max_queue=1, timeout=5)
+    release = threading.Event()
+    try:
+        with pytest.raises(DeadlineExceeded):
+            executor.run(release.wait, 5, timeout=0.05)
+        assert executor.stats()['timed_out'] == 1
+    finally:
+        release.set()
+
+
+def test_timed_out_queued_job_is_not_run():
+    executor = InferenceExecutor(max_workers=1, max_queue=1, timeout=5)
+    release, threads = occupy(executor, 1)
+    ran = []
+    try:
+        with pytest.raises(DeadlineExceeded):
+            executor.run(ran.append, 'queued', timeout=0.05)
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join()
+    executor.run(lambda: None)  # 앞의 작업이 모두 처리될 때까지 대기
+    # 기한이 지난 대기 작업은 취소되어 실행되지 않는다.
+    assert ran == []
+    assert executor.stats()['timed_out'] == 1
+
+
+def test_running_job_stops_at_check_deadline():
+    executor = InferenceExecutor(max_workers=1, max_queue=0, timeout=5)
+    done = threading.Event()
+    steps = []
+
+    def chunks():
+        try:
+            while len(steps) < 1000:
+                check_deadline()
+                steps.append(len(steps))
+                time.sleep(0.01)
+        finally:
+            done.set()
+
+    with pytest.raises(DeadlineExceeded):
+        executor.run(chunks, timeout=0.05)
+    assert done.wait(5)
+    assert 0 < len(steps) < 1000
+    assert executor.stats()['aborted'] == 1
+    check_deadline()  # 실행기 밖에서는 기한 없음
@@ -0,0 +1,58 @@
+# iter_json_array 스트리밍 파서 테스트
+import io
+import json
+
+import pytest
+
+from elastic.json_stream import JsonStreamError, iter_json_array, iter_json_items
+
+
+class CountingReader(io.BytesIO):
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+def items_of(text, **kwargs):
+    return [item for item, _ in iter_json_array(io.BytesIO(text.encode('utf-8')), **kwargs)]
+
+
+def test_reads_items_across_small_buffers_and_resumes(tmp_path):
+    items = [{'title': f'여행지{i}', 'mapx': 127.0 + i} for i in range(20)] + [12345, 'end']
+    path = tmp_path / 'items.json'
+    path.write_text(json.dumps(items, ensure_ascii=False, indent=1), encoding='utf-8')
+
+    assert items_of(path.read_text(encoding='utf-8'), read_size=7) == items
+    offsets = [offset for _, offset in iter_json_items(str(path), read_size=7, with_offsets=True)]
+    assert list(iter_json_items(str(path), read_size=7, start_offset=offsets[9])) == items[10:]
+    assert items_of('  [ ]  ') == []
+
+
+@pytest.mark.parametrize('text', [
+    '[{"a": 1},,{"a": 2}]',
+    '[,{"a": 1}]',
+    '[{"a": 1},]',
+    '[{"a": 1} {"a": 2}]',
+    '[,]',
+])
+def test_rejects_stray_or_missing_commas(text):
+    with pytest.raises(JsonStreamError):
+        items_of(text, read_size=4)
+
+
+def test_decode_error_does_not_buffer_rest_of_file():
+    data = ('[{"a": 1}, {"a": oops}, ' + ', '.join(['{"a": 1}'] * 20000) + ']').encode('utf-8')
+    f = CountingReader(data)
+    with pytest.raises(JsonStreamError):
+        list(iter_json_array(f, read_size=64, max_item_size=1024))
+    assert f.bytes_read < 2048 < len(data)
+
+
+def test_unclosed_array():
+    with pytest.raises(JsonStreamError):
+        items_of('[{"a": 1}, {"a": 2}', read_size=5)
@@ -0,0 +1,35 @@
+# /model/reload 접근 제한 테스트 (요청 본문의 경로는 무시하고 설정된 번들만 다시 로드)
+import pytest
+
+import app as app_module
+
+REMOTE = {'REMOTE_ADDR': '10.0.0.5'}
+
+
+@pytest.fixture
+def reloads(monkeypatch):
+    calls = []
+    monkeypatch.setattr(app_module.registry, 'reload', lambda *args, **kwargs: calls.append((args, kwargs)) or True)
+    return calls
+
+
+def test_reload_without_token_only_from_localhost(monkeypatch, reloads):
+    monkeypatch.setattr(app_module, 'ADMIN_TOKEN', None)
+    client = app_module.app.test_client()
+
+    assert client.post('/model/reload', environ_base=REMOTE).status_code == 403
+    assert reloads == []
+    response = client.post('/model/reload', json={'bundle_dir': '/tmp/evil'})
+    assert response.status_code == 202
+    assert reloads == [((), {})]
+
+
+def test_reload_requires_matching_token(monkeypatch, reloads):
+    monkeypatch.setattr(app_module, 'ADMIN_TOKEN', 'secret')
+    client = app_module.app.test_client()
+
+    assert client.post('/model/reload').status_code == 403
+    assert client.post('/model/reload', headers={'X-Admin-Token': 'wrong'}).status_code == 403
+    response = client.post('/model/reload', headers={'X-Admin-Token': 'secret'}, environ_base=REMOTE)
+    assert response.status_code == 202
+    assert len(reloads) == 1
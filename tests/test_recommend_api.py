@@ -0,0 +1,117 @@
+# /recommend 요청 검증 / 대기열 제한(429) / 기한(503) / 캐시 경로 테스트
+import threading
+
+import pandas as pd
+import pytest
+
+import app as app_module
+from ML.inference import InferenceExecutor
+
+
+@pytest.fixture
+def client():
+    return app_module.app.test_client()
+
+
+def profile(**extra):
+    return dict({field: 1 for field in app_module.USER_INPUT_FIELDS}, enrich='false', **extra)
+
+
+@pytest.mark.parametrize('extra', [
+    {'offset': -1},
+    {'limit': 0},
+    {'limit': app_module.MAX_RECOMMEND_LIMIT + 1},
+    {'top_n': app_module.MAX_RECOMMEND_LIMIT + 1},
+])
+def test_recommend_rejects_bad_pagination(client, extra):
+    response = client.post('/recommend', json=profile(**extra))
+    assert response.status_code == 400
+    assert response.get_json()['status'] == 'error'
+
+
+def test_recommend_accepts_max_limit(client):
+    response = client.post('/recommend', json=profile(limit=app_module.MAX_RECOMMEND_LIMIT, threshold=0))
+    body = response.get_json()
+    assert response.status_code == 200
+    assert body['limit'] == app_module.MAX_RECOMMEND_LIMIT
+    assert len(body['recommendations']) == app_module.MAX_RECOMMEND_LIMIT
+
+
+@pytest.fixture
+def blocked_executor(monkeypatch):
+    # 캐시를 비우고 점수화를 멈춰 두어 요청이 항상 추론 실행기를 거치게 한다.
+    app_module.recommend_cache.clear()
+    release = threading.Event()
+    started = threading.Event()
+
+    def block(user_input, **kwargs):
+        started.set()
+        release.wait(5)
+        return pd.DataFrame()
+
+    monkeypatch.setattr(app_module, 'recommend_top_destinations', block)
+    yield release, started
+    release.set()
+
+
+def test_recommend_returns_429_when_queue_is_full(client, monkeypatch, blocked_executor):
+    release, started = blocked_executor
+    executor = InferenceExecutor(max_workers=1, max_queue=0, timeout=3)
+    monkeypatch.setattr(app_module, 'inference_executor', executor)
+    busy = threading.Thread(target=client.post, args=('/recommend',), kwargs={'json': profile()})
+    busy.start()
+    assert started.wait(5)
+
+    response = client.post('/recommend', json=profile())
+    release.set()
+    busy.join()
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '3'
+    assert executor.stats()['rejected'] == 1
+
+
+def test_recommend_returns_503_after_deadline(client, monkeypatch, blocked_executor):
+    executor = InferenceExecutor(max_workers=1, max_queue=1, timeout=0.05)
+    monkeypatch.setattr(app_module, 'inference_executor', executor)
+
+    response = client.post('/recommend', json=profile())
+    assert response.status_code == 503
+    assert executor.stats()['timed_out'] == 1
+
+
+def test_cached_profile_skips_executor_and_counts_once(client, monkeypatch):
+    app_module.recommend_cache.clear()
+    before = app_module.recommend_cache.stats()
+    assert client.post('/recommend', json=profile()).get_json()['status'] == 'success'
+    after_miss = app_module.recommend_cache.stats()
+    assert (after_miss['hits'], after_miss['misses']) == (before['hits'], before['misses'] + 1)
+
+    # 캐시에 있으면 추론 실행기를 거치지 않는다.
+    executor = InferenceExecutor(max_workers=1, max_queue=0, timeout=5)
+    monkeypatch.setattr(app_module, 'inference_executor', executor)
+    response = client.post('/recommend', json=profile())
+    assert response.get_json()['status'] == 'success'
+    assert executor.stats()['completed'] == 0
+    after_hit = app_module.recommend_cache.stats()
+    assert (after_hit['hits'], after_hit['misses']) == (after_miss['hits'] + 1, after_miss['misses'])
+
+
+def test_batch_runs_beside_single_recommendations(client, monkeypatch, blocked_executor):
+    # 단건 실행기가 막혀 있어도 배치는 별도 실행기에서 처리되고, 단건 캐시를 채우지 않는다.
+    release, started = blocked_executor
+    monkeypatch.setattr(app_module, 'inference_executor', InferenceExecutor(max_workers=1, max_queue=0, timeout=3))
+    busy = threading.Thread(target=client.post, args=('/recommend',), kwargs={'json': profile()})
+    busy.start()
+    assert started.wait(5)
+
+    response = client.post('/recommend/batch', json={'profiles': [profile(AGE_GRP=age) for age in (20, 30)]})
+    release.set()
+    busy.join()
+    assert response.status_code == 200
+    assert len(response.get_json()['results']) == 2
+    assert len(app_module.recommend_cache) == 0
+
+
+def test_batch_rejects_too_many_profiles(client):
+    response = client.post('/recommend/batch', json={'profiles': [profile()] * (app_module.MAX_BATCH_PROFILES + 1)})
+    assert response.status_code == 400
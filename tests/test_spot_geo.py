@@ -0,0 +1,49 @@
+# 타일 캐시 무효화: 경계 위의 여행지는 geo_bounding_box 가 경계를 포함하므로 맞닿은 타일도 지워야 한다.
+import pytest
+
+from elastic import spot_geo
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    spot_geo.tile_cache.clear()
+    yield
+    spot_geo.tile_cache.clear()
+
+
+def cache_tiles(*tiles):
+    for tile in tiles:
+        spot_geo.tile_cache.set(tile + (None,), {'count': 1})
+
+
+def cached(tile):
+    return spot_geo.tile_cache.get(tile + (None,)) is not None
+
+
+def test_point_on_tile_corner_invalidates_all_touching_tiles():
+    z, x, y = 10, 873, 396
+    _, corner = spot_geo.tile_bounds(z, x, y)
+    touching = [(z, x, y), (z, x + 1, y), (z, x, y + 1), (z, x + 1, y + 1)]
+    far = (z, x + 2, y)
+    cache_tiles(*touching, far)
+
+    spot_geo.invalidate_locations([corner])
+
+    assert not any(cached(tile) for tile in touching)
+    assert cached(far)
+
+
+def test_point_on_vertical_border_invalidates_both_sides():
+    cache_tiles((1, 0, 0), (1, 1, 0), (1, 0, 1))
+    spot_geo.invalidate_locations([{'lat': 45.0, 'lon': 0.0}])
+    assert not cached((1, 0, 0)) and not cached((1, 1, 0))
+    assert cached((1, 0, 1))
+
+
+def test_interior_point_invalidates_one_tile_per_zoom():
+    top_left, bottom_right = spot_geo.tile_bounds(12, 3493, 1587)
+    center = {'lat': (top_left['lat'] + bottom_right['lat']) / 2, 'lon': (top_left['lon'] + bottom_right['lon']) / 2}
+    cache_tiles((12, 3493, 1587), (12, 3494, 1587), (12, 3493, 1588))
+
+    assert spot_geo.invalidate_locations([center]) == 1
+    assert cached((12, 3494, 1587)) and cached((12, 3493, 1588))
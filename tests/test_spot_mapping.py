@@ -0,0 +1,33 @@
+# spot_mapping.apply_modified: 바뀐 문서로 이름 ↔ content_id 연결 / 해제 (scan 은 가짜로 대체)
+from elastic import spot_mapping
+
+
+def apply(monkeypatch, mapping, names, docs):
+    hits = [{'_id': content_id, '_source': {'content_id': content_id, 'title': title}} for content_id, title in docs]
+    monkeypatch.setattr(spot_mapping.helpers, 'scan', lambda es, **kwargs: iter(hits))
+    return spot_mapping.apply_modified(None, mapping, names, '2024-01-01T00:00:00')
+
+
+def test_links_new_titles_and_unlinks_renamed_docs(monkeypatch):
+    names = ['경복궁', '창덕궁', '덕수궁 (서울)', '남산타워']
+    mapping = {'경복궁': '1', '창덕궁': '2', '덕수궁 (서울)': None, '남산타워': '4'}
+
+    changed = apply(monkeypatch, mapping, names, [
+        ('2', '창덕궁 후원'),      # 제목이 바뀌어 연결 해제
+        ('3', '덕수궁'),           # 정규화 이름이 같아져 연결
+        ('4', '남산 타워'),        # 정규화하면 같으므로 그대로
+        ('9', '경복궁'),           # 이미 연결된 이름은 바꾸지 않음
+    ])
+
+    assert changed == 2
+    assert mapping == {'경복궁': '1', '창덕궁': None, '덕수궁 (서울)': '3', '남산타워': '4'}
+
+
+def test_doc_moving_to_another_name_is_relinked(monkeypatch):
+    names = ['경복궁', '창덕궁']
+    mapping = {'경복궁': '1', '창덕궁': None}
+
+    changed = apply(monkeypatch, mapping, names, [('1', '창덕궁')])
+
+    assert changed == 2
+    assert mapping == {'경복궁': None, '창덕궁': '1'}
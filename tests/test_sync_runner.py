@@ -0,0 +1,50 @@
+# sync_runner 잠금: 실행 여부 조회(is_running)가 작업 잠금과 경합하지 않는지
+import fcntl
+import threading
+
+import pytest
+
+from jobs import sync_runner
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / 'job.lock'), str(tmp_path / 'job.lock.running')
+
+
+def test_is_running_follows_the_running_job(paths):
+    lock_path, probe_path = paths
+    assert not sync_runner.is_running(probe_path)
+
+    lock_file, probe_file = sync_runner.acquire_lock(lock_path, probe_path)
+    assert sync_runner.is_running(probe_path)
+    assert sync_runner.acquire_lock(lock_path, probe_path) is None
+
+    probe_file.close()
+    lock_file.close()
+    assert not sync_runner.is_running(probe_path)
+
+
+def test_is_running_never_touches_the_job_lock(paths):
+    lock_path, probe_path = paths
+    with open(lock_path, 'a+') as other:
+        fcntl.flock(other.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        # 작업 잠금만 잡혀 있고 표시 파일이 없으면 조회는 잠금을 시도하지 않는다.
+        assert not sync_runner.is_running(probe_path)
+
+
+def test_status_check_during_start_does_not_skip_the_run(paths):
+    lock_path, probe_path = paths
+    # 조회가 표시 파일의 공유 잠금을 잡고 있는 순간에 예약 실행이 시작되는 경우
+    checking = open(probe_path, 'a+')
+    fcntl.flock(checking.fileno(), fcntl.LOCK_SH)
+    result = []
+    starter = threading.Thread(target=lambda: result.append(sync_runner.acquire_lock(lock_path, probe_path)))
+    starter.start()
+    starter.join(0.1)
+    checking.close()
+    starter.join(2)
+
+    assert result and result[0] is not None
+    for f in result[0]:
+        f.close()
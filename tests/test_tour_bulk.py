@@ -0,0 +1,86 @@
+# send_to_elastic 체크포인트 / parallel_bulk 429 재시도 테스트 (벌크 헬퍼는 가짜로 대체)
+import json
+
+import pytest
+
+from elastic import tour_to_elastic
+
+
+class FakeIndices:
+    def exists(self, index):
+        return True
+
+
+class FakeElasticsearch:
+    def __init__(self):
+        self.indices = FakeIndices()
+
+
+# 액션별로 (ok, result) 를 돌려주는 가짜 벌크 헬퍼. fail(attempt, doc_id) 가 상태 코드를 주면 실패로 처리한다.
+class FakeBulk:
+    def __init__(self, fail=lambda attempt, doc_id: None):
+        self.fail = fail
+        self.calls = []
+        self.indexed = []
+
+    def __call__(self, es, actions, **kwargs):
+        attempt = len(self.calls)
+        self.calls.append([action["_id"] for action in actions])
+        for action in actions:
+            status = self.fail(attempt, action["_id"])
+            if status:
+                yield False, {"index": {"_id": action["_id"], "status": status, "error": {"type": "rejected"}}}
+            else:
+                self.indexed.append(action["_id"])
+                yield True, {"index": {"_id": action["_id"], "status": 201}}
+
+
+@pytest.fixture
+def tour_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(tour_to_elastic, "get_es", FakeElasticsearch)
+    monkeypatch.setattr(tour_to_elastic.time, "sleep", lambda seconds: None)
+    items = [{"contentid": str(i), "title": f"여행지{i}", "mapx": "127.0", "mapy": "37.5"} for i in range(1, 7)]
+    path = tmp_path / "tour.json"
+    path.write_text(json.dumps(items, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+def test_checkpoint_stops_at_first_failed_segment(tour_file, monkeypatch):
+    bulk = FakeBulk(fail=lambda attempt, doc_id: 400 if doc_id == "3" else None)
+    monkeypatch.setattr(tour_to_elastic.helpers, "streaming_bulk", bulk)
+
+    result = tour_to_elastic.send_to_elastic(tour_file, batch_size=2)
+    assert result["indexed"] == 5 and result["failed"] == 1
+
+    # 1~2 구간만 완전히 성공했으므로 체크포인트는 그 뒤에 머문다.
+    checkpoint = tour_to_elastic.load_checkpoint(tour_file, "tour_spots")
+    assert checkpoint["batches"] == 1 and checkpoint["docs"] == 2
+
+    # 다시 실행하면 실패한 구간부터 재색인하고, 모두 성공하면 체크포인트를 지운다.
+    bulk = FakeBulk()
+    monkeypatch.setattr(tour_to_elastic.helpers, "streaming_bulk", bulk)
+    result = tour_to_elastic.send_to_elastic(tour_file, batch_size=2)
+    assert bulk.indexed == ["3", "4", "5", "6"]
+    assert result == dict(result, indexed=4, failed=0, resumed_from=2)
+    assert tour_to_elastic.load_checkpoint(tour_file, "tour_spots") is None
+
+
+def test_parallel_retries_rejected_items(tour_file, monkeypatch):
+    # 첫 시도에서 2, 5 가 429 로 거절되고 재시도에서 성공
+    bulk = FakeBulk(fail=lambda attempt, doc_id: 429 if attempt == 0 and doc_id in ("2", "5") else None)
+    monkeypatch.setattr(tour_to_elastic.helpers, "parallel_bulk", bulk)
+
+    result = tour_to_elastic.send_to_elastic(tour_file, batch_size=3, parallel=True, thread_count=2)
+    assert result["indexed"] == 6 and result["failed"] == 0
+    assert bulk.calls == [["1", "2", "3", "4", "5", "6"], ["2", "5"]]
+    assert tour_to_elastic.load_checkpoint(tour_file, "tour_spots") is None
+
+
+def test_parallel_gives_up_after_max_retries(tour_file, monkeypatch):
+    bulk = FakeBulk(fail=lambda attempt, doc_id: 429 if doc_id == "4" else None)
+    monkeypatch.setattr(tour_to_elastic.helpers, "parallel_bulk", bulk)
+
+    result = tour_to_elastic.send_to_elastic(tour_file, batch_size=3, parallel=True, thread_count=2)
+    assert result["indexed"] == 5 and result["failed"] == 1
+    assert len(bulk.calls) == tour_to_elastic.BULK_MAX_RETRIES + 1
+    assert tour_to_elastic.load_checkpoint(tour_file, "tour_spots") is None
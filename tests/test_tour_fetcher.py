@@ -0,0 +1,77 @@
+# TourApiFetcher: 워커 스레드 transform / 429 재시도와 백오프 / 토큰 버킷 속도 제한 (로컬 스텁 TourAPI)
+import threading
+
+from api.tour_fetcher import TokenBucket, TourApiFetcher
+from benchmarks.fakes import FakeTourApi
+
+ITEMS = [{'contentid': str(i), 'title': f'여행지{i}'} for i in range(50)]
+
+
+def fetcher_for(server, **kwargs):
+    options = dict(num_of_rows=10, max_workers=3, rate=1000, backoff=0.5, base_url=server.url)
+    options.update(kwargs)
+    return TourApiFetcher('areaBasedSyncList1', {'_type': 'json'}, **options)
+
+
+def test_transform_runs_in_worker_threads():
+    threads = []
+
+    def transform(items):
+        threads.append(threading.current_thread().name)
+        return [item['contentid'] for item in items]
+
+    with FakeTourApi(ITEMS) as server:
+        result = fetcher_for(server).fetch_all(transform)
+
+    assert result == [item['contentid'] for item in ITEMS]
+    # 1페이지만 호출 스레드, 나머지 4페이지는 수집 워커에서 변환
+    assert threads.count(threading.current_thread().name) == 1
+    assert sum(name.startswith('tour-fetch') for name in threads) == 4
+
+
+def test_429_is_retried_with_backoff():
+    sleeps = []
+    with FakeTourApi(ITEMS, errors={2: [429, 429], 4: [503]}) as server:
+        fetcher = fetcher_for(server, sleep=sleeps.append)
+        result = fetcher.fetch_all()
+
+    assert len(result) == len(ITEMS)
+    assert fetcher.metrics['retries'] == 3 and fetcher.metrics['failed_pages'] == []
+    assert sorted(sleeps) == [0.5, 0.5, 1.0]  # 페이지 2: 0.5 → 1.0, 페이지 4: 0.5
+
+
+def test_page_failing_every_retry_is_reported():
+    with FakeTourApi(ITEMS, errors={3: [429] * 3}) as server:
+        fetcher = fetcher_for(server, max_retries=2, sleep=lambda seconds: None)
+        result = fetcher.fetch_all()
+
+    assert fetcher.metrics['failed_pages'] == [3]
+    assert len(result) == len(ITEMS) - 10
+
+
+def test_token_bucket_limits_rate():
+    now = [0.0]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    bucket = TokenBucket(rate=4, capacity=2, timer=lambda: now[0], sleep=sleep)
+    times = []
+    for _ in range(10):
+        bucket.acquire()
+        times.append(now[0])
+    # 처음 2개는 바로, 이후에는 초당 4개
+    assert times[:2] == [0.0, 0.0]
+    assert abs(times[-1] - 2.0) < 1e-9
+
+
+def test_fetch_all_respects_rate_against_stub():
+    items = [{'contentid': str(i)} for i in range(150)]
+    with FakeTourApi(items) as server:
+        fetcher = fetcher_for(server)
+        fetcher.bucket = TokenBucket(rate=20, capacity=1)
+        fetcher.fetch_all()
+        calls = sorted(at for _, at in server.calls)
+    # 15페이지, 초당 20회 → 첫 요청과 마지막 요청 사이가 0.7초 이상
+    assert len(calls) == 15
+    assert calls[-1] - calls[0] >= 14 / 20 * 0.9
@@ -0,0 +1,50 @@
+# tour_spots 무중단 재색인: 현재 별칭에서 복사하므로 ES 에만 있는 필드와 적재 중 동기화 쓰기가 유지되는지
+import pytest
+
+from elastic import tour_to_elastic
+from elastic.spot_geo import tile_cache
+from elastic.spot_search import search_cache
+from es_fakes import fake_es_with_alias, sources
+
+ES_ONLY = {'detail': {'overview': '소개'}, 'rating': 4.5, 'bookmark_count': 3, 'review_count': 2, 'avg_rating': 4.5}
+
+
+@pytest.fixture
+def es(monkeypatch):
+    docs = {str(i): dict(ES_ONLY, content_id=str(i), title=f'여행지{i}') for i in range(1, 5)}
+    fake = fake_es_with_alias(monkeypatch, 'tour_spots', docs)
+    monkeypatch.setattr(tour_to_elastic, 'get_es', lambda: fake)
+    return fake
+
+
+def test_reindex_keeps_es_only_fields_and_sync_writes(es):
+    def nightly_sync():
+        es.write('tour_spots', '2', dict(sources(es, 'tour_spots_v1')['2'], title='바뀐 이름'))
+        es.write('tour_spots', '5', {'content_id': '5', 'title': '새 여행지'})
+        es.delete_doc('tour_spots', '3')
+
+    es.after_reindex = [nightly_sync]
+    result = tour_to_elastic.reindex_tour_spots()
+
+    assert es.resolve('tour_spots') == 'tour_spots_v2' and result['count'] == 4
+    new = sources(es, 'tour_spots_v2')
+    assert new == sources(es, 'tour_spots_v1')
+    assert all(new[doc_id][field] == value for doc_id in ('1', '2', '4') for field, value in ES_ONLY.items())
+    assert new['2']['title'] == '바뀐 이름' and '5' in new and '3' not in new
+    assert not es.blocked
+
+
+def test_reindex_without_index_needs_source_file(monkeypatch):
+    fake = fake_es_with_alias(monkeypatch, 'other', {})
+    monkeypatch.setattr(tour_to_elastic, 'get_es', lambda: fake)
+    with pytest.raises(ValueError):
+        tour_to_elastic.reindex_tour_spots()
+
+
+def test_reindex_clears_tile_and_search_caches(es):
+    tile_cache.set((10, 873, 396, None), {'count': 1})
+    search_cache.set(('경복궁',), {'total': 1})
+
+    tour_to_elastic.reindex_tour_spots()
+
+    assert len(tile_cache) == 0 and len(search_cache) == 0
@@ -0,0 +1,55 @@
+# 학습 파이프라인 스모크 테스트 (tests/fixtures/training 표본: 실제 여행 / 여행객 150건 + 합성 방문지 600건)
+import os
+import pickle
+
+import pandas as pd
+from catboost import CatBoostClassifier
+
+from ML import training
+from ML.artifacts import model_path
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'training')
+
+
+def _feature_names(path):
+    model = CatBoostClassifier()
+    model.load_model(path)
+    return model.feature_names_
+
+
+# 재학습한 모델이 기존 모델을 그대로 대체하려면 피처 순서가 같아야 한다.
+def test_model_features_match_shipped_model():
+    assert training.MODEL_FEATURES == _feature_names(model_path)
+
+
+def test_pipeline_builds_outputs_and_reuses_cache(tmp_path):
+    output_dir, cache_dir = str(tmp_path / 'out'), str(tmp_path / 'cache')
+
+    def run():
+        pipeline = training.Pipeline(csv_dir=FIXTURE_DIR, cache_dir=cache_dir, output_dir=output_dir)
+        df_learning, key = pipeline.learning()
+        pipeline.model(df_learning, key, dict(training.MODEL_PARAMS, iterations=5), smote=False, thread_count=1)
+        return pipeline, df_learning
+
+    pipeline, df_learning = run()
+    assert all(status == 'built' for _, _, status, _ in pipeline.report)
+
+    df = pd.read_csv(os.path.join(output_dir, 'df_learning.csv'))
+    assert list(df.columns) == training.LEARNING_COLUMNS + ['VISIT_AREA_NM_CODE']
+    assert len(df) == len(df_learning) > 0
+    assert df['VISIT_AREA_TYPE_CD'].between(1, 8).all()
+    assert df['DGSTFN'].notna().all()
+
+    with open(os.path.join(output_dir, 'label_encoder.pkl'), 'rb') as f:
+        encoder = pickle.load(f)
+    assert (encoder.transform(df['VISIT_AREA_NM']) == df['VISIT_AREA_NM_CODE']).all()
+    assert _feature_names(os.path.join(output_dir, 'catboost_model.cbm')) == training.MODEL_FEATURES
+
+    # 입력이 그대로면 모든 단계를 캐시에서 읽음
+    pipeline, _ = run()
+    assert all(status == 'cached' for _, _, status, _ in pipeline.report)
+
+
+def test_missing_sources_exit_with_error(tmp_path):
+    assert training.main(['--csv-dir', str(tmp_path), '--cache-dir', str(tmp_path / 'cache'),
+                          '--output-dir', str(tmp_path / 'out'), '--skip-model']) == 1
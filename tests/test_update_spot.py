@@ -0,0 +1,48 @@
+# sync_modified_date: content_id 없는 항목이 섞여도 나머지 항목은 동기화되는지 (TourAPI / Elasticsearch 는 가짜로 대체)
+import pytest
+
+from elastic import update_spot
+
+
+def raw_item(content_id, title):
+    item = {'title': title, 'mapx': '127.0', 'mapy': '37.5', 'modifiedtime': '20240102030405'}
+    if content_id:
+        item['contentid'] = content_id
+    return item
+
+
+class FakeFetcher:
+    items = []
+
+    def __init__(self, operation, params):
+        self.metrics = {'pages_done': 1, 'total_count': len(self.items), 'failed_pages': []}
+
+    def fetch_all(self, transform):
+        return transform(self.items)
+
+
+@pytest.fixture
+def upserted(monkeypatch):
+    upserted = []
+
+    def bulk_upsert(index_name, items):
+        upserted.extend(items)
+        return len(items), []
+
+    monkeypatch.setattr(update_spot, 'TourApiFetcher', FakeFetcher)
+    monkeypatch.setattr(update_spot, 'find_existing', lambda index_name, content_ids: {})
+    monkeypatch.setattr(update_spot, 'bulk_upsert', bulk_upsert)
+    monkeypatch.setattr(update_spot, 'invalidate_locations', lambda locations: len(locations))
+    return upserted
+
+
+def test_item_without_content_id_is_skipped_and_counted(monkeypatch, upserted):
+    monkeypatch.setattr(FakeFetcher, 'items', [raw_item('1', '경복궁'), raw_item(None, '이름만 있는 곳'),
+                                               raw_item('2', '창덕궁')])
+
+    summary = update_spot.sync_modified_date('20240102')
+
+    assert [item['content_id'] for item in upserted] == ['1', '2']
+    assert summary['skipped'] == 1
+    assert summary['indexed'] == summary['created'] == 2
+    assert summary['failures'] == []
@@ -0,0 +1,76 @@
+# cache.py
+import threading
+import time
+from collections import OrderedDict
+
+
+# 크기(LRU)와 TTL 로 제한되는 프로세스 내 캐시
+# 여러 요청 스레드에서 동시에 접근하므로 모든 연산은 lock 안에서 처리한다.
+class TTLCache:
+    def __init__(self, maxsize=1024, ttl=3600, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        self._data = OrderedDict()  # key -> (만료 시각, 값)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    # record_miss=False: 같은 요청이 뒤에서 다시 조회할 때 miss 가 두 번 집계되지 않도록
+    def get(self, key, default=None, record_miss=True):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += record_miss
+                return default
+
+            expires_at, value = entry
+            if expires_at <= self._timer():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += record_miss
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (self._timer() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return default if entry is None else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    # 통계(hit / miss)에 반영하지 않고 유효한 항목이 있는지만 확인
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and entry[0] > self._timer()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
@@ -0,0 +1,215 @@
+# metrics.py
+# 프로세스 내 지표 (Prometheus text format, /metrics 로 노출)
+#
+# 외부 라이브러리 없이 Counter / Gauge / Histogram 만 구현한다.
+#   - 레이블 값 조합별로 값을 따로 보관 (레이블 값은 정해진 작은 집합만 사용할 것)
+#   - 여러 요청 스레드에서 동시에 기록하므로 지표마다 lock 으로 보호
+#   - 지표는 생성 시 registry 에 등록되고 render() 가 전체를 텍스트로 출력
+# gunicorn 워커가 여러 개면 워커별 값이 따로 집계된다. (현재 워커 1개)
+import threading
+import time
+from contextlib import contextmanager
+
+# 기본 버킷 (초): 1ms ~ 60s
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# 배치 작업용 버킷 (초): 1s ~ 2h
+JOB_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200)
+
+registry = []
+_registry_lock = threading.Lock()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        with _registry_lock:
+            registry.append(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} 레이블이 올바르지 않습니다: {sorted(labels)} (필요: {list(self.labelnames)})")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def _samples(self):
+        raise NotImplementedError
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        lines.extend(self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}' for key, value in items]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry['counts'][i] += 1
+                    break
+            entry['sum'] += value
+            entry['count'] += 1
+
+    # with histogram.time(stage='predict'): ... 블록 실행 시간(초) 기록 (예외가 나도 기록)
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def snapshot(self, **labels):
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return None if entry is None else {'count': entry['count'], 'sum': entry['sum']}
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((key, dict(entry, counts=list(entry['counts']))) for key, entry in self._values.items())
+        lines = []
+        for key, entry in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, entry['counts']):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(bound))])
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labelnames, key, [('le', '+Inf')])
+            lines.append(f'{self.name}_bucket{labels} {entry["count"]}')
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(entry["sum"])}')
+            lines.append(f'{self.name}_count{labels} {entry["count"]}')
+        return lines
+
+
+# 등록된 전체 지표 → Prometheus text format
+def render():
+    with _registry_lock:
+        metrics = list(registry)
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+# 공용 지표
+http_request_seconds = Histogram(
+    'gotgam_http_request_duration_seconds', 'HTTP 요청 처리 시간', ('endpoint', 'method', 'status'))
+
+# /recommend 단계: parse, queue_wait, features, predict, topk, enrich, serialize
+# (features / predict 에는 배치 추천의 청크별 점수화도 함께 집계된다)
+recommend_stage_seconds = Histogram(
+    'gotgam_recommend_stage_duration_seconds', '추천 요청 단계별 처리 시간', ('stage',))
+
+es_request_seconds = Histogram(
+    'gotgam_es_request_duration_seconds', 'Elasticsearch 요청 시간 (재시도 포함)', ('operation', 'status'))
+
+tour_api_request_seconds = Histogram(
+    'gotgam_tour_api_request_duration_seconds', 'TourAPI 페이지 요청 시간 (시도 1회 기준)', ('status',))
+
+job_duration_seconds = Histogram(
+    'gotgam_job_duration_seconds', '배치 작업 실행 시간', ('job', 'status'), buckets=JOB_BUCKETS)
+
+job_items_total = Counter(
+    'gotgam_job_items_total', '배치 작업 처리 건수 (pages / fetched / indexed / unchanged / failed 등)', ('job', 'kind'))
+
+job_last_success_seconds = Gauge(
+    'gotgam_job_last_success_timestamp_seconds', '배치 작업 마지막 성공 시각 (unix time)', ('job',))
+
+
+# 배치 작업 실행 시간 / 성공 시각 기록
+# with job_timer('tour_sync') as run: ... 예외 없이 끝나면 status="success",
+# 일부만 성공했으면 블록 안에서 run['status'] = 'partial' 처럼 바꿔 둔다. (success 일 때만 성공 시각 갱신)
+@contextmanager
+def job_timer(job):
+    run = {'status': 'success'}
+    started = time.perf_counter()
+    try:
+        yield run
+    except BaseException:
+        run['status'] = 'error'
+        raise
+    finally:
+        job_duration_seconds.observe(time.perf_counter() - started, job=job, status=run['status'])
+        if run['status'] == 'success':
+            job_last_success_seconds.set(time.time(), job=job)
+
+
+def record_job_items(job, counts):
+    for kind, amount in counts.items():
+        if amount:
+            job_items_total.inc(amount, job=job, kind=kind)
+
+
+# 다른 프로세스에서 끝난 작업 실행을 이 프로세스 지표에 반영 (jobs/sync_runner.py 실행 기록 → 웹 워커의 /metrics)
+def record_job_run(job, status, duration, counts, finished_at=None):
+    job_duration_seconds.observe(duration, job=job, status=status)
+    record_job_items(job, counts)
+    if status == 'success':
+        job_last_success_seconds.set(finished_at or time.time(), job=job)
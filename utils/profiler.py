@@ -0,0 +1,140 @@
+# profiler.py
+# 요청 단위 샘플링 프로파일러
+#
+# PROFILE_ENABLED=true 일 때 X-Profile 헤더가 붙은 요청만 프로파일링한다. (PROFILE_TOKEN 을 설정하면 헤더 값이 일치해야 함)
+#   - 별도 스레드가 PROFILE_INTERVAL 초마다 대상 스레드의 스택을 sys._current_frames() 로 읽어 집계
+#   - 대상 스레드: 요청 스레드 + 요청 처리 중 attach_current_thread() 로 붙은 스레드 (추론 실행기 등)
+#   - 결과는 flamegraph.pl / speedscope 에서 바로 열 수 있는 folded stack 형식으로 PROFILE_DIR 에 저장
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+PROFILE_ENABLED = os.getenv('PROFILE_ENABLED', 'false').strip().lower() in ('1', 'true', 'yes', 'on')
+PROFILE_TOKEN = os.getenv('PROFILE_TOKEN')
+PROFILE_HEADER = 'X-Profile'
+PROFILE_INTERVAL = float(os.getenv('PROFILE_INTERVAL', 0.005))
+PROFILE_DIR = os.getenv('PROFILE_DIR', '/tmp/gotgam-profiles')
+# 보관할 최대 프로파일 파일 수 (오래된 것부터 삭제)
+PROFILE_KEEP = int(os.getenv('PROFILE_KEEP', 50))
+
+_current = ContextVar('profiler', default=None)
+
+
+class SamplingProfiler:
+    def __init__(self, interval=PROFILE_INTERVAL):
+        self.interval = interval
+        self.id = uuid.uuid4().hex
+        self.samples = 0
+        self.stacks = Counter()
+        self._threads = {threading.get_ident()}
+        self._threads_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = None
+        self._token = None
+        self.started = None
+        self.elapsed = None
+
+    def add_thread(self, thread_id):
+        with self._threads_lock:
+            self._threads.add(thread_id)
+
+    def remove_thread(self, thread_id):
+        with self._threads_lock:
+            self._threads.discard(thread_id)
+
+    @staticmethod
+    def _folded(frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})')
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            with self._threads_lock:
+                threads = list(self._threads)
+            for thread_id in threads:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self.stacks[self._folded(frame)] += 1
+            self.samples += 1
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._token = _current.set(self)
+        self._sampler = threading.Thread(target=self._sample, name='profiler', daemon=True)
+        self._sampler.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._sampler.join()
+        if self._token is not None:
+            _current.reset(self._token)
+            self._token = None
+        self.elapsed = time.perf_counter() - self.started
+        return self
+
+    def folded(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+    # PROFILE_DIR/<id>.folded 로 저장하고 경로 반환
+    def save(self, directory=PROFILE_DIR):
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'{self.id}.folded')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.folded())
+        _prune(directory)
+        return path
+
+
+def _prune(directory):
+    files = sorted((entry for entry in os.scandir(directory) if entry.name.endswith('.folded')),
+                   key=lambda entry: entry.stat().st_mtime)
+    for entry in files[:max(0, len(files) - PROFILE_KEEP)]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+# 요청 헤더로 프로파일링을 요청했는지
+def profiling_requested(headers):
+    if not PROFILE_ENABLED:
+        return False
+    value = headers.get(PROFILE_HEADER)
+    if not value:
+        return False
+    return PROFILE_TOKEN is None or value == PROFILE_TOKEN
+
+
+# 현재 실행 컨텍스트에 프로파일러가 있으면 이 스레드도 샘플링 대상에 추가
+# (contextvars.copy_context() 로 넘긴 작업 안에서 호출)
+@contextmanager
+def attach_current_thread():
+    profiler = _current.get()
+    if profiler is None:
+        yield
+        return
+    thread_id = threading.get_ident()
+    profiler.add_thread(thread_id)
+    try:
+        yield
+    finally:
+        profiler.remove_thread(thread_id)
+
+
+def load_profile(profile_id, directory=PROFILE_DIR):
+    if not profile_id.isalnum():
+        raise ValueError('프로파일 id 가 올바르지 않습니다.')
+    path = os.path.join(directory, f'{profile_id}.folded')
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()